@@ -44,12 +44,12 @@ class GradientDescent(object):
         assert isinstance(values, ndarray)
         self.values = values.copy()
         if self.rprop:
-            self.lastgradient = zeros(len(values), dtype='float64')
+            self.lastgradient = zeros(len(values), dtype=values.dtype)
             self.rprop_theta = self.lastgradient + self.deltanull      
             self.momentumvector = None
         else:
             self.lastgradient = None
-            self.momentumvector = zeros(len(values))
+            self.momentumvector = zeros(len(values), dtype=values.dtype)
             
     def __call__(self, gradient, error=None):            
         """ calculates parameter change based on given gradient and returns updated parameters """
@@ -133,8 +133,8 @@ class IRpropPlus(object):
         self.values = values.copy()
         self.prev_values = values.copy()
         self.more_prev_values = values.copy()
-        self.previous_gradient = zeros(values.shape)
-        self.step = zeros(values.shape)
+        self.previous_gradient = zeros(values.shape, values.dtype)
+        self.step = zeros(values.shape, values.dtype)
         self.previous_error = float("-inf")
     
     def __call__(self, gradient, error):
@@ -4,4 +4,5 @@ from supervised import SupervisedDataSet
 from unsupervised import UnsupervisedDataSet
 from importance import ImportanceDataSet
 from reinforcement import ReinforcementDataSet
-from classification import ClassificationDataSet, SequenceClassificationDataSet
\ No newline at end of file
+from classification import ClassificationDataSet, SequenceClassificationDataSet
+from memorymapped import MemoryMappedSupervisedDataSet, MemoryMappedSequentialDataSet, MemoryMappedImportanceDataSet
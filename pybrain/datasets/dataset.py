@@ -21,6 +21,9 @@ class DataSet(Serializable):
     (e.g. SupervisedDataSet, SequentialDataSet, ...). It consists of several
     fields. A field is a NumPy array with a label (a string) attached to it. 
     Fields can be linked together which means they must have the same length."""
+    
+    # The default type of the fields' elements, see .setDtype().
+    dtype = float
         
     def __init__(self):
         self.data = {}
@@ -104,12 +107,15 @@ class DataSet(Serializable):
             # vector is not 1d, return a without change
             return a
     
-    def addField(self, label, dim):
+    def addField(self, label, dim, dtype=None):
         """Add a field to the dataset. 
         
         A field consists of a string `label`  and a numpy ndarray of dimension
-        `dim`."""
-        self.data[label] = zeros((0, dim), float)
+        `dim`. Its elements are of type `dtype`, which defaults to the one of
+        the dataset."""
+        if dtype is None:
+            dtype = self.dtype
+        self.data[label] = zeros((0, dim), dtype)
         self.endmarker[label] = 0
         
     def setField(self, label, arr):
@@ -253,6 +259,14 @@ class DataSet(Serializable):
         """Return the names of the currently defined fields."""
         return self.data.keys()
     
+    def setDtype(self, dtype):
+        """Store the samples (that is, the linked fields) with elements of type
+        `dtype`, e.g. 'float32' to halve the memory. Fields that are added 
+        later on use this type as well."""
+        self.dtype = dtype
+        for l in self.link:
+            self.data[l] = self.data[l].astype(dtype)
+        
     def convertField(self, label, newtype):
         """Convert the given field to a different data type."""
         try:
@@ -284,7 +298,7 @@ class DataSet(Serializable):
             shape = list(self.data[k].shape)
             # set to zero rows
             shape[0] = 0
-            self.data[k] = zeros(shape)
+            self.data[k] = zeros(shape, self.data[k].dtype)
             self.endmarker[k] = 0
     
     @classmethod
@@ -316,6 +330,8 @@ class DataSet(Serializable):
             'link': self.link,
             'endmarker': self.endmarker,
         }
+        if 'dtype' in self.__dict__:
+            state['dtype'] = self.dtype
         return creator, args, state, iter([]), iter({})
         
     def copy(self):
@@ -354,7 +370,8 @@ class DataSet(Serializable):
 
     def randomBatches(self, label, n):
         """Like .batches(), but the order is random."""
-        permutation = random.shuffle(range(len(self)))
+        permutation = range((len(self) + n - 1) // n)
+        random.shuffle(permutation)
         return self.batches(label, n, permutation)
 
     def replaceNansByMeans(self):
@@ -0,0 +1,162 @@
+from __future__ import with_statement
+
+__author__ = 'agent, agent@local'
+
+import atexit
+import os
+import pickle
+import shutil
+import tempfile
+
+from numpy import memmap, load, save, zeros
+from numpy.lib.format import open_memmap
+
+from supervised import SupervisedDataSet
+from sequential import SequentialDataSet
+from importance import ImportanceDataSet
+
+
+class MemoryMappedDataSetComponent(object):
+    """Mixin for datasets whose fields are stored in .npy files in a directory
+    and mapped into memory, so that they do not have to fit into RAM.
+
+    Samples can be appended as usual; the files grow by doubling, just like
+    the in-memory arrays. Slices of the fields, as returned by .batches() or
+    .getField(), are views on the files and do not copy any data.
+
+    The lengths of the fields and the other attributes of the dataset are
+    written to the directory by .flush(), after which the dataset can be
+    opened again with .loadFromDirectory() without reading the data."""
+
+    # Name of the file that holds everything but the fields.
+    metafile = 'dataset.pickle'
+
+    def __init__(self, directory, *args, **kwargs):
+        """Create an empty dataset in `directory`, which is created if
+        necessary. The other arguments are those of the dataset class."""
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        super(MemoryMappedDataSetComponent, self).__init__(*args, **kwargs)
+
+    def _fieldFile(self, label):
+        return os.path.join(self.directory, '%s.npy' % label)
+
+    def _writeField(self, label, shape, dtype, contents=None):
+        """Create the file of the field `label` with the given shape, copy
+        `contents` into its first rows and map it into memory."""
+        if shape[0] == 0:
+            # Empty files cannot be mapped into memory.
+            self.data[label] = zeros(shape, dtype)
+            return
+        filename = self._fieldFile(label)
+        # Write to a temporary file first, since `contents` might be a view on
+        # the current file.
+        arr = open_memmap(filename + '.tmp', 'w+', dtype=dtype, shape=shape)
+        if contents is not None:
+            arr[:len(contents)] = contents
+        arr.flush()
+        os.rename(filename + '.tmp', filename)
+        self.data[label] = arr
+
+    def setField(self, label, arr):
+        super(MemoryMappedDataSetComponent, self).setField(label, arr)
+        arr = self.data[label]
+        self._writeField(label, arr.shape, arr.dtype, arr)
+
+    def setDtype(self, dtype):
+        self.dtype = dtype
+        for l in self.link:
+            arr = self.data[l]
+            self._writeField(l, arr.shape, dtype, arr)
+
+    def _resize(self, label=None):
+        if label:
+            label = [label]
+        elif self.link:
+            label = self.link
+        else:
+            label = self.data
+
+        for l in label:
+            arr = self.data[l]
+            shape = list(arr.shape)
+            shape[0] = (shape[0] + 1) * 2
+            self._writeField(l, tuple(shape), arr.dtype, arr)
+
+    def flush(self):
+        """Write all changes to the directory."""
+        for label, arr in self.data.items():
+            if isinstance(arr, memmap):
+                arr.flush()
+            elif len(arr) > 0:
+                # Some operations (e.g. removing sequences) replace the fields
+                # by in-memory arrays.
+                self._writeField(label, arr.shape, arr.dtype, arr)
+            else:
+                save(self._fieldFile(label), arr)
+        state = self.__dict__.copy()
+        for key in ('data', 'directory', '_convert', '_DataSet__vectorformat'):
+            state.pop(key, None)
+        state['vectorformat'] = self.vectorformat
+        with file(os.path.join(self.directory, self.metafile), 'wb') as fp:
+            pickle.dump(state, fp, protocol=2)
+
+    @classmethod
+    def loadFromDirectory(cls, directory, mode='r+'):
+        """Open the dataset that was flushed to `directory`. With a `mode` of
+        'r', the fields are mapped read-only."""
+        with file(os.path.join(directory, cls.metafile), 'rb') as fp:
+            state = pickle.load(fp)
+        obj = cls.__new__(cls)
+        obj.vectorformat = state.pop('vectorformat')
+        obj.__dict__.update(state)
+        obj.directory = directory
+        obj.data = {}
+        for label in obj.endmarker:
+            try:
+                obj.data[label] = load(obj._fieldFile(label), mmap_mode=mode)
+            except ValueError:
+                # Empty fields are not mapped.
+                obj.data[label] = load(obj._fieldFile(label))
+        return obj
+
+    def __reduce__(self):
+        # Pickles refer to the files instead of containing the data.
+        self.flush()
+        return _loadFromDirectory, (self.__class__, self.directory)
+
+    def copy(self, directory=None):
+        """Return a copy of the dataset with files of its own, in `directory`.
+        By default, that is a new temporary directory, which is removed when 
+        the program exits."""
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix='pybrain-dataset-')
+            atexit.register(shutil.rmtree, directory, True)
+        elif not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.flush()
+        for label in self.data:
+            shutil.copy(self._fieldFile(label), directory)
+        shutil.copy(os.path.join(self.directory, self.metafile), directory)
+        return self.loadFromDirectory(directory)
+
+
+def _loadFromDirectory(cls, directory):
+    # Classmethods cannot be pickled directly.
+    return cls.loadFromDirectory(directory)
+
+
+class MemoryMappedSupervisedDataSet(MemoryMappedDataSetComponent,
+                                    SupervisedDataSet):
+    """SupervisedDataSet whose fields are memory mapped .npy files."""
+
+
+class MemoryMappedSequentialDataSet(MemoryMappedDataSetComponent,
+                                    SequentialDataSet):
+    """SequentialDataSet whose fields are memory mapped .npy files."""
+
+
+class MemoryMappedImportanceDataSet(MemoryMappedDataSetComponent,
+                                    ImportanceDataSet):
+    """ImportanceDataSet whose fields are memory mapped .npy files."""
@@ -21,7 +21,7 @@ class ReinforcementDataSet(SequentialDataSet):
         # reset the index marker
         self.index = 0
         # add field that stores the beginning of a new episode
-        self.addField('sequence_index', 1)
+        self.addField('sequence_index', 1, float)
         self.append('sequence_index', 0)
         self.currentSeq = 0
         self.statedim = statedim
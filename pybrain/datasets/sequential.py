@@ -1,7 +1,7 @@
 __author__ = 'Thomas Rueckstiess, ruecksti@in.tum.de'
 # $Id$
 
-from scipy import ravel, r_
+from scipy import ravel, r_, zeros
 from random import sample
 
 from supervised import SupervisedDataSet
@@ -20,7 +20,8 @@ class SequentialDataSet(SupervisedDataSet):
     def __init__(self, indim, targetdim):
         SupervisedDataSet.__init__(self, indim, targetdim)
         # add field that stores the beginning of a new episode
-        self.addField('sequence_index', 1)
+        # The indices stay exact, whatever the type of the samples is.
+        self.addField('sequence_index', 1, float)
         self.append('sequence_index', 0)
         self.currentSeq = 0
         
@@ -54,6 +55,24 @@ class SequentialDataSet(SupervisedDataSet):
         the last sequence goes until the end of the dataset."""
         return [self._getSequenceField(index, l) for l in self.link]
     
+    def getSequenceBatch(self, indices, field):
+        """Return the sequences given by the list `indices` of a single field 
+        as a 3D array of shape (time, batch, dim). 
+        
+        Shorter sequences are padded with zeros at their end. A (time, batch) 
+        array that is 1 for the actual samples and 0 for the padding is 
+        returned as well."""
+        starts = ravel(self.getField('sequence_index')).astype(int)
+        stops = r_[starts[1:], self.getLength()]
+        data = self.getField(field)
+        lengths = [stops[i] - starts[i] for i in indices]
+        batch = zeros((max(lengths), len(indices), data.shape[1]), data.dtype)
+        mask = zeros((max(lengths), len(indices)))
+        for j, i in enumerate(indices):
+            batch[:lengths[j], j] = data[starts[i]:stops[i]]
+            mask[:lengths[j], j] = 1
+        return batch, mask
+    
     def getSequenceIterator(self, index):
         """Return an iterator over the samples of the sequence specified by 
         `index`."""
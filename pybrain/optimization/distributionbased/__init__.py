@@ -1,4 +1,6 @@
-from cmaes import CMAES
+from cmaes import CMAES, SeparableCMAES
 from fem import FEM
 from nes import ExactNES, OriginalNES
 from ves import VanillaGradientEvolutionStrategies
+from snes import SNES
+from xnes import XNES
@@ -1,8 +1,8 @@
 __author__ = 'Tom Schaul, tom@idsia.ch; Sun Yi, yi@idsia.ch'
 
-from numpy import floor, log, eye, zeros, array, sqrt, sum, dot, tile, outer, real
-from numpy import exp, diag, power, ravel
-from numpy.linalg import eig, norm
+from numpy import floor, log, eye, zeros, array, sqrt, sum, dot, outer, ones
+from numpy import exp, diag, power, ravel, newaxis
+from numpy.linalg import eigh, norm
 from numpy.random import randn
 
 from pybrain.optimization.optimizer import ContinuousOptimizer
@@ -18,6 +18,11 @@ class CMAES(ContinuousOptimizer):
     stopPrecision = 1e-6
         
     storeAllCenters = False
+    
+    #: The eigendecomposition of C is O(n^3). If eigenGap is positive, B and D 
+    #: are only updated every (eigenGap/covLearningRate/numParameters)-th step, 
+    #: where eigenGap is e.g. between 0.1 and 10. By default, every step.
+    eigenGap = 0.
 
     def _additionalInit(self):
         self.center = self._initEvaluable
@@ -44,20 +49,24 @@ class CMAES(ContinuousOptimizer):
         # Initialize dynamic (internal) strategy parameters and constants
         self.covPath = zeros(self.numParameters)
         self.stepPath = zeros(self.numParameters)                   # evolution paths for C and stepSize
+        self._initCovariance()
+        self._lastEigenUpdate = 0
+        self.chiN = self.numParameters ** 0.5 * (1 - 1. / (4. * self.numParameters) + 1 / (21. * self.numParameters ** 2))
+        # expectation of ||numParameters(0,I)|| == norm(randn(numParameters,1))
+        
+    def _initCovariance(self):
         self.B = eye(self.numParameters, self.numParameters)         # B defines the coordinate system
         self.D = eye(self.numParameters, self.numParameters)         # diagonal matrix D defines the scaling
         self.C = dot(dot(self.B, self.D), dot(self.B, self.D).T)       # covariance matrix
-        self.chiN = self.numParameters ** 0.5 * (1 - 1. / (4. * self.numParameters) + 1 / (21. * self.numParameters ** 2))
-        # expectation of ||numParameters(0,I)|| == norm(randn(numParameters,1))
+        self.eigenvalues = ones(self.numParameters)
+        self._BD = dot(self.B, self.D)
         
     def _learnStep(self):
         # Generate and evaluate lambda offspring
         arz = randn(self.numParameters, self.batchSize)
-        arx = tile(self.center.reshape(self.numParameters, 1), (1, self.batchSize))\
-                        + self.stepSize * dot(dot(self.B, self.D), arz)
+        arx = self.center[:, newaxis] + self.stepSize * self._transform(arz)
         arfitness = zeros(self.batchSize)
-        for k in xrange(self.batchSize):
-            arfitness[k] = self._oneEvaluation(arx[:, k])
+        arfitness[:] = self._batchEvaluation([arx[:, k] for k in xrange(self.batchSize)])
         
         # Sort by fitness and compute weighted mean into center
         arfitness, arindex = sorti(arfitness)  # minimization
@@ -65,7 +74,7 @@ class CMAES(ContinuousOptimizer):
         arx = arx[:, arindex]
         arzsel = arz[:, xrange(self.mu)]
         arxsel = arx[:, xrange(self.mu)]
-        arxmut = arxsel - tile(self.center.reshape(self.numParameters, 1), (1, self.mu))
+        arxmut = arxsel - self.center[:, newaxis]
 
         zmean = dot(arzsel, self.weights)
         self.center = dot(arxsel, self.weights)
@@ -75,32 +84,23 @@ class CMAES(ContinuousOptimizer):
 
         # Cumulation: Update evolution paths
         self.stepPath = (1 - self.cumStep) * self.stepPath \
-                + sqrt(self.cumStep * (2 - self.cumStep) * self.muEff) * dot(self.B, zmean)         # Eq. (4)
+                + sqrt(self.cumStep * (2 - self.cumStep) * self.muEff) * self._rotate(zmean)         # Eq. (4)
         hsig = norm(self.stepPath) / sqrt(1 - (1 - self.cumStep) ** (2 * self.numEvaluations / float(self.batchSize))) / self.chiN \
                     < 1.4 + 2. / (self.numParameters + 1)
         self.covPath = (1 - self.cumCov) * self.covPath + hsig * \
-                sqrt(self.cumCov * (2 - self.cumCov) * self.muEff) * dot(dot(self.B, self.D), zmean) # Eq. (2)
+                sqrt(self.cumCov * (2 - self.cumCov) * self.muEff) * self._transform(zmean) # Eq. (2)
 
         # Adapt covariance matrix C
-        self.C = ((1 - self.covLearningRate) * self.C                    # regard old matrix   % Eq. (3)
-             + self.covLearningRate * (1 / self.muCov) * (outer(self.covPath, self.covPath) # plus rank one update
-                                   + (1 - hsig) * self.cumCov * (2 - self.cumCov) * self.C)
-             + self.covLearningRate * (1 - 1 / self.muCov)                 # plus rank mu update
-             * dot(dot(arxmut, diag(self.weights)), arxmut.T)
-            )
+        self._adaptCovariance(hsig, arxmut)
 
         # Adapt step size self.stepSize
         self.stepSize *= exp((self.cumStep / self.dampings) * (norm(self.stepPath) / self.chiN - 1)) # Eq. (5)
 
-        # Update B and D from C
-        # This is O(n^3). When strategy internal CPU-time is critical, the
-        # next three lines should be executed only every (alpha/covLearningRate/N)-th
-        # iteration, where alpha is e.g. between 0.1 and 10
-        self.C = (self.C + self.C.T) / 2 # enforce symmetry
-        Ev, self.B = eig(self.C)          # eigen decomposition, B==normalized eigenvectors
-        Ev = real(Ev)       # enforce real value
-        self.D = diag(sqrt(Ev))      #diag(ravel(sqrt(Ev))) # D contains standard deviations now
-        self.B = real(self.B)
+        # Update B and D from C, if it is time to
+        if (self.numLearningSteps - self._lastEigenUpdate 
+            >= self.eigenGap / self.covLearningRate / self.numParameters):
+            self._updateEigen()
+            self._lastEigenUpdate = self.numLearningSteps
                 
         # convergence is reached
         if abs((arfitness[0] - arfitness[-1]) / arfitness[0] + arfitness[-1]) <= self.stopPrecision:
@@ -109,16 +109,77 @@ class CMAES(ContinuousOptimizer):
             self.maxLearningSteps = self.numLearningSteps
             
         # or diverged, unfortunately
-        if min(Ev) > 1e5:
+        if min(self.eigenvalues) > 1e5:
             if self.verbose:
                 print "Diverged."
             self.maxLearningSteps = self.numLearningSteps
+            
+    def _transform(self, z):
+        """ Map standard normal samples (the columns of z) to the current 
+        distribution, i.e. multiply them by B*D. """
+        return dot(self._BD, z)
+    
+    def _rotate(self, z):
+        return dot(self.B, z)
+            
+    def _adaptCovariance(self, hsig, arxmut):
+        self.C = ((1 - self.covLearningRate) * self.C                    # regard old matrix   % Eq. (3)
+             + self.covLearningRate * (1 / self.muCov) * (outer(self.covPath, self.covPath) # plus rank one update
+                                   + (1 - hsig) * self.cumCov * (2 - self.cumCov) * self.C)
+             + self.covLearningRate * (1 - 1 / self.muCov)                 # plus rank mu update
+             * dot(arxmut * self.weights, arxmut.T)
+            )
+        
+    def _updateEigen(self):
+        self.C = (self.C + self.C.T) / 2 # enforce symmetry
+        self.eigenvalues, self.B = eigh(self.C)   # eigen decomposition, B==normalized eigenvectors
+        self.D = diag(sqrt(self.eigenvalues))     # D contains standard deviations now
+        self._BD = self.B * sqrt(self.eigenvalues)
                              
     @property
     def batchSize(self):
         return int(4 + floor(3 * log(self.numParameters)))
     
     
+class SeparableCMAES(CMAES):
+    """ sep-CMA-ES: CMA-ES with a diagonal covariance matrix, as described by 
+    Ros and Hansen (PPSN 2008). It learns no correlations between the 
+    parameters, but its time and memory are linear in their number, so it 
+    scales to many thousands of them.
+    
+    C and D are arrays holding the diagonals, and B is not used. """
+    
+    def _additionalInit(self):
+        CMAES._additionalInit(self)
+        # the diagonal can be learned faster
+        self.covLearningRate = min(1, self.covLearningRate * (self.numParameters + 2) / 3.)
+        
+    def _initCovariance(self):
+        self.C = ones(self.numParameters)
+        self.D = ones(self.numParameters)
+        self.eigenvalues = self.C
+        
+    def _transform(self, z):
+        if z.ndim == 2:
+            return self.D[:, newaxis] * z
+        return self.D * z
+    
+    def _rotate(self, z):
+        return z
+    
+    def _adaptCovariance(self, hsig, arxmut):
+        self.C = ((1 - self.covLearningRate) * self.C
+             + self.covLearningRate * (1 / self.muCov) * (self.covPath ** 2 
+                                   + (1 - hsig) * self.cumCov * (2 - self.cumCov) * self.C)
+             + self.covLearningRate * (1 - 1 / self.muCov)
+             * dot(arxmut ** 2, self.weights)
+            )
+        
+    def _updateEigen(self):
+        self.eigenvalues = self.C
+        self.D = sqrt(self.C)
+    
+    
 def sorti(vect):
     """ sort, but also return the indices-changes """
     tmp = sorted(map(lambda (x, y): (y, x), enumerate(ravel(vect))))
@@ -2,9 +2,9 @@ __author__ = 'Daan Wierstra, Tom Schaul and Sun Yi'
 
 
 from ves import VanillaGradientEvolutionStrategies
-from pybrain.utilities import triu2flat, blockCombine
+from pybrain.utilities import blockCombine
 from scipy.linalg import inv, pinv2
-from scipy import outer, dot, multiply, zeros, diag, mat, sum
+from scipy import outer, dot, multiply, zeros, diag, mat, sum, array, triu_indices
 
 
 class ExactNES(VanillaGradientEvolutionStrategies):
@@ -29,20 +29,13 @@ class ExactNES(VanillaGradientEvolutionStrategies):
         d = self.numParameters
         invA = inv(self.factorSigma)
         invSigma = inv(self.sigma)
-        diagInvA = diag(diag(invA))
         
         # efficient computation of V, which corresponds to inv(Fisher)*logDerivs
         V = zeros((self.numDistrParams, self.batchSize))
+        V[:d] = (array(samples) - self.x).T
+        V[d:] = _logDerivsFactor(samples, self.x, invA).T
         # u is used to compute the uniform baseline
-        u = zeros(self.numDistrParams)
-        for i in range(self.batchSize):
-            s = dot(invA.T, (samples[i] - self.x))
-            R = outer(s, dot(invA, s)) - diagInvA
-            flatR = triu2flat(R)
-            u[:d] += fitnesses[i] * (samples[i] - self.x)
-            u[d:] += fitnesses[i] * flatR
-            V[:d, i] += samples[i] - self.x
-            V[d:, i] += flatR
+        u = dot(V, fitnesses)
             
         j = self.numDistrParams - 1
         D = 1 / invSigma[-1, -1]
@@ -127,13 +120,14 @@ class OriginalNES(VanillaGradientEvolutionStrategies):
     def _logDerivsFactorSigma(self, samples, mu, invSigma, factorSigma):
         """ Compute the log-derivatives w.r.t. the factorized covariance matrix components. 
         This implementation should be faster than the one in Vanilla. """
-        res = zeros((len(samples), self.numDistrParams - self.numParameters))
-        invA = inv(factorSigma)
-        diagInvA = diag(diag(invA))
-        
-        for i, sample in enumerate(samples):
-            s = dot(invA.T, (sample - mu))
-            R = outer(s, dot(invA, s)) - diagInvA
-            res[i] = triu2flat(R)
-        return res
+        return _logDerivsFactor(samples, mu, inv(factorSigma))
+
+
+def _logDerivsFactor(samples, mu, invA):
+    """ The flattened upper triangles of outer(s, dot(invA, s)) - diag(invA), 
+    where s = dot(invA.T, sample - mu), for all samples at once. """
+    s = dot(array(samples) - mu, invA)
+    t = dot(s, invA.T)
+    rows, cols = triu_indices(len(mu))
+    return s[:, rows] * t[:, cols] - diag(invA)[rows] * (rows == cols)
     
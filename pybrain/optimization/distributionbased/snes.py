@@ -0,0 +1,136 @@
+__author__ = 'agent, agent@local'
+
+from scipy import dot, exp, log, sqrt, floor, ones, zeros, rand, randn, vstack, append, maximum
+
+from pybrain.optimization.distributionbased.distributionbased import DistributionBasedOptimizer
+from pybrain.tools.rankingfunctions import HansenRanking
+
+
+class SNES(DistributionBasedOptimizer):
+    """ Separable NES: a natural evolution strategy with a diagonal covariance
+    matrix, as described by Schaul, Glasmachers and Schmidhuber (GECCO 2011).
+
+    Time and memory per step are linear in the number of parameters, so it can
+    be used on problems with tens of thousands of them. Samples are handled as
+    the rows of a single array, and importance mixing works on the whole batch.
+    """
+
+    #: learning rates, the latter has a default depending on the dimension
+    centerLearningRate = 1.
+    covLearningRate = None
+
+    #: default: depending on the dimension, as in CMA-ES
+    batchSize = None
+
+    shapingFunction = HansenRanking()
+
+    initVariance = 1.
+
+    #: reuse samples of the previous batch, according to the change in distribution
+    importanceMixing = False
+    #: minimal proportion of fresh samples in every batch
+    forcedRefresh = 0.01
+
+    mustMaximize = True
+
+    def _additionalInit(self):
+        xdim = self.numParameters
+        if self.batchSize is None:
+            self.batchSize = 4 + int(floor(3 * log(xdim)))
+        if self.covLearningRate is None:
+            self.covLearningRate = self._defaultCovLearningRate()
+        self.center = self._initEvaluable.copy()
+        self._initDistribution()
+        # the last batch of samples (as rows), their fitnesses, their 
+        # standardized versions and the log-determinant of their distribution
+        self._samples = None
+        self._fitnesses = None
+        self._standardized = None
+        self._oldLogDet = None
+
+    def _defaultCovLearningRate(self):
+        return (3 + log(self.numParameters)) / (5 * sqrt(self.numParameters))
+
+    def _initDistribution(self):
+        self.sigma = ones(self.numParameters) * sqrt(self.initVariance)
+
+    def _sample(self, n):
+        """ Draw n samples from the current distribution, as rows. Returns 
+        them along with the standard normal draws they come from. """
+        z = randn(n, self.numParameters)
+        return self.center + self.sigma * z, z
+
+    def _logDet(self):
+        """ The logarithm of the determinant of the current distribution's 
+        factor. """
+        return log(self.sigma).sum()
+
+    def _logPdf(self, z, logDet):
+        """ Log-densities of the samples, given as standardized for their 
+        distribution, up to a constant. """
+        return -0.5 * (z ** 2).sum(axis=1) - logDet
+
+    def _toCurrent(self, z):
+        """ Standardize samples of the previous distribution for the current 
+        one, given the last step of the update. """
+        return (z - self._step) / self._scaling
+
+    def _toPrevious(self, z):
+        """ The inverse of ._toCurrent(). """
+        return z * self._scaling + self._step
+
+    def _produceSamples(self):
+        """ Produce a batch of samples from the current distribution and
+        evaluate them. With importance mixing, some samples of the previous
+        batch are reused, and the new ones are drawn such that the batch
+        conforms to the current distribution. """
+        logDet = self._logDet()
+        if self.importanceMixing and self._samples is not None:
+            olds = self._standardized
+            current = self._toCurrent(olds)
+            logRatios = (self._logPdf(current, logDet)
+                         - self._logPdf(olds, self._oldLogDet))
+            keep = log(rand(len(olds))) < log(1 - self.forcedRefresh) + logRatios
+            # never use only old samples
+            limit = min(int(self.batchSize * (1 - self.forcedRefresh)), 
+                        self.batchSize - 1)
+            reused = self._samples[keep][:limit]
+            reusedZ = current[keep][:limit]
+            reusedFitnesses = self._fitnesses[keep][:limit]
+            needed = self.batchSize - len(reused)
+            news = zeros((0, self.numParameters))
+            newZ = zeros((0, self.numParameters))
+            while len(news) < needed:
+                candidates, z = self._sample(needed)
+                p = maximum(self.forcedRefresh,
+                            1 - exp(self._logPdf(self._toPrevious(z), self._oldLogDet)
+                                    - self._logPdf(z, logDet)))
+                accepted = rand(needed) < p
+                news = vstack((news, candidates[accepted]))
+                newZ = vstack((newZ, z[accepted]))
+            news, newZ = news[:needed], newZ[:needed]
+        else:
+            reused, reusedFitnesses = zeros((0, self.numParameters)), zeros(0)
+            reusedZ = reused
+            news, newZ = self._sample(self.batchSize)
+        fitnesses = self._batchEvaluation(list(news))
+        self._samples = vstack((reused, news))
+        self._fitnesses = append(reusedFitnesses, fitnesses)
+        self._standardized = vstack((reusedZ, newZ))
+        self._oldLogDet = logDet
+
+    def _learnStep(self):
+        self._produceSamples()
+        utilities = self.shapingFunction(self._fitnesses)
+        utilities /= sum(utilities)  # make the utilities sum to 1
+        utilities -= 1. / self.batchSize  # baseline
+        self._updateDistribution(utilities, self._standardized)
+
+    def _updateDistribution(self, utilities, s):
+        """ Natural gradient step, given the utilities of the standardized
+        samples s. Keeps the step in standardized coordinates and the scaling
+        of the factor, which relate the new distribution to the old one. """
+        self._step = self.centerLearningRate * dot(utilities, s)
+        self._scaling = exp(0.5 * self.covLearningRate * dot(utilities, s ** 2 - 1))
+        self.center += self.sigma * self._step
+        self.sigma *= self._scaling
@@ -1,7 +1,8 @@
 __author__ = 'Daan Wierstra and Tom Schaul'
 
-from scipy import eye, multiply, ones, dot, array, outer, rand, zeros, diag, randn, exp
-from scipy.linalg import cholesky, inv, det
+from scipy import eye, multiply, ones, dot, array, outer, rand, zeros, diag, randn, exp, log, \
+    maximum, vstack, flatnonzero
+from scipy.linalg import cholesky, inv, solve_triangular
 
 from pybrain.optimization.distributionbased.distributionbased import DistributionBasedOptimizer
 from pybrain.tools.rankingfunctions import TopLinearRanking
@@ -90,51 +91,61 @@ class VanillaGradientEvolutionStrategies(DistributionBasedOptimizer):
         self.allFitnesses.append(fit) 
         return z, fit
         
+    def _produceNewSamples(self, n, ps=None):
+        """ Produce n new samples (or the ones corresponding to the standard 
+        normal rows of ps) and evaluate them as a batch. """
+        if ps is None:
+            ps = randn(n, self.numParameters)
+        zs = dot(ps, self.factorSigma) + self.x
+        self.allPs.extend(ps)
+        self.allSamples.extend(zs)
+        self.allFitnesses.extend(self._batchEvaluation(list(zs)))
+        
+    def _standardize(self, samples, x, factorSigma):
+        """ Map the rows of samples to the standard normal distribution. """
+        return solve_triangular(factorSigma, (samples - x).T, trans='T').T
+    
+    def _logPdfs(self, ps, factorSigma):
+        """ Log-densities of the samples corresponding to the standard normal 
+        rows of ps. They are all off by the same constant, but only their 
+        relative values matter. """
+        return -0.5 * (ps ** 2).sum(axis=1) - log(abs(diag(factorSigma))).sum()
+        
     def _produceSamples(self):
         """ Append batchsize new samples and evaluate them. """
         if self.numLearningSteps == 0 or not self.importanceMixing:
-            for _ in range(self.batchSize):
-                self._produceNewSample()
+            self._produceNewSamples(self.batchSize)
             self.allGenerated.append(self.batchSize + self.allGenerated[-1])
         else:
             olds = len(self.allSamples)
-            oldDetFactorSigma = det(self.allFactorSigmas[-2])
-            newDetFactorSigma = det(self.factorSigma)
-            invA = inv(self.factorSigma)
-    
-            # All pdfs computed here are off by a coefficient of 1/power(2.0*pi, self.numDistrParams/2.)
-            # but as only their relative values matter, we ignore it.
+            oldFactorSigma = self.allFactorSigmas[-2]
+            oldCenter = self.allCenters[-2]
             
             # stochastically reuse old samples, according to the change in distribution
-            for s in range(olds - self.batchSize, olds):
-                oldPdf = exp(-0.5 * dot(self.allPs[s], self.allPs[s])) / oldDetFactorSigma
-                sample = self.allSamples[s]
-                newPs = dot(invA.T, (sample - self.x))
-                newPdf = exp(-0.5 * dot(newPs, newPs)) / newDetFactorSigma
-                r = rand()
-                if r < (1 - self.forcedRefresh) * newPdf / oldPdf:
-                    self.allSamples.append(sample)
-                    self.allFitnesses.append(self.allFitnesses[s])
-                    self.allPs.append(newPs)
-                # never use only old samples
-                if (olds + self.batchSize) - len(self.allSamples) < self.batchSize * self.forcedRefresh:
-                    break
+            samples = array(self.allSamples[-self.batchSize:])
+            newPs = self._standardize(samples, self.x, self.factorSigma)
+            logRatios = (self._logPdfs(newPs, self.factorSigma) 
+                         - self._logPdfs(array(self.allPs[-self.batchSize:]), oldFactorSigma))
+            accepted = flatnonzero(log(rand(self.batchSize)) < log(1 - self.forcedRefresh) + logRatios)
+            # never use only old samples
+            accepted = accepted[:int(self.batchSize * (1 - self.forcedRefresh)) + 1]
+            for s in accepted:
+                self.allSamples.append(samples[s])
+                self.allFitnesses.append(self.allFitnesses[olds - self.batchSize + s])
+                self.allPs.append(newPs[s])
             self.allGenerated.append(self.batchSize - (len(self.allSamples) - olds) + self.allGenerated[-1])
 
-            # add the remaining ones
-            oldInvA = inv(self.allFactorSigmas[-2])
-            while  len(self.allSamples) < olds + self.batchSize:
-                r = rand()
-                if r < self.forcedRefresh:
-                    self._produceNewSample()
-                else:
-                    p = randn(self.numParameters)
-                    newPdf = exp(-0.5 * dot(p, p)) / newDetFactorSigma
-                    sample = dot(self.factorSigma.T, p) + self.x
-                    oldPs = dot(oldInvA.T, (sample - self.allCenters[-2]))
-                    oldPdf = exp(-0.5 * dot(oldPs, oldPs)) / oldDetFactorSigma
-                    if r < 1 - oldPdf / newPdf:
-                        self._produceNewSample(sample, p)
+            # add the remaining ones, by rejection sampling in blocks
+            needed = olds + self.batchSize - len(self.allSamples)
+            ps = zeros((0, self.numParameters))
+            while len(ps) < needed:
+                p = randn(needed, self.numParameters)
+                oldPs = self._standardize(dot(p, self.factorSigma) + self.x, oldCenter, oldFactorSigma)
+                acceptance = maximum(self.forcedRefresh, 
+                                     1 - exp(self._logPdfs(oldPs, oldFactorSigma) 
+                                             - self._logPdfs(p, self.factorSigma)))
+                ps = vstack((ps, p[rand(needed) < acceptance]))
+            self._produceNewSamples(needed, ps[:needed])
                 
     def _learnStep(self):
         if self.online:
@@ -0,0 +1,51 @@
+__author__ = 'agent, agent@local'
+
+from scipy import dot, exp, log, sqrt, eye, randn
+from scipy.linalg import eigh
+
+from pybrain.optimization.distributionbased.snes import SNES
+
+
+class XNES(SNES):
+    """ Exponential NES: a natural evolution strategy with a full covariance
+    matrix, as described by Glasmachers et al. (GECCO 2010).
+
+    The covariance factor A is updated through the exponential map, so it
+    never has to be inverted or factorized again: the samples keep their 
+    standard normal draws, and the log-determinant of A is updated along. 
+    Memory is quadratic in the number of parameters, use SNES for very large 
+    ones. """
+
+    def _defaultCovLearningRate(self):
+        d = self.numParameters
+        return 0.6 * (3 + log(d)) / (d * sqrt(d))
+
+    def _initDistribution(self):
+        self.A = eye(self.numParameters) * sqrt(self.initVariance)
+        self._logDetA = 0.5 * self.numParameters * log(self.initVariance)
+
+    def _sample(self, n):
+        z = randn(n, self.numParameters)
+        return self.center + dot(z, self.A.T), z
+
+    def _logDet(self):
+        return self._logDetA
+
+    def _toCurrent(self, z):
+        return dot(z - self._step, self._inverseScaling)
+
+    def _toPrevious(self, z):
+        return dot(z, self._scaling) + self._step
+
+    def _updateDistribution(self, utilities, s):
+        # the gradients for the scale and the shape of A are combined,
+        # since they use the same learning rate
+        G = dot(s.T * utilities, s) - sum(utilities) * eye(self.numParameters)
+        values, vectors = eigh(0.5 * self.covLearningRate * G)
+        # the exponential of the symmetric matrix, and its inverse
+        self._scaling = dot(vectors * exp(values), vectors.T)
+        self._inverseScaling = dot(vectors * exp(-values), vectors.T)
+        self._step = self.centerLearningRate * dot(utilities, s)
+        self.center += dot(self.A, self._step)
+        self.A = dot(self.A, self._scaling)
+        self._logDetA += values.sum()
@@ -44,8 +44,8 @@ class PGPE(FiniteDifferences):
             of the gradient, scaled with a learning rate alpha. """
         deltas = self.perturbation()
         #reward of positive and negative perturbations
-        reward1 = self._oneEvaluation(self.current + deltas)        
-        reward2 = self._oneEvaluation(self.current - deltas)
+        reward1, reward2 = self._batchEvaluation([self.current + deltas,
+                                                  self.current - deltas])
         self.mreward = (reward1 + reward2) / 2.                
         if self.baseline is None: 
             # first learning step
@@ -1,6 +1,6 @@
 __author__ = 'Tom Schaul, tom@idsia.ch'
 
-from scipy import array, randn, ndarray, isinf, isnan, isscalar
+from scipy import array, randn, ndarray, isinf, isnan, isscalar, vstack
 import logging
 
 from pybrain.utilities import setAllArgs, abstractMethod, DivergenceError
@@ -15,6 +15,24 @@ from pybrain.structure.evolvables.topology import TopologyEvolvable
 from pybrain.structure.modules.module import Module
 
 
+class _Evaluation(object):
+    """ Callable that evaluates a single candidate, for use with an executor.
+    It does not depend on the optimizer, so it can be pickled and sent to other
+    processes. """
+
+    def __init__(self, evaluator, wrapper = None):
+        self.evaluator = evaluator
+        self.wrapper = wrapper
+
+    def __call__(self, x):
+        if self.wrapper is not None:
+            # every evaluation gets its own wrapper, for thread safety
+            wrapper = self.wrapper.copy()
+            wrapper._setParameters(x)
+            x = wrapper
+        return self.evaluator(x)
+
+
 class BlackBoxOptimizer(DirectSearchLearner):
     """ The super-class for learning algorithms that treat the problem as a black box. 
     At each step they change the policy, and get a fitness value by invoking 
@@ -63,6 +81,12 @@ class BlackBoxOptimizer(DirectSearchLearner):
     # evaluations they will perform during each learningStep:
     batchSize = 1
     
+    #: Object with a map(function, sequence) method, used to evaluate the 
+    #: candidates of a batch in parallel, e.g. a multiprocessing.Pool (which 
+    #: requires the evaluator to be picklable) or a 
+    #: multiprocessing.pool.ThreadPool. By default, they are evaluated serially.
+    executor = None
+    
     
     def __init__(self, evaluator = None, initEvaluable = None, **kwargs):
         """ The evaluator is any callable object (e.g. a lambda function). 
@@ -70,6 +94,7 @@ class BlackBoxOptimizer(DirectSearchLearner):
         # set all algorithm-specific parameters in one go:
         self.__minimize = None
         self.__evaluator = None
+        self.__rawEvaluator = None
         setAllArgs(self, kwargs)
         # bookkeeping
         self.numEvaluations = 0      
@@ -120,7 +145,7 @@ class BlackBoxOptimizer(DirectSearchLearner):
             if isinstance(evaluator, FunctionEnvironment):
                 if self.numParameters is None:            
                     self.numParameters = evaluator.xdim
-                elif self.numParameters is not evaluator.xdim:
+                elif self.numParameters != evaluator.xdim:
                     raise ValueError("Parameter dimension mismatch: evaluator expects "+str(evaluator.xdim)\
                                      +" but it was set to "+str(self.numParameters)+".")
                 
@@ -129,6 +154,7 @@ class BlackBoxOptimizer(DirectSearchLearner):
             self.minimize = False
         
         self.__evaluator = evaluator
+        self.__rawEvaluator = evaluator
         if self._wasOpposed:
             self._flipDirection()
                                       
@@ -169,7 +195,7 @@ class BlackBoxOptimizer(DirectSearchLearner):
         if isinstance(self._initEvaluable, ParameterContainer):
             if self.numParameters is None:            
                 self.numParameters = len(self._initEvaluable)
-            elif self.numParameters is not len(self._initEvaluable):
+            elif self.numParameters != len(self._initEvaluable):
                 raise ValueError("Parameter dimension mismatch: evaluator expects "+str(self.numParameters)\
                                  +" but the evaluable has "+str(len(self._initEvaluable))+".")
                   
@@ -211,6 +237,41 @@ class BlackBoxOptimizer(DirectSearchLearner):
             res = self.__evaluator(evaluable.params)
         else:            
             res = self.__evaluator(evaluable)
+        return self._recordEvaluation(evaluable, res)
+    
+    def _batchEvaluation(self, evaluables):
+        """ Evaluate a list of evaluables and return the list of their 
+        fitnesses. If an executor is set, the evaluations run in parallel, 
+        functions are evaluated by a single vectorized call; in both cases 
+        the bookkeeping is done in order, exactly as if they were evaluated 
+        one by one. """
+        if self._wasWrapped:
+            candidates = [e.params for e in evaluables]
+        else:
+            candidates = evaluables
+        if self.executor is not None:
+            if self._wasUnwrapped:
+                evaluation = _Evaluation(self.__rawEvaluator, self.wrappingEvaluable)
+            else:
+                evaluation = _Evaluation(self.__rawEvaluator)
+            results = list(self.executor.map(evaluation, candidates))
+        elif (isinstance(self.__rawEvaluator, FunctionEnvironment) 
+              and self.__rawEvaluator._batchable() and len(evaluables) > 0):
+            xs = vstack([x.params if isinstance(x, ParameterContainer) else x 
+                         for x in candidates])
+            results = list(self.__rawEvaluator.fBatch(xs))
+        else:
+            return [self._oneEvaluation(e) for e in evaluables]
+        if self._wasOpposed:
+            # the opposite evaluator cannot be pickled, so the direction is 
+            # flipped here
+            results = [-res for res in results]
+        return [self._recordEvaluation(e, res) 
+                for e, res in zip(evaluables, results)]
+        
+    def _recordEvaluation(self, evaluable, res):
+        """ Keep track of the best evaluable and, if desired, of all the 
+        evaluations. """
         if isscalar(res):
             # detect numerical instability
             if isnan(res) or isinf(res):
@@ -227,7 +288,8 @@ class BlackBoxOptimizer(DirectSearchLearner):
         
         # if desired, also keep track of all evaluables and/or their fitness.                        
         if self.storeAllEvaluated:
-            if self._wasUnwrapped:            
+            if self._wasUnwrapped:
+                self.wrappingEvaluable._setParameters(evaluable)
                 self._allEvaluated.append(self.wrappingEvaluable.copy())
             elif self._wasWrapped:            
                 self._allEvaluated.append(evaluable.params.copy())
@@ -1,9 +1,31 @@
 __author__ = 'Tom Schaul, tom@idsia.ch'
 
-from scipy import argmax, array
+from copy import deepcopy
+from hashlib import md5
+from scipy import argmax, array, random
 from random import sample, choice, shuffle
 
-from pybrain.utilities import fListToString, Named
+from pybrain.utilities import fListToString, Named, callSeeded
+
+
+class _RelativeEvaluations(object):
+    """ Callable that plays a number of relative evaluations between two 
+    players, for use with an executor. It does not depend on the algorithm, so 
+    it can be pickled and sent to other processes. """
+    
+    def __init__(self, relEvaluator):
+        self.relEvaluator = relEvaluator
+        
+    def __call__(self, job):
+        """ Play the evaluations of a job, given as (seed, player, opponent, 
+        number of evaluations), and return their results. """
+        s, p, opp, number = job
+        return callSeeded(s, self._play, p, opp, number)
+        
+    def _play(self, p, opp, number):
+        # every job works on its own copies of the players
+        relEvaluator, p, opp = deepcopy((self.relEvaluator, p, opp))
+        return [relEvaluator(p, opp) for _ in range(number)]
 
 
 class Coevolution(Named):
@@ -28,6 +50,20 @@ class Coevolution(Named):
     maxEvaluations = None
     verbose = False
     
+    #: Object with a map(function, sequence) method, used to play the 
+    #: relative evaluations of a tournament in parallel (those between the same
+    #: two players in a single job), e.g. a multiprocessing.Pool (which 
+    #: requires the relative evaluator and the players to be picklable). 
+    #: Every job seeds the random generators, so the results do not depend on
+    #: the executor; within a single process (e.g. a ThreadPool), the jobs 
+    #: therefore run one at a time.
+    executor = None
+    
+    #: Reuse the results between players whose parameters did not change 
+    #: since the last generation, instead of evaluating them again. Only 
+    #: sensible for deterministic relative evaluators.
+    memoizeResults = False
+    
     def __init__(self, relEvaluator, seeds, **args):
         """ 
         :arg relevaluator: an anti-symmetric function that can evaluate 2 elements
@@ -59,6 +95,11 @@ class Coevolution(Named):
         # a list of all previous populations
         self.oldPops = []
         
+        # the results of this and of the last generation, by the parameters
+        # of both players
+        self._memo = {}
+        self._oldMemo = {}
+        
         # build initial populations
         self._initPopulation(seeds)
         
@@ -81,6 +122,7 @@ class Coevolution(Named):
     def _oneGeneration(self):
         self.oldPops.append(self.pop)
         self.generation += 1        
+        self._oldMemo, self._memo = self._memo, {}
         fitnesses = self._evaluatePopulation()
         # store best in hall of fame
         besti = argmax(array(fitnesses))
@@ -186,6 +228,7 @@ class Coevolution(Named):
         :key tournamentSize: If unspecified, play all-against-all 
         """
         # TODO: Preferably select high-performing opponents?
+        pairs = []
         for p in pop1:
             pop3 = pop2[:]
             while p in pop3:
@@ -195,8 +238,13 @@ class Coevolution(Named):
             else:                
                 opps = pop3                    
             for opp in opps:
+                pairs.append((p, opp))
+                pairs.append((opp, p))
+        if self.executor is None:
+            for p, opp in pairs:
                 self._relEval(p, opp)
-                self._relEval(opp, p)
+        else:
+            self._relEvalInParallel(pairs)
                 
     def _globalScore(self, p):
         """ The average score over all evaluations for a player. """
@@ -233,20 +281,72 @@ class Coevolution(Named):
         otherSelect.remove(best)
         return [best] + self._sharedSampling(numSelect - 1, otherSelect, unBeaten)
                 
+    def _paramsKey(self, p):
+        """ what identifies a player for memoization """
+        if not hasattr(p, 'params'):
+            return p
+        return md5(array(p.params).tostring()).digest()
+    
+    def _memoized(self, p, opp):
+        """ the result of p playing opp, if it is known already, else None """
+        if not self.memoizeResults:
+            return None
+        key = (self._paramsKey(p), self._paramsKey(opp))
+        if key not in self._memo and key in self._oldMemo:
+            self._memo[key] = self._oldMemo[key]
+        return self._memo.get(key)
+    
+    def _evaluated(self, p, opp, res):
+        """ count a relative evaluation, and remember its result """
+        self.steps += 1
+        if self.memoizeResults:
+            self._memo[(self._paramsKey(p), self._paramsKey(opp))] = res
+        
+    def _relEvalInParallel(self, pairs):
+        """ the relative evaluations of a list of (player, opponent) pairs, 
+        played by the executor, but with the bookkeeping done in order. """
+        # how many times to play each pair, in order of appearance
+        counts = {}
+        order = []
+        for p, opp in pairs:
+            if self._memoized(p, opp) is not None:
+                continue
+            if (p, opp) not in counts:
+                counts[(p, opp)] = 0
+                order.append((p, opp))
+            if not self.memoizeResults:
+                counts[(p, opp)] += 1
+            else:
+                counts[(p, opp)] = 1
+        jobs = [(random.randint(2 ** 31 - 1), p, opp, counts[(p, opp)]) for p, opp in order]
+        results = dict(zip(order, self.executor.map(_RelativeEvaluations(self.relEvaluator), jobs)))
+        for p, opp in pairs:
+            res = self._memoized(p, opp)
+            if res is None:
+                res = results[(p, opp)].pop(0)
+                self._evaluated(p, opp, res)
+            self._record(p, opp, res)
+                
     def _relEval(self, p, opp):
         """ a single relative evaluation (in one direction) with the involved bookkeeping."""
+        res = self._memoized(p, opp)
+        if res is None:
+            res = self.relEvaluator(p, opp)
+            self._evaluated(p, opp, res)
+        self._record(p, opp, res)
+        
+    def _record(self, p, opp, res):
+        """ the bookkeeping of a relative evaluation """
         if p not in self.allOpponents:
             self.allOpponents[p] = []
         self.allOpponents[p].append(opp)
         if (p, opp) not in self.allResults:
             self.allResults[(p, opp)] = [0, 0, 0., []]
-        res = self.relEvaluator(p, opp)
         if res > 0:
             self.allResults[(p, opp)][0] += 1
         self.allResults[(p, opp)][1] += 1
         self.allResults[(p, opp)][2] += res
         self.allResults[(p, opp)][3].append(res)
-        self.steps += 1
     
     def __str__(self):
         s = 'Coevolution ('
@@ -22,27 +22,28 @@ class ES(BlackBoxOptimizer):
                                             ') must be multiple of mu ('+str(self.mu)+').'
         self.hallOfFame = []        
         # population is a list of (fitness, individual) tuples.
-        self.population = [(self._oneEvaluation(self._initEvaluable), self._initEvaluable)]
+        xs = [self._initEvaluable]
         for _ in range(1, self.mu + self.lambada):
             x = self._initEvaluable.copy()
             x.mutate()
-            self.population.append((self._oneEvaluation(x), x))        
+            xs.append(x)
+        self.population = zip(self._batchEvaluation(xs), xs)
         self._sortPopulation()
                 
     def _learnStep(self):               
         # re-evaluate the mu individuals if the fitness function is noisy        
         if self.evaluatorIsNoisy:
-            for i in range (self.mu):
-                x = self.population[i][1]
-                self.population[i] = (self._oneEvaluation(x), x)
+            xs = [x for _, x in self.population[:self.mu]]
+            self.population[:self.mu] = zip(self._batchEvaluation(xs), xs)
             self._sortPopulation(noHallOfFame = True)     
                    
         # generate the lambada: copy the mu and mu-tate the copies 
+        xs = []
         for i in range(self.mu, self.mu + self.lambada):
             x = self.population[i % self.mu][1].copy()
             x.mutate()
-            xFitness = self._oneEvaluation(x)
-            self.population[i] = (xFitness, x)
+            xs.append(x)
+        self.population[self.mu:] = zip(self._batchEvaluation(xs), xs)
         self._sortPopulation()      
 
     def _sortPopulation(self, noHallOfFame = False):
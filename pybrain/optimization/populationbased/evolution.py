@@ -21,7 +21,7 @@ class Evolution(BlackBoxOptimizer):
         
     def _learnStep(self):
         """ do one generation step """
-        self.fitnesses = [self._oneEvaluation(indiv) for indiv in self.currentpop]
+        self.fitnesses = self._batchEvaluation(self.currentpop)
         if self.storeAllPopulations:
             self._allGenerations.append((self.currentpop, self.fitnesses))
         self.produceOffspring()
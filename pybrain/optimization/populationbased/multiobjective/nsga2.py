@@ -1,10 +1,11 @@
 __author__ = 'Justin Bayer, Tom Schaul, {justin,tom}@idsia.ch'
 
 
-from scipy import array
+from collections import OrderedDict
+from scipy import array, flatnonzero
 
 from pybrain.optimization.populationbased.ga import GA
-from pybrain.tools.nondominated import non_dominated_front, crowding_distance, non_dominated_sort
+from pybrain.tools.nondominated import non_dominated_front, crowding_distance_arr, non_dominated_ranks
 
 # TODO: not very elegant, because of the conversions between tuples and arrays all the time...
 
@@ -26,7 +27,7 @@ class MultiObjectiveGA(GA):
     def _learnStep(self):
         """ do one generation step """
         # evaluate fitness
-        self.fitnesses = dict([(tuple(indiv), self._oneEvaluation(indiv)) for indiv in self.currentpop])
+        self.fitnesses = dict(zip(map(tuple, self.currentpop), self._batchEvaluation(self.currentpop)))
         if self.storeAllPopulations:
             self._allGenerations.append((self.currentpop, self.fitnesses))
         
@@ -50,20 +51,20 @@ class MultiObjectiveGA(GA):
 def nsga2select(population, fitnesses, survivors, allowequality = True):
     """The NSGA-II selection strategy (Deb et al., 2002).
     The number of individuals that survive is given by the survivors parameter."""
-    fronts = non_dominated_sort(population,
-                                key=lambda x: fitnesses[x],
-                                allowequality = allowequality)
-    individuals = set()
-    for front in fronts:
+    population = list(OrderedDict.fromkeys(population))
+    fits = array([fitnesses[x] for x in population])
+    ranks = non_dominated_ranks(fits, allowequality)
+    individuals = []
+    for rank in xrange(max(ranks) + 1 if population else 0):
         remaining = survivors - len(individuals)
         if not remaining > 0:
             break
+        front = flatnonzero(ranks == rank)
         if len(front) > remaining:
             # If the current front does not fit in the spots left, use those
             # that have the biggest crowding distance.
-            crowd_dist = crowding_distance(front, fitnesses)
-            front = sorted(front, key=lambda x: crowd_dist[x], reverse=True)
-            front = set(front[:remaining])
-        individuals |= front
+            crowd_dist = crowding_distance_arr(fits[front])
+            front = front[crowd_dist.argsort(kind='mergesort')[::-1][:remaining]]
+        individuals.extend(population[i] for i in front)
     
-    return list(individuals)
+    return individuals
@@ -81,8 +81,9 @@ class ParticleSwarmOptimizer(ContinuousOptimizer):
         return picker(particlelist, key=lambda p: p.fitness)
     
     def _learnStep(self):
-        for particle in self.particles:
-            particle.fitness = self._oneEvaluation(particle.position.copy())
+        fitnesses = self._batchEvaluation([p.position.copy() for p in self.particles])
+        for particle, fitness in zip(self.particles, fitnesses):
+            particle.fitness = fitness
                 
         for particle in self.particles:
             bestPosition = self.best(self.neighbours[particle]).position
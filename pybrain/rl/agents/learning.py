@@ -53,6 +53,20 @@ class LearningAgent(LoggingAgent):
             self.lastaction = self.learner.explore(self.lastobs, self.lastaction)
             
         return self.lastaction
+    
+    def getActionBatch(self, observations):
+        """ Return the actions (one per row) for a batch of observations from 
+            parallel episodes. The module is activated on the whole batch, the 
+            exploration is done by the learner. 
+            
+            Sequential modules would carry their state over from one episode 
+            to the other, so they are not supported. """
+        if self.module.sequential:
+            raise ValueError("Parallel episodes need a non-sequential module.")
+        actions = self.module.activateBatch(observations)
+        if self.learning:
+            actions = self.learner.exploreBatch(observations, actions)
+        return actions
                     
 
     def newEpisode(self):
@@ -64,6 +64,14 @@ class LoggingAgent(Agent):
         if self.logging:
             self.history.newSequence()  
 
+    def storeEpisode(self, observations, actions, rewards):
+        """ Store a whole episode in the history as a new sequence, e.g. one of
+        several that were run in parallel. """
+        if self.logging:
+            self.history.newSequence()
+            for sample in zip(observations, actions, rewards):
+                self.history.addSample(*sample)
+
     
     def reset(self):
         """ Clear the history of the agent. """
@@ -1,12 +1,13 @@
-# try importing the external dependencies
-try:
-    from matplotlib.mlab import rk4 
-except ImportError:
-    raise ImportError('This environment needs the matplotlib library installed.')
+import logging
 
 from cartpole import CartPoleEnvironment, CartPoleLinEnvironment
-from renderer import CartPoleRenderer
-from balancetask import BalanceTask, EasyBalanceTask, DiscreteBalanceTask, DiscreteNoHelpTask, JustBalanceTask, LinearizedBalanceTask
+# the renderer needs the matplotlib library
+try:
+    from renderer import CartPoleRenderer
+except ImportError, e:
+    logging.info("No cart pole renderer available: %s" % e)
+from balancetask import BalanceTask, EasyBalanceTask, DiscreteBalanceTask, DiscreteNoHelpTask, JustBalanceTask, LinearizedBalanceTask, BatchBalanceTask
 from doublepole import DoublePoleEnvironment
 from nonmarkovpole import NonMarkovPoleEnvironment
-from nonmarkovdoublepole import NonMarkovDoublePoleEnvironment
\ No newline at end of file
+from nonmarkovdoublepole import NonMarkovDoublePoleEnvironment
+from batch import BatchCartPoleEnvironment, BatchDoublePoleEnvironment, BatchNonMarkovPoleEnvironment, BatchNonMarkovDoublePoleEnvironment
\ No newline at end of file
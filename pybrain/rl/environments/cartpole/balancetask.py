@@ -1,9 +1,10 @@
 __author__ = 'Thomas Rueckstiess and Tom Schaul'
 
-from scipy import pi, dot, array
+from scipy import pi, dot, array, asarray, ones, zeros, where, clip
 
 from pybrain.rl.environments.cartpole.nonmarkovpole import NonMarkovPoleEnvironment
 from pybrain.rl.environments import EpisodicTask
+from pybrain.structure.modules.module import Module
 from cartpole import CartPoleEnvironment
 
 
@@ -181,3 +182,69 @@ class LinearizedBalanceTask(BalanceTask):
         return False
     
 
+
+
+class BatchBalanceTask(BalanceTask):
+    """ The task of balancing the poles of a batch of carts (see 
+        BatchCartPoleEnvironment), with the same rewards as the BalanceTask. 
+        Observations, actions and rewards are arrays with one row per cart.
+        The episode of a cart is over like in the BalanceTask, after which the
+        cart does not move anymore and gets no reward; the task is finished 
+        when all of them are over.
+    """
+    
+    def reset(self):
+        BalanceTask.reset(self)
+        self.cumreward = zeros(self.env.size)
+        self.running = ones(self.env.size, dtype=bool)
+        
+    def getObservation(self):
+        sensors = self.env.getSensors()
+        if self.sensor_limits:
+            for i, l in enumerate(self.sensor_limits):
+                if l:
+                    sensors[:, i] = (sensors[:, i] - l[0]) / (l[1] - l[0]) * 2 - 1.0
+        return sensors
+        
+    def performAction(self, action):
+        """ Execute one action for every cart (as rows), only the carts whose
+            episode is not over are moved. """
+        action = asarray(action, dtype=float).reshape(self.env.size, self.env.indim)
+        if self.actor_limits:
+            low, high = asarray(self.actor_limits, dtype=float).T
+            action = (action + 1.0) / 2 * (high - low) + low
+            if self.clipping:
+                action = clip(action, low, high)
+        self.running = ~self._finished()
+        self.t += 1
+        self.env.performAction(action[self.running], self.running)
+        self.addReward()
+        self.samples += 1
+    
+    def _finished(self):
+        """ Boolean array telling which episodes are over. """
+        angles = abs(self.env.getPoleAngles()).max(axis=1)
+        s = abs(self.env.getCartPosition())
+        return (angles > 0.7) | (s > 2.4) | (self.t >= self.N) | ~self.running
+                       
+    def isFinished(self):
+        return self._finished().all()
+        
+    def getReward(self):
+        angles = abs(self.env.getPoleAngles())
+        s = abs(self.env.getCartPosition())
+        reward = where((angles.max(axis=1) > 0.7) | (s > 2.4), -2 * (self.N - self.t), -1)
+        reward[(angles.min(axis=1) < 0.05) & (s < 0.05)] = 0
+        reward[~self.running] = 0
+        return reward
+    
+    def f(self, x):
+        """ The average total reward of a non-sequential module on all carts, 
+            which are controlled by batch activations. """
+        if not isinstance(x, Module):
+            raise ValueError(self.__class__.__name__+' cannot evaluate the fitness of '+str(type(x)))
+        x.reset()
+        self.reset()
+        while not self.isFinished():
+            self.performAction(x.activateBatch(self.getObservation()))
+        return self.getTotalReward().mean()
@@ -0,0 +1,143 @@
+__author__ = 'agent, agent@local'
+
+from scipy import array, zeros, ones, random, sin, cos, ravel, arange, column_stack
+
+from pybrain.rl.environments import Environment
+from cartpole import rk4
+
+
+class BatchCartPoleEnvironment(Environment):
+    """ A batch of independent cart-pole systems, with the same dynamics as
+        CartPoleEnvironment, that are integrated together by array operations.
+
+        The actions are given and the sensors are returned with one row per
+        cart. A batch of double-pole systems is modeled like the
+        DoublePoleEnvironment, by two cart-pole systems that receive the same
+        action; the cart position is the one of the last system.
+    """
+
+    indim = 1
+    outdim = 4
+
+    # some physical constants
+    g = 9.81
+    mc = 1.0
+    dt = 0.02
+
+    #: pole length and mass of every system
+    poles = [(0.5, 0.1)]
+
+    randomInitialization = True
+
+    def __init__(self, size, polelength=None):
+        """
+        :arg size: number of carts
+        :key polelength: (optional) length of the first pole
+        """
+        self.size = size
+        self.l = array([l for l, _ in self.poles])
+        self.mp = array([mp for _, mp in self.poles])
+        if polelength != None:
+            self.l[0] = polelength
+        self.state = zeros((size, len(self.poles), 4))
+        self.reset()
+        self.action = zeros(size)
+
+    def reset(self, which=None):
+        """ re-initializes the carts with the given indices (default: all),
+            setting them back in a random position.
+        """
+        if which is None:
+            which = arange(self.size)
+        n = len(which)
+        if self.randomInitialization:
+            # drawn in the same order as by the single environments
+            u = random.random_sample((n, len(self.poles), 2))
+            angles = -0.2 + 0.4 * u[..., 0]
+            positions = -0.5 + 1.0 * u[..., 1]
+        else:
+            angles = -0.2 * ones((n, len(self.poles)))
+            positions = 0.2 * ones((n, len(self.poles)))
+        self.state[which] = 0
+        self.state[which, :, 0] = angles
+        # all systems of a cart share the position of the first one
+        self.state[which, :, 2] = positions[:, :1]
+
+    def performAction(self, action, which=None):
+        """ execute one step with the given actions (one per cart), or only
+            move the carts with the given indices (or boolean mask).
+        """
+        self.action = ravel(action).astype(float)
+        self.step(which)
+
+    def step(self, which=None):
+        if which is None:
+            self.state = rk4(self._derivs, self.state, [0, self.dt])[-1]
+        else:
+            self.state[which] = rk4(self._derivs, self.state[which], [0, self.dt])[-1]
+
+    def _derivs(self, x, t):
+        """ The derivatives of the states in x (an array of shape (size,
+            number of poles, 4)), computed like in CartPoleEnvironment.
+        """
+        F = self.action[:, None]
+        theta, theta_, s_ = x[..., 0], x[..., 1], x[..., 3]
+        sin_theta = sin(theta)
+        cos_theta = cos(theta)
+        mp = self.mp
+        mc = self.mc
+        l = self.l
+        u_ = (self.g * sin_theta * (mc + mp) - (F + mp * l * theta ** 2 * sin_theta) * cos_theta) / (4 / 3 * l * (mc + mp) - mp * l * cos_theta ** 2)
+        v_ = (F - mp * l * (u_ * cos_theta - (s_ ** 2 * sin_theta))) / (mc + mp)
+        res = zeros(x.shape)
+        res[..., 0] = theta_
+        res[..., 1] = u_
+        res[..., 2] = s_
+        res[..., 3] = v_
+        return res
+
+    def getSensors(self):
+        """ theta, theta', s, s' of every cart (s being the distance from the
+            origin), as rows.
+        """
+        return self.state[:, 0].copy()
+
+    def getPoleAngles(self):
+        """ the pole angles of every cart, as rows """
+        return self.state[:, :, 0].copy()
+
+    def getCartPosition(self):
+        """ the positions of the carts """
+        return self.state[:, -1, 2].copy()
+
+
+class BatchDoublePoleEnvironment(BatchCartPoleEnvironment):
+    """ A batch of double-pole systems, like DoublePoleEnvironment. """
+
+    outdim = 6
+
+    poles = [(0.5, 0.1), (0.05, 0.01)]
+
+    def getSensors(self):
+        """ theta1, theta1', theta2, theta2', s, s' of every cart, as rows. """
+        return column_stack((self.state[:, 0, :2], self.state[:, 1]))
+
+
+class BatchNonMarkovPoleEnvironment(BatchCartPoleEnvironment):
+    """ BatchCartPoleEnvironment which does not give access to the derivatives. """
+
+    outdim = 2
+
+    def getSensors(self):
+        """ theta and s of every cart, as rows. """
+        return self.state[:, 0, ::2].copy()
+
+
+class BatchNonMarkovDoublePoleEnvironment(BatchDoublePoleEnvironment):
+    """ BatchDoublePoleEnvironment which does not give access to the derivatives. """
+
+    outdim = 3
+
+    def getSensors(self):
+        """ theta1, theta2 and s of every cart, as rows. """
+        return column_stack((self.state[:, :, 0], self.state[:, 1, 2]))
@@ -1,13 +1,34 @@
 __author__ = 'Thomas Rueckstiess, ruecksti@in.tum.de'
 
-from matplotlib.mlab import rk4 
 from math import sin, cos
 import time
-from scipy import eye, matrix, random, asarray
+from scipy import eye, matrix, random, asarray, zeros
 
 from pybrain.rl.environments.graphical import GraphicalEnvironment
 
 
+def rk4(derivs, y0, t):
+    """ Integrate the system whose derivatives are given by derivs(y, t) with
+        the classical 4th order Runge-Kutta method, starting from y0, and return 
+        the states at the times t (like matplotlib.mlab.rk4). The state can be
+        an array of any shape, e.g. with a row for each of several systems.
+    """
+    y0 = asarray(y0, dtype=float)
+    yout = zeros((len(t),) + y0.shape)
+    yout[0] = y0
+    for i in range(len(t) - 1):
+        thist = t[i]
+        dt = t[i + 1] - thist
+        dt2 = dt / 2.0
+        y0 = yout[i]
+        k1 = asarray(derivs(y0, thist))
+        k2 = asarray(derivs(y0 + dt2 * k1, thist + dt2))
+        k3 = asarray(derivs(y0 + dt2 * k2, thist + dt2))
+        k4 = asarray(derivs(y0 + dt * k3, thist + dt))
+        yout[i + 1] = y0 + dt / 6.0 * (k1 + 2 * k2 + 2 * k3 + k4)
+    return yout
+
+
 class CartPoleEnvironment(GraphicalEnvironment):
     """ This environment implements the cart pole balancing benchmark, as stated in:
         Riedmiller, Peters, Schaal: "Evaluation of Policy Gradient Methods and
@@ -41,6 +41,30 @@ class FunctionEnvironment(Environment, FitnessEvaluator):
         assert type(x) == ndarray, 'FunctionEnvironment: Input not understood: '+str(type(x))
         return self.f(x)
     
+    def fBatch(self, xs):
+        """ The function values of all the rows of the (n, xdim) array xs. 
+        Subclasses can override this with a vectorized version. """
+        return array([self.f(x) for x in xs])
+    
+    def _batchable(self):
+        """ Does .fBatch() compute the same as calling the function, i.e. is it
+        not inherited from a superclass of the one that defines .f() or 
+        .__call__()? Functions that are set on the instance (e.g. by the
+        transformations) take precedence over the methods. """
+        if 'fBatch' in self.__dict__:
+            return True
+        if 'f' in self.__dict__:
+            return False
+        owners = {}
+        for name in ['f', 'fBatch', '__call__']:
+            owners[name] = object
+            for cls in type(self).__mro__:
+                if name in cls.__dict__:
+                    owners[name] = cls
+                    break
+        return (issubclass(owners['fBatch'], owners['f'])
+                and issubclass(owners['fBatch'], owners['__call__']))
+    
     # methods for conforming to the Environment interface:
     def reset(self):
         self.result = None
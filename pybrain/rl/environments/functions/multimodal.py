@@ -2,7 +2,7 @@
 
 __author__ = 'Tom Schaul, tom@idsia.ch'
 
-from scipy import power, exp, cos, sqrt, rand, sin, floor, dot, ones
+from scipy import power, exp, cos, sqrt, rand, sin, floor, dot, ones, arange, minimum
 from math import pi
 
 from function import FunctionEnvironment
@@ -21,6 +21,10 @@ class FunnelFunction(MultiModalFunction):
     def f(self, x):
         return min( dot(x-2.5*ones(self.xdim), x-2.5*ones(self.xdim)), \
             self.funnelDepth * self.xdim + self.funnelSize * dot(x+2.5*ones(self.xdim), x+2.5*ones(self.xdim)) )
+    
+    def fBatch(self, xs):
+        return minimum(((xs-2.5)**2).sum(axis=1), 
+                       self.funnelDepth * self.xdim + self.funnelSize * ((xs+2.5)**2).sum(axis=1))
 
 
 
@@ -38,6 +42,10 @@ class RastriginFunction(MultiModalFunction):
             s += (ai*xi)**2 - 10* cos(2*pi*ai*xi)
         return s + 10*len(x)
     
+    def fBatch(self, xs):
+        a = power(self.a, (arange(xs.shape[1])-1)/(self.xdim-1))
+        return ((a*xs)**2 - 10* cos(2*pi*a*xs)).sum(axis=1) + 10*xs.shape[1]
+    
     
 class WeierstrassFunction(MultiModalFunction):
     def f(self, x):
@@ -50,6 +58,16 @@ class WeierstrassFunction(MultiModalFunction):
             res -= self.xdim * a**k * cos(2*pi*b**k * 0.5)
         return res
     
+    def fBatch(self, xs):
+        a = 0.5
+        b = 3
+        kmax = 20
+        res = 0
+        for k in range(kmax):
+            res += (a**k * cos(2*pi*b**k*(xs+0.5))).sum(axis=1)
+            res -= self.xdim * a**k * cos(2*pi*b**k * 0.5)
+        return res
+    
     
 class AckleyFunction(MultiModalFunction):
     def f(self, x):
@@ -57,6 +75,12 @@ class AckleyFunction(MultiModalFunction):
         res -= exp((1./self.xdim) * sum(cos(2*pi*x)))
         res += 20+exp(1)
         return res
+    
+    def fBatch(self, xs):
+        res = -20 * exp(-0.2*sqrt(1./self.xdim*(xs**2).sum(axis=1)))
+        res -= exp((1./self.xdim) * cos(2*pi*xs).sum(axis=1))
+        res += 20+exp(1)
+        return res
         
         
 class GriewankFunction(MultiModalFunction):
@@ -66,6 +90,10 @@ class GriewankFunction(MultiModalFunction):
             prod *= cos(xi/sqrt(i+1))
         return 1 + sum(x**2)/4000. - prod
     
+    def fBatch(self, xs):
+        prod = cos(xs/sqrt(arange(1, xs.shape[1]+1))).prod(axis=1)
+        return 1 + (xs**2).sum(axis=1)/4000. - prod
+    
             
 class Schwefel_2_13Function(MultiModalFunction):
     def __init__(self, *args, **kwargs):
@@ -82,6 +110,11 @@ class Schwefel_2_13Function(MultiModalFunction):
             res += (Ai-Bix)**2            
         return res
     
+    def fBatch(self, xs):
+        A = dot(self.A, sin(self.alphas)) + dot(self.B, cos(self.alphas))
+        Bx = dot(sin(xs), self.A.T) + dot(cos(xs), self.B.T)
+        return ((A-Bx)**2).sum(axis=1)
+    
     
 class BraninFunction(MultiModalFunction):
     """ Has 3 global optima at (-pi, 12.275), (pi, 2.275), (9.42478, 2.475) """
@@ -101,4 +134,7 @@ class BraninFunction(MultiModalFunction):
     
     def f(self, x):
         return self._a * (x[1]-self._b*x[0]**2+self._c*x[0]-self._d)**2 + self._e * ((1-self._f)*cos(x[0])+1) - self.vopt
+    
+    def fBatch(self, xs):
+        return self.f(xs.T)
 
@@ -23,6 +23,9 @@ class SchBenchmark(MultiObjectiveFunction):
     def f(self, x):
         return -array([x**2, (x-2)**2])
     
+    def fBatch(self, xs):
+        return -array([xs**2, (xs-2)**2]).swapaxes(0, 1)
+    
         
 class FonBenchmark(MultiObjectiveFunction):
     """ Fonesca and Fleming 1993 """
@@ -33,6 +36,11 @@ class FonBenchmark(MultiObjectiveFunction):
         f2 = 1 - exp(-sum((x+1/sqrt(3))**2))
         return -array([f1, f2])
     
+    def fBatch(self, xs):
+        f1 = 1 - exp(-((xs-1/sqrt(3))**2).sum(axis=1))
+        f2 = 1 - exp(-((xs+1/sqrt(3))**2).sum(axis=1))
+        return -array([f1, f2]).T
+    
     
 class PolBenchmark(MultiObjectiveFunction):
     """ Poloni 1997 """
@@ -49,6 +57,9 @@ class PolBenchmark(MultiObjectiveFunction):
         f2 = (x[0]+3)**2 + (x[1]+1)**2
         return -array([f1, f2])
     
+    def fBatch(self, xs):
+        return self.f(xs.T).T
+    
     
 class KurBenchmark(MultiObjectiveFunction):
     """ Kursawe 1990 """
@@ -59,6 +70,11 @@ class KurBenchmark(MultiObjectiveFunction):
         f2 = sum(power(abs(x), 0.8)+5*sin(x**3))
         return -array([f1, f2])
     
+    def fBatch(self, xs):
+        f1 = (-10*exp(-0.2*sqrt(xs[:, :-1]**2+xs[:, 1:]**2))).sum(axis=1)
+        f2 = (power(abs(xs), 0.8)+5*sin(xs**3)).sum(axis=1)
+        return -array([f1, f2]).T
+    
     
     
         
\ No newline at end of file
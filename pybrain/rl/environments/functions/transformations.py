@@ -16,6 +16,8 @@ def oppositeFunction(basef):
         else:
             res = FitnessEvaluator()        
         res.f = lambda x:-basef.f(x)
+        if isinstance(basef, FunctionEnvironment) and basef._batchable():
+            res.fBatch = lambda xs:-basef.fBatch(xs)
         if not basef.desiredValue is None:
             res.desiredValue = -basef.desiredValue
         res.toBeMinimized = not basef.toBeMinimized
@@ -41,6 +43,8 @@ class TranslateFunction(FunctionEnvironment):
                 x = x.params
             return basef.f(x - offset)
         self.f = tf
+        if basef._batchable():
+            self.fBatch = lambda xs: basef.fBatch(xs - offset)
     
 
 class RotateFunction(FunctionEnvironment):
@@ -63,6 +67,8 @@ class RotateFunction(FunctionEnvironment):
                 x = x.params
             return basef.f(dot(x, self.M))    
         self.f = rf
+        if basef._batchable():
+            self.fBatch = lambda xs: basef.fBatch(dot(xs, self.M))
         
     
 class CompositionFunction(FunctionEnvironment):
@@ -2,7 +2,7 @@
 
 __author__ = 'Tom Schaul, tom@idsia.ch'
 
-from math import sqrt
+from scipy import sqrt
 
 from function import FunctionEnvironment
 
@@ -17,14 +17,23 @@ class LinearFunction(UnboundedFunctionEnvironment):
     def f(self, x):
         return sum(x)
     
+    def fBatch(self, xs):
+        return xs.sum(axis=1)
+    
     
 class ParabRFunction(UnboundedFunctionEnvironment):
     def f(self, x):
         return -x[0] + 100 * sum(x[1:]**2)
+    
+    def fBatch(self, xs):
+        return -xs[:, 0] + 100 * (xs[:, 1:]**2).sum(axis=1)
         
         
 class SharpRFunction(UnboundedFunctionEnvironment):
     def f(self, x):
         return -x[0] + 100*sqrt(sum(x[1:]**2))
     
+    def fBatch(self, xs):
+        return -xs[:, 0] + 100*sqrt((xs[:, 1:]**2).sum(axis=1))
+    
     
\ No newline at end of file
@@ -2,7 +2,7 @@
 
 __author__ = 'Tom Schaul, tom@idsia.ch'
 
-from scipy import ones, sqrt
+from scipy import ones, sqrt, arange, cumsum
 from numpy.linalg.linalg import norm
 
 from function import FunctionEnvironment
@@ -12,6 +12,9 @@ class SphereFunction(FunctionEnvironment):
     def f(self, x):
         return sum((x-self.xopt)**2)
     
+    def fBatch(self, xs):
+        return ((xs-self.xopt)**2).sum(axis=1)
+    
 
 class SchwefelFunction(FunctionEnvironment):
     def f(self, x):
@@ -20,12 +23,18 @@ class SchwefelFunction(FunctionEnvironment):
             s += sum(x[:i])**2
         return s
     
+    def fBatch(self, xs):
+        return (cumsum(xs[:, :-1], axis=1)**2).sum(axis=1)
+    
 
 class CigarFunction(FunctionEnvironment):
     xdimMin = 2
     
     def f(self, x):
         return x[0]**2 + 1e6*sum(x[1:]**2)
+    
+    def fBatch(self, xs):
+        return xs[:, 0]**2 + 1e6*(xs[:, 1:]**2).sum(axis=1)
 
 
 class TabletFunction(FunctionEnvironment):
@@ -33,6 +42,9 @@ class TabletFunction(FunctionEnvironment):
     
     def f(self, x):
         return 1e6*x[0]**2 + sum(x[1:]**2)
+    
+    def fBatch(self, xs):
+        return 1e6*xs[:, 0]**2 + (xs[:, 1:]**2).sum(axis=1)
                                             
 
 class ElliFunction(FunctionEnvironment):
@@ -41,6 +53,10 @@ class ElliFunction(FunctionEnvironment):
         for i in range(len(x)):
             s += (x[i] * 1000**(i/(len(x)-1)))**2
         return s        
+    
+    def fBatch(self, xs):
+        n = xs.shape[1]
+        return ((xs * 1000**(arange(n)/(n-1)))**2).sum(axis=1)
         
                 
 class DiffPowFunction(FunctionEnvironment):
@@ -51,6 +67,10 @@ class DiffPowFunction(FunctionEnvironment):
             s += abs(x[i])**(2+10*i/(len(x)-1))
         return s
     
+    def fBatch(self, xs):
+        n = xs.shape[1]
+        return (abs(xs)**(2+10*arange(n)/(n-1))).sum(axis=1)
+    
     
 class RosenbrockFunction(FunctionEnvironment):
     """ Banana-shaped function with a tricky optimum in the valley at 1,1. """
@@ -69,6 +89,9 @@ class RosenbrockFunction(FunctionEnvironment):
             s += 100 * (x[i]**2 - x[i+1])**2 + (x[i]-1)**2
         return s
     
+    def fBatch(self, xs):
+        return (100 * (xs[:, :-1]**2 - xs[:, 1:])**2 + (xs[:, :-1]-1)**2).sum(axis=1)
+    
 class GlasmachersFunction(FunctionEnvironment):
     """ Tricky! Designed to make most algorithms fail. """
     c = .1
@@ -80,4 +103,10 @@ class GlasmachersFunction(FunctionEnvironment):
         b = norm(x[m:])
         return a + b + sqrt(2*a*b+b**2)
     
+    def fBatch(self, xs):
+        m = self.xdim/2
+        a = self.c * sqrt((xs[:, :m]**2).sum(axis=1))
+        b = sqrt((xs[:, m:]**2).sum(axis=1))
+        return a + b + sqrt(2*a*b+b**2)
+    
     
\ No newline at end of file
@@ -1,17 +1,21 @@
 __author__ = 'Tom Schaul, tom@idsia.ch'
 
 from random import choice
-from scipy import zeros
+from scipy import zeros, ones, array, flatnonzero
 
 from twoplayergame import TwoPlayerGame
 
 
-# TODO: undo operation
-
-
 class CaptureGame(TwoPlayerGame):
     """ the capture game is a simplified version of the Go game: the first player to capture a stone wins!
-    Pass moves are forbidden."""
+    Pass moves are forbidden.
+    
+    The stones are kept in a union-find forest (by index of their position), 
+    whose roots carry the size and the id of their group, and the liberties of 
+    every group are updated incrementally. Boolean arrays over the positions 
+    tell which ones are empty, and how many empty neighbors they have, so that
+    the legal moves are found without scanning the board. Moves can be undone, 
+    and copies are cheap. """
     # CHECKME: suicide allowed?
     
     BLACK = 1
@@ -24,6 +28,9 @@ class CaptureGame(TwoPlayerGame):
         """ the size of the board is generally between 3 and 19. """
         self.size = size
         self.suicideenabled = suicideenabled
+        self._positions = list(self._iterPos())
+        self._index = dict((p, i) for i, p in enumerate(self._positions))
+        self._nbs = dict((p, tuple(self._neighbors(p))) for p in self._positions)
         self.reset()
                 
     def _iterPos(self):
@@ -36,13 +43,26 @@ class CaptureGame(TwoPlayerGame):
         """ empty the board. """
         TwoPlayerGame.reset(self)
         self.movesDone = 0
-        self.b = {}
-        for p in self._iterPos():
-            self.b[p] = self.EMPTY
-        # which stone belongs to which group
-        self.groups = {}
+        self.b = dict.fromkeys(self._positions, self.EMPTY)
+        self._empty = ones(len(self._positions), dtype=bool)
+        self._freeNeighbors = array([len(self._nbs[p]) for p in self._positions])
+        self._boardArray = zeros(self.outdim)
+        # union-find forest of the stones, with the size and id of the groups 
+        # at the roots
+        self._parent = {}
+        self._sizes = {}
+        self._ids = {}
+        # the stones, in the order they were set
+        self._stones = []
         # how many liberties does each group have
         self.liberties = {}
+        # what every move changed, to undo it
+        self._journal = []
+    
+    @property
+    def groups(self):
+        """ which stone belongs to which group """
+        return dict((self._positions[i], self._ids[self._find(i)]) for i in self._stones)
     
     @property
     def indim(self):
@@ -55,13 +75,7 @@ class CaptureGame(TwoPlayerGame):
     def getBoardArray(self):
         """ an array with thow boolean values per position, indicating 
         'white stone present' and 'black stone present' respectively. """
-        a = zeros(self.outdim)
-        for i, p in enumerate(self._iterPos()):
-            if self.b[p] == self.WHITE:
-                a[2 * i] = 1
-            elif self.b[p] == self.BLACK:
-                a[2 * i + 1] = 1                
-        return a
+        return self._boardArray.copy()
     
     def isLegal(self, c, pos):
         if pos not in self.b:
@@ -77,23 +91,57 @@ class CaptureGame(TwoPlayerGame):
         returns True if the move was legal. """  
         self.movesDone += 1 
         if pos == 'resign':
+            self._journal.append(None)
             self.winner = -c
             return True
         elif not self.isLegal(c, pos):
+            self._journal.append(None)
             return False
         elif self._suicide(c, pos):
             assert self.suicideenabled
-            self.b[pos] = 'y'
+            self._mark(pos, 'y')
             self.winner = -c
             return True            
         elif self._capture(c, pos):
             self.winner = c
-            self.b[pos] = 'x'
+            self._mark(pos, 'x')
             return True
         else:
-            self._setStone(c, pos)            
+            self._journal.append((pos, self._setStone(c, pos)))
             return True
         
+    def undoMove(self):
+        """ undo the last move done by doMove(). """
+        self.movesDone -= 1
+        entry = self._journal.pop()
+        self.winner = None
+        if entry is None:
+            return
+        pos, changes = entry
+        if changes is not None:
+            self._removeStone(pos, changes)
+        else:
+            self.b[pos] = self.EMPTY
+            self._empty[self._index[pos]] = True
+            for n in self._nbs[pos]:
+                self._freeNeighbors[self._index[n]] += 1
+            
+    def copy(self):
+        """ an independent copy of the game (whose moves up to now cannot be undone). """
+        res = self.__class__.__new__(self.__class__)
+        res.__dict__.update(self.__dict__)
+        res.b = self.b.copy()
+        res._empty = self._empty.copy()
+        res._freeNeighbors = self._freeNeighbors.copy()
+        res._boardArray = self._boardArray.copy()
+        res._parent = self._parent.copy()
+        res._sizes = self._sizes.copy()
+        res._ids = self._ids.copy()
+        res._stones = self._stones[:]
+        res.liberties = dict((g, set(l)) for g, l in self.liberties.iteritems())
+        res._journal = []
+        return res
+        
     def getSensors(self):
         """ just a list of the board position states. """
         return map(lambda x: x[1], sorted(self.b.items()))
@@ -128,49 +176,133 @@ class CaptureGame(TwoPlayerGame):
         if pos[0] > 0: res.append((pos[0] - 1, pos[1]))
         return res
     
+    def _find(self, i):
+        """ the root of the tree of the stone with index i. """
+        parent = self._parent
+        while parent[i] != i:
+            i = parent[i]
+        return i
+    
+    def _group(self, pos):
+        """ the id of the group of the stone at pos. """
+        return self._ids[self._find(self._index[pos])]
+    
+    def _mark(self, pos, symbol):
+        """ put a symbol for the final move on the board. """
+        self.b[pos] = symbol
+        self._empty[self._index[pos]] = False
+        for n in self._nbs[pos]:
+            self._freeNeighbors[self._index[n]] -= 1
+        self._journal.append((pos, None))
+    
     def _setStone(self, c, pos):
-        """ set stone, and update liberties and groups. """
-        self.b[pos] = c
-        merge = False
-        self.groups[pos] = self.size * pos[0] + pos[1]
-        freen = filter(lambda n: self.b[n] == self.EMPTY, self._neighbors(pos))
-        self.liberties[self.groups[pos]] = set(freen)
-        for n in self._neighbors(pos):
-            if self.b[n] == -c:
-                self.liberties[self.groups[n]].difference_update([pos])             
-            elif self.b[n] == c:
-                if merge:                    
-                    newg = self.groups[pos]
-                    oldg = self.groups[n]
-                    if newg == oldg:
-                        self.liberties[newg].difference_update([pos])                        
-                    else:
-                        # merging 2 groups
-                        for p in self.groups.keys():
-                            if self.groups[p] == oldg:
-                                self.groups[p] = newg
-                        self.liberties[newg].update(self.liberties[oldg])
-                        self.liberties[newg].difference_update([pos])
-                        del self.liberties[oldg]
-                else:
+        """ set stone, and update liberties and groups. Returns the list of 
+        changes to the groups, for undoing it. """
+        b = self.b
+        liberties = self.liberties
+        parent = self._parent
+        sizes = self._sizes
+        i = self._index[pos]
+        nbs = self._nbs[pos]
+        b[pos] = c
+        self._empty[i] = False
+        for n in nbs:
+            self._freeNeighbors[self._index[n]] -= 1
+        self._boardArray[2 * i + (c == self.BLACK)] = 1
+        
+        changes = []
+        self._stones.append(i)
+        parent[i] = i
+        sizes[i] = 1
+        self._ids[i] = i
+        freen = [n for n in nbs if b[n] == self.EMPTY]
+        liberties[i] = set(freen)
+        root = None
+        for n in nbs:
+            if b[n] == -c:
+                g = self._group(n)
+                if pos in liberties[g]:
+                    liberties[g].remove(pos)
+                    changes.append(('taken', g))
+            elif b[n] == c:
+                r = self._find(self._index[n])
+                g = self._ids[r]
+                if root is None:
                     # connect to this group
-                    del self.liberties[self.groups[pos]]
-                    self.groups[pos] = self.groups[n]
-                    self.liberties[self.groups[n]].update(freen)
-                    self.liberties[self.groups[n]].difference_update([pos])
-                    merge = True                    
+                    del liberties[i], sizes[i], self._ids[i]
+                    parent[i] = r
+                    sizes[r] += 1
+                    added = [f for f in freen if f not in liberties[g]]
+                    liberties[g].update(added)
+                    liberties[g].remove(pos)
+                    changes.append(('joined', r, added))
+                    root = r
+                elif r != root:
+                    # merging 2 groups, which keeps the id of the first one
+                    newg = self._ids[root]
+                    oldlibs = liberties.pop(g)
+                    added = oldlibs.difference(liberties[newg])
+                    added.discard(pos)
+                    liberties[newg].update(added)
+                    changes.append(('merged', newg, g, oldlibs, added))
+                    # the smaller tree goes below the root of the larger one
+                    if sizes[root] < sizes[r]:
+                        root, r = r, root
+                        self._ids[root] = newg
+                        changes.append(('union', root, r, g))
+                    else:
+                        changes.append(('union', root, r, None))
+                    parent[r] = root
+                    sizes[root] += sizes[r]
+        return changes
+    
+    def _removeStone(self, pos, changes):
+        """ undo the setting of a stone, given its changes. """
+        liberties = self.liberties
+        parent = self._parent
+        sizes = self._sizes
+        i = self._index[pos]
+        for change in reversed(changes):
+            kind = change[0]
+            if kind == 'taken':
+                liberties[change[1]].add(pos)
+            elif kind == 'joined':
+                _, r, added = change
+                libs = liberties[self._ids[r]]
+                libs.difference_update(added)
+                libs.add(pos)
+                sizes[r] -= 1
+            elif kind == 'merged':
+                _, newg, g, oldlibs, added = change
+                liberties[newg].difference_update(added)
+                liberties[g] = oldlibs
+            else:
+                _, root, r, oldid = change
+                parent[r] = r
+                sizes[root] -= sizes[r]
+                if oldid is not None:
+                    self._ids[root] = oldid
+        self._stones.pop()
+        del parent[i]
+        sizes.pop(i, None)
+        self._ids.pop(i, None)
+        liberties.pop(i, None)
+        self.b[pos] = self.EMPTY
+        self._empty[i] = True
+        for n in self._nbs[pos]:
+            self._freeNeighbors[self._index[n]] += 1
+        self._boardArray[2 * i:2 * i + 2] = 0
     
     def _suicide(self, c, pos):
         """ would putting a stone here be suicide for c? """
         # any free neighbors?
-        for n in self._neighbors(pos):
-            if self.b[n] == self.EMPTY:
-                return False
+        if self._freeNeighbors[self._index[pos]] > 0:
+            return False
         
         # any friendly neighbor with extra liberties?    
-        for n in self._neighbors(pos):
+        for n in self._nbs[pos]:
             if self.b[n] == c:
-                if len(self.liberties[self.groups[n]]) > 1:
+                if len(self.liberties[self._group(n)]) > 1:
                     return False
                 
         # capture all surrounding ennemies?
@@ -181,9 +313,9 @@ class CaptureGame(TwoPlayerGame):
         
     def _capture(self, c, pos):
         """ would putting a stone here lead to a capture? """
-        for n in self._neighbors(pos):
+        for n in self._nbs[pos]:
             if self.b[n] == -c:
-                if len(self.liberties[self.groups[n]]) == 1:
+                if len(self.liberties[self._group(n)]) == 1:
                     return True
         return False
     
@@ -191,26 +323,42 @@ class CaptureGame(TwoPlayerGame):
         """ how many liberties does the stone at pos have? """
         if self.b[pos] == self.EMPTY:
             return None
-        return len(self.liberties[self.groups[pos]])
+        return len(self.liberties[self._group(pos)])
     
     def getGroupSize(self, pos):
         """ what size is the worm that this stone is part of? """
         if self.b[pos] == self.EMPTY:
             return None
-        g = self.groups[pos]
-        return len(filter(lambda x: x == g, self.groups.values()))
+        return self._sizes[self._find(self._index[pos])]
+    
+    def _positionsOf(self, mask):
+        return [self._positions[i] for i in flatnonzero(mask)]
     
     def getLegals(self, c):
         """ return all the legal positions for a color """
-        return filter(lambda p: self.b[p] == self.EMPTY, self._iterPos())
+        return self._positionsOf(self._empty)
+        
+    def _acceptableMask(self, c):
+        mask = self._empty.copy()
+        # only positions without free neighbors can be suicide
+        for i in flatnonzero(mask & (self._freeNeighbors == 0)):
+            if self._suicide(c, self._positions[i]):
+                mask[i] = False
+        return mask
         
     def getAcceptable(self, c):
         """ return all legal positions for a color that don't commit suicide. """
-        return filter(lambda p: not self._suicide(c, p), self.getLegals(c))
+        return self._positionsOf(self._acceptableMask(c))
     
     def getKilling(self, c):
         """ return all legal positions for a color that immediately kill the opponent. """
-        return filter(lambda p: self._capture(c, p), self.getAcceptable(c))
+        # these are the last liberties of the opponent's groups
+        mask = zeros(len(self._positions), dtype=bool)
+        for g, libs in self.liberties.iteritems():
+            if len(libs) == 1 and self.b[self._positions[g]] == -c:
+                for p in libs:
+                    mask[self._index[p]] = True
+        return self._positionsOf(mask & self._empty)
     
     def randomBoard(self, nbmoves):
         """ produce a random, undecided and legal capture-game board, after at most nbmoves. 
@@ -1,13 +1,18 @@
 __author__ = 'Tom Schaul, tom@idsia.ch'
 
-from scipy import zeros
+from scipy import zeros, ones, array, flatnonzero
 
 from twoplayergame import TwoPlayerGame
 
 # TODO: factor out the similarities with the CaptureGame and Go.
 
 class GomokuGame(TwoPlayerGame):
-    """ The game of Go-Moku, alias Connect-Five. """
+    """ The game of Go-Moku, alias Connect-Five. 
+    
+    The rows through every position are precomputed, and arrays over the 
+    positions keep track of the empty ones, and of how many stones of each 
+    color they touch, so that only the candidates for a killing move are 
+    checked. Moves can be undone, and copies are cheap. """
     
     BLACK = 1
     WHITE = -1
@@ -15,11 +20,21 @@ class GomokuGame(TwoPlayerGame):
     
     startcolor = BLACK
     
+    _dirs = [(0, 1), (1, 0), (1, 1), (1, -1)]
+    
     def __init__(self, size):
         """ the size of the board is a tuple, where each dimension must be minimum 5. """        
         self.size = size
         assert size[0] >= 5
         assert size[1] >= 5        
+        self._positions = list(self._iterPos())
+        self._index = dict((p, i) for i, p in enumerate(self._positions))
+        # the next 4 positions in both ways of each direction
+        self._rays = dict((p, [(self._ray(p, dir, -1), self._ray(p, dir, 1)) for dir in self._dirs])
+                          for p in self._positions)
+        # the indices of the (up to 8) surrounding positions
+        self._around = dict((p, array([self._index[r[0]] for rs in self._rays[p] for r in rs if r]))
+                            for p in self._positions)
         self.reset()
                 
     def _iterPos(self):
@@ -27,29 +42,41 @@ class GomokuGame(TwoPlayerGame):
         for i in range(self.size[0]):
             for j in range(self.size[1]):            
                 yield (i, j)
+                
+    def _ray(self, pos, dir, d):
+        """ the next 4 positions on the board, going from pos in direction dir * d. """
+        res = []
+        for i in range(1, 5):
+            next = (pos[0] + dir[0] * i * d, pos[1] + dir[1] * i * d)
+            if (next[0] < 0 or next[0] >= self.size[0]
+                or next[1] < 0 or next[1] >= self.size[1]):
+                break
+            res.append(next)
+        return tuple(res)
 
     def reset(self):
         """ empty the board. """
         TwoPlayerGame.reset(self)
         self.movesDone = 0
-        self.b = {}
-        for p in self._iterPos():
-            self.b[p] = self.EMPTY
+        self.b = dict.fromkeys(self._positions, self.EMPTY)
+        n = len(self._positions)
+        self._empty = ones(n, dtype=bool)
+        self._boardArray = zeros(self.outdim)
+        # how many stones of each color surround every position
+        self._adjacent = {self.BLACK: zeros(n, dtype=int), self.WHITE: zeros(n, dtype=int)}
+        # the moves done, to undo them
+        self._journal = []
 
     def _fiveRow(self, color, pos):
         """ Is this placement the 5th in a row? """
-        # TODO: more efficient...
-        for dir in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+        b = self.b
+        for rays in self._rays[pos]:
             found = 1
-            for d in [-1, 1]:
-                for i in range(1, 5):
-                    next = (pos[0] + dir[0] * i * d, pos[1] + dir[1] * i * d)
-                    if (next[0] < 0 or next[0] >= self.size[0]
-                        or next[1] < 0 or next[1] >= self.size[1]
-                        or self.b[next] != color):
+            for ray in rays:
+                for next in ray:
+                    if b[next] != color:
                         break
-                    else:
-                        found += 1                    
+                    found += 1                    
             if found >= 5:
                 return True
         return False
@@ -65,13 +92,7 @@ class GomokuGame(TwoPlayerGame):
     def getBoardArray(self):
         """ an array with thow boolean values per position, indicating 
         'white stone present' and 'black stone present' respectively. """
-        a = zeros(self.outdim)
-        for i, p in enumerate(self._iterPos()):
-            if self.b[p] == self.WHITE:
-                a[2 * i] = 1
-            elif self.b[p] == self.BLACK:
-                a[2 * i + 1] = 1                
-        return a
+        return self._boardArray.copy()
     
     def isLegal(self, c, pos):
         return self.b[pos] == self.EMPTY
@@ -81,18 +102,47 @@ class GomokuGame(TwoPlayerGame):
         returns True if the move was legal. """  
         self.movesDone += 1         
         if not self.isLegal(c, pos):
+            self._journal.append(None)
             return False
         elif self._fiveRow(c, pos):
             self.winner = c
-            self.b[pos] = 'x'
+            self._mark(pos, 'x')
             return True
         else:
             self._setStone(c, pos)            
+            self._journal.append((pos, c, ()))
             if self.movesDone == self.size[0] * self.size[1]:
                 # DRAW
                 self.winner = self.DRAW
             return True
         
+    def undoMove(self):
+        """ undo the last move done by doMove(). """
+        self.movesDone -= 1
+        self.winner = None
+        entry = self._journal.pop()
+        if entry is None:
+            return
+        pos, c, killed = entry
+        if c is None:
+            self.b[pos] = self.EMPTY
+            self._empty[self._index[pos]] = True
+        else:
+            self._removeStone(pos)
+            for p in killed:
+                GomokuGame._setStone(self, -c, p)
+                
+    def copy(self):
+        """ an independent copy of the game (whose moves up to now cannot be undone). """
+        res = self.__class__.__new__(self.__class__)
+        res.__dict__.update(self.__dict__)
+        res.b = self.b.copy()
+        res._empty = self._empty.copy()
+        res._boardArray = self._boardArray.copy()
+        res._adjacent = dict((c, a.copy()) for c, a in self._adjacent.iteritems())
+        res._journal = []
+        return res
+        
     def getSensors(self):
         """ just a list of the board position states. """
         return map(lambda x: x[1], sorted(self.b.items()))
@@ -127,17 +177,40 @@ class GomokuGame(TwoPlayerGame):
         if pos[0] > 0: res.append((pos[0] - 1, pos[1]))
         return res
     
+    def _mark(self, pos, symbol):
+        """ put a symbol for the final move on the board. """
+        self.b[pos] = symbol
+        self._empty[self._index[pos]] = False
+        self._journal.append((pos, None, ()))
+    
     def _setStone(self, c, pos):
         """ set stone """
+        i = self._index[pos]
         self.b[pos] = c
+        self._empty[i] = False
+        self._boardArray[2 * i + (c == self.BLACK)] = 1
+        self._adjacent[c][self._around[pos]] += 1
+        
+    def _removeStone(self, pos):
+        """ take the stone away """
+        i = self._index[pos]
+        self._adjacent[self.b[pos]][self._around[pos]] -= 1
+        self.b[pos] = self.EMPTY
+        self._empty[i] = True
+        self._boardArray[2 * i:2 * i + 2] = 0
+    
+    def _positionsOf(self, mask):
+        return [self._positions[i] for i in flatnonzero(mask)]
     
     def getLegals(self, c):
         """ return all the legal positions for a color """
-        return filter(lambda p: self.b[p] == self.EMPTY, self._iterPos())
+        return self._positionsOf(self._empty)
             
     def getKilling(self, c):
         """ return all legal positions for a color that immediately kill the opponent. """
-        return filter(lambda p: self._fiveRow(c, p), self.getLegals(c))
+        # only positions next to a stone of that color can complete a row
+        candidates = self._positionsOf(self._empty & (self._adjacent[c] > 0))
+        return [p for p in candidates if self._fiveRow(c, p)]
         
     def playToTheEnd(self, p1, p2):
         """ alternate playing moves between players until the game is over. """
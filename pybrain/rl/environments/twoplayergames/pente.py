@@ -22,7 +22,8 @@ class PenteGame(GomokuGame):
     def getKilling(self, c):
         """ return all legal positions for a color that immediately kill the opponent. """
         res = GomokuGame.getKilling(self, c)
-        for p in self.getLegals(c):
+        # only positions next to an enemy stone can capture
+        for p in self._positionsOf(self._empty & (self._adjacent[-c] > 0)):
             k = self._killsWhich(c, p)
             if self.pairsTaken[c] + len(k) / 2 >= 5:
                 res.append(p) 
@@ -31,14 +32,11 @@ class PenteGame(GomokuGame):
     def _killsWhich(self, c, pos):
         """ placing a stone of color c at pos would kill which enemy stones? """
         res = []
-        for dir in [(0, 1), (1, 0), (1, 1), (1, -1)]:
-            for d in [-1, 1]:
+        for rays in self._rays[pos]:
+            for ray in rays:
                 killcands = []
-                for i in [1, 2, 3]:
-                    next = (pos[0] + dir[0] * i * d, pos[1] + dir[1] * i * d)
-                    if (next[0] < 0 or next[0] >= self.size[0]
-                        or next[1] < 0 or next[1] >= self.size[1]):
-                        break
+                for i, next in enumerate(ray[:3]):
+                    i += 1
                     if i == 3 and self.b[next] == c:
                         res += killcands
                         break
@@ -52,19 +50,21 @@ class PenteGame(GomokuGame):
         returns True if the move was legal. """
         self.movesDone += 1         
         if not self.isLegal(c, pos):
+            self._journal.append(None)
             return False
         elif self._fiveRow(c, pos):
             self.winner = c
-            self.b[pos] = 'x'
+            self._mark(pos, 'x')
             return True        
         else:           
             tokill = self._killsWhich(c, pos)
             if self.pairsTaken[c] + len(tokill) / 2 >= 5:
                 self.winner = c
-                self.b[pos] = 'x' 
+                self._mark(pos, 'x')
                 return True 
             
             self._setStone(c, pos, tokill)     
+            self._journal.append((pos, c, tokill))
             if self.movesDone == (self.size[0] * self.size[1] 
                                   + 2 * (self.pairsTaken[self.BLACK] + self.pairsTaken[self.WHITE])):
                 # DRAW
@@ -77,8 +77,21 @@ class PenteGame(GomokuGame):
             tokill = self._killsWhich(c, pos)
         GomokuGame._setStone(self, c, pos)
         for p in tokill:
-            self.b[p] = self.EMPTY
+            self._removeStone(p)
         self.pairsTaken[c] += len(tokill) / 2
+        
+    def undoMove(self):
+        entry = self._journal[-1]
+        GomokuGame.undoMove(self)
+        if entry is not None:
+            pos, c, killed = entry
+            if c is not None:
+                self.pairsTaken[c] -= len(killed) / 2
+                
+    def copy(self):
+        res = GomokuGame.copy(self)
+        res.pairsTaken = self.pairsTaken.copy()
+        return res
 
     def __str__(self):
         s = GomokuGame.__str__(self)
@@ -1,3 +1,4 @@
 from experiment import Experiment
 from episodic import EpisodicExperiment
-from continuous import ContinuousExperiment
\ No newline at end of file
+from continuous import ContinuousExperiment
+from vector import VectorExperiment
\ No newline at end of file
@@ -1,8 +1,51 @@
 __author__ = 'Tom Schaul, tom@idsia.ch'
 
+from copy import deepcopy
+
+from scipy import array, random
 
 from pybrain.rl.experiments.experiment import Experiment
 from pybrain.rl.agents.optimization import OptimizationAgent
+from pybrain.utilities import callSeeded
+
+
+class _Rollouts(object):
+    """ Callable that runs a number of episodes with a module on a task, for 
+    use with an executor. It does not depend on the experiment or the agent, so
+    it can be pickled and sent to other processes. """
+
+    def __init__(self, task, module, explorer = None):
+        self.task = task
+        self.module = module
+        self.explorer = explorer
+
+    def __call__(self, job):
+        """ Run the episodes of a job, given as (seed, number of episodes), and
+        return the states, actions and rewards of each episode as arrays. """
+        seed, number = job
+        return callSeeded(seed, self._run, number)
+        
+    def _run(self, number):
+        # every job works on its own copies of the task, module and explorer
+        task, module, explorer = deepcopy((self.task, self.module, self.explorer))
+        episodes = []
+        for _ in range(number):
+            module.reset()
+            task.reset()
+            if explorer is not None:
+                explorer.newEpisode()
+            states, actions, rewards = [], [], []
+            while not task.isFinished():
+                state = task.getObservation()
+                action = module.activate(state)
+                if explorer is not None:
+                    action = explorer.activate(state, action)
+                task.performAction(action)
+                states.append(state)
+                actions.append(action)
+                rewards.append(task.getReward())
+            episodes.append((array(states), array(actions), array(rewards)))
+        return episodes
 
 
 class EpisodicExperiment(Experiment):
@@ -10,6 +53,17 @@ class EpisodicExperiment(Experiment):
     
     doOptimization = False
     
+    #: Object with a map(function, sequence) method, used to run episodes in 
+    #: parallel, e.g. a multiprocessing.Pool (which requires the task and the 
+    #: agent's module to be picklable). By default, they are run one by one.
+    #: Every job seeds the random generators, so the results do not depend on
+    #: the executor; within a single process (e.g. a ThreadPool), the jobs 
+    #: therefore run one at a time.
+    executor = None
+    
+    #: number of episodes that are run in a row by a job of the executor
+    episodesPerJob = 1
+    
     def __init__(self, task, agent):
         if isinstance(agent, OptimizationAgent):
             self.doOptimization = True
@@ -29,8 +83,12 @@ class EpisodicExperiment(Experiment):
     def doEpisodes(self, number = 1):
         """ Do one episode, and return the rewards of each step as a list. """
         if self.doOptimization:
+            if self.executor is not None:
+                self.optimizer.executor = self.executor
             self.optimizer.maxEvaluations += number
             self.optimizer.learn()
+        elif self.executor is not None:
+            return self._doEpisodesInParallel(number)
         else:            
             all_rewards = []
             for dummy in range(number):
@@ -44,4 +102,22 @@ class EpisodicExperiment(Experiment):
                 all_rewards.append(rewards)
           
             return all_rewards
-        
\ No newline at end of file
+        
+    def _doEpisodesInParallel(self, number):
+        """ Run the episodes in jobs of the executor, and store them in the 
+        agent's history in order. """
+        learning = getattr(self.agent, 'learning', False)
+        explorer = self.agent.learner.explorer if learning else None
+        rollouts = _Rollouts(self.task, self.agent.module, explorer)
+        jobs = []
+        while number > 0:
+            jobs.append((random.randint(2 ** 31 - 1), min(number, self.episodesPerJob)))
+            number -= self.episodesPerJob
+        all_rewards = []
+        for episodes in self.executor.map(rollouts, jobs):
+            for states, actions, rewards in episodes:
+                self.agent.storeEpisode(states, actions, rewards)
+                if learning:
+                    self.agent.learner.addExploredSamples(states, actions)
+                all_rewards.append(list(rewards))
+        return all_rewards
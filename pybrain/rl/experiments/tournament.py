@@ -1,7 +1,63 @@
 __author__ = 'Tom Schaul, tom@idsia.ch'
 
+from copy import deepcopy
+
+from scipy import random
+
 from pybrain.rl.environments.twoplayergames.twoplayergame import TwoPlayerGame
-from pybrain.utilities import Named
+from pybrain.utilities import Named, callSeeded
+
+
+def _playGame(env, p1, p2, forcedLegality=False):
+    """ play one game between two agents p1 and p2 (starting), and return the 
+    color of the winner. """
+    env.reset()
+    players = (p1, p2)
+    p1.color = env.startcolor
+    p2.color = -p1.color
+    p1.newEpisode()
+    p2.newEpisode()
+    i = 0
+    while not env.gameOver():
+        p = players[i]
+        i = (i + 1) % 2 # alternate      
+        act = p.getAction()
+        
+        if forcedLegality:
+            tries = 0
+            while not env.isLegal(*act):
+                tries += 1
+                # CHECKME: maybe the legality check is too specific?
+                act = p.getAction()                
+                if tries > 50:
+                    raise Exception('No legal move produced!')
+            
+        env.performAction(act)            
+    return env.getWinner()
+
+
+class _Games(object):
+    """ Callable that plays a number of games between two agents, for use with 
+    an executor. It does not depend on the tournament, so it can be pickled and
+    sent to other processes. """
+    
+    def __init__(self, env, forcedLegality=False):
+        self.env = env
+        self.forcedLegality = forcedLegality
+        
+    def __call__(self, job):
+        """ Play the games of a job, given as (seed, p1, p2, number of games), 
+        and return for each one whether p1 won it. """
+        seed, p1, p2, number = job
+        return callSeeded(seed, self._play, p1, p2, number)
+        
+    def _play(self, p1, p2, number):
+        # every job works on its own copies of the game and the agents
+        env, p1, p2 = deepcopy((self.env, p1, p2))
+        p1.game = env
+        p2.game = env
+        return [_playGame(env, p1, p2, self.forcedLegality) == p1.color 
+                for _ in range(number)]
 
 
 class Tournament(Named):
@@ -11,6 +67,15 @@ class Tournament(Named):
     # do all moves need to be checked for legality?
     forcedLegality = False
     
+    #: Object with a map(function, sequence) method, used to play the games in
+    #: parallel (all those between the same two agents in one job), e.g. a 
+    #: multiprocessing.Pool (which requires the agents to be picklable). 
+    #: Every job plays with its own copies of the game and the agents, and 
+    #: seeds the random generators, so the results do not depend on the 
+    #: executor; within a single process (e.g. a ThreadPool), the jobs 
+    #: therefore run one at a time.
+    executor = None
+    
     def __init__(self, env, agents):
         assert isinstance(env, TwoPlayerGame)
         self.startcolor = env.startcolor
@@ -38,33 +103,14 @@ class Tournament(Named):
     def _oneGame(self, p1, p2):
         """ play one game between two agents p1 and p2."""
         self.numGames += 1
-        self.env.reset()
+        wincolor = _playGame(self.env, p1, p2, self.forcedLegality)
+        self._addResult(p1, p2, wincolor == p1.color)
+        
+    def _addResult(self, p1, p2, p1won):
         players = (p1, p2)
-        p1.color = self.startcolor
-        p2.color = -p1.color
-        p1.newEpisode()
-        p2.newEpisode()
-        i = 0
-        while not self.env.gameOver():
-            p = players[i]
-            i = (i + 1) % 2 # alternate      
-            act = p.getAction()
-            
-            if self.forcedLegality:
-                tries = 0
-                while not self.env.isLegal(*act):
-                    tries += 1
-                    # CHECKME: maybe the legality check is too specific?
-                    act = p.getAction()                
-                    if tries > 50:
-                        raise Exception('No legal move produced!')
-                
-            self.env.performAction(act)            
-            
         if players not in self.results: 
             self.results[players] = []
-        wincolor = self.env.getWinner()
-        if wincolor == p1.color:
+        if p1won:
             winner = p1
         else:
             winner = p2
@@ -72,12 +118,27 @@ class Tournament(Named):
         
     def organize(self, repeat=1):
         """ have all agents play all others in all orders, and repeat. """
+        if self.executor is not None:
+            return self._organizeInParallel(repeat)
         for dummy in range(repeat):
             self.rounds += 1
             for p1, p2 in self._produceAllPairs():
                 self._oneGame(p1, p2)
         return self.results
     
+    def _organizeInParallel(self, repeat):
+        """ have the executor play all the games between each pair of agents
+        in one job. """
+        pairs = self._produceAllPairs()
+        jobs = [(random.randint(2 ** 31 - 1), p1, p2, repeat) for p1, p2 in pairs]
+        games = _Games(self.env, self.forcedLegality)
+        for (p1, p2), wins in zip(pairs, self.executor.map(games, jobs)):
+            for p1won in wins:
+                self._addResult(p1, p2, p1won)
+        self.rounds += repeat
+        self.numGames += repeat * len(pairs)
+        return self.results
+    
     def eloScore(self, startingscore=1500, k=32):
         """ compute the elo score of all the agents, given the games played in the tournament. 
         Also checking for potentially initial scores among the agents ('elo' variable). """
@@ -0,0 +1,64 @@
+__author__ = 'agent, agent@local'
+
+from scipy import argsort, vstack
+
+from pybrain.rl.experiments.experiment import Experiment
+
+
+class VectorExperiment(Experiment):
+    """ An episodic experiment that runs the episodes of several copies of a
+    task in lockstep. At every step, the agent's module is activated once on
+    the batch of observations of all copies that are still running. The
+    episodes are stored in the agent's history one after the other, as if
+    they were done sequentially.
+
+    The agent has to be a LearningAgent with a non-sequential module. The
+    learner's explorer is shared by all copies. """
+
+    def __init__(self, tasks, agent):
+        Experiment.__init__(self, tasks[0], agent)
+        self.tasks = tasks
+
+    def doEpisodes(self, number = 1):
+        """ Do a number of episodes, as many in parallel as there are copies of
+        the task, and return the rewards of each step as a list per episode. """
+        all_rewards = []
+        while len(all_rewards) < number:
+            tasks = self.tasks[:number - len(all_rewards)]
+            all_rewards.extend(self._doParallelEpisodes(tasks))
+        return all_rewards
+
+    def _doParallelEpisodes(self, tasks):
+        """ Do one episode on each of the given tasks, and return the rewards. """
+        learning = getattr(self.agent, 'learning', False)
+        if learning:
+            self.agent.learner.newEpisode()
+        self.agent.module.reset()
+        for task in tasks:
+            task.reset()
+        episodes = [([], [], []) for _ in tasks]
+        # the index of the episode of every explored sample, in order
+        owners = []
+        self.stepid = 0
+        running = range(len(tasks))
+        while True:
+            # (some tasks count their steps in isFinished, so it is only called
+            # once per step, like in EpisodicExperiment)
+            running = [i for i in running if not tasks[i].isFinished()]
+            if not running:
+                break
+            self.stepid += 1
+            observations = vstack([tasks[i].getObservation() for i in running])
+            actions = self.agent.getActionBatch(observations)
+            for i, obs, action in zip(running, observations, actions):
+                tasks[i].performAction(action)
+                observed, taken, rewards = episodes[i]
+                observed.append(obs)
+                taken.append(action)
+                rewards.append(tasks[i].getReward())
+            owners.extend(running)
+        if learning:
+            self.agent.learner.sortSamples(argsort(owners, kind='mergesort'))
+        for episode in episodes:
+            self.agent.storeEpisode(*episode)
+        return [rewards for _, _, rewards in episodes]
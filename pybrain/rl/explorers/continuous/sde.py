@@ -57,6 +57,10 @@ class StateDependentExplorer(Explorer, ParameterContainer):
         self.state = state
         return Module.activate(self, action)
 
+    def reconstruct(self, state, action, explorative):
+        self.state = state
+        Explorer.reconstruct(self, state, action, explorative)
+
     def _forwardImplementation(self, inbuf, outbuf):
         outbuf[:] = inbuf + dot(self.state, self.explmatrix)
 
@@ -17,6 +17,15 @@ class Explorer(Module):
         """
         return Module.activate(self, action)
     
+    def reconstruct(self, state, action, explorative):
+        """ Set the buffers as if activate(state, action) had returned the 
+            explorative action, e.g. for a sample that was explored by a copy 
+            of the explorer in another process, so that its derivatives can be
+            computed by a backward pass.
+        """
+        self.inputbuffer[self.offset] = action
+        self.outputbuffer[self.offset] = explorative
+    
         
     def newEpisode(self):
         """ Inform the explorer about the start of a new episode. """
@@ -1,5 +1,7 @@
 __author__ = 'Thomas Rueckstiess, ruecksti@in.tum.de'
 
+from scipy import array, cumsum, diff, vstack
+
 from pybrain.rl.learners.directsearch.directsearch import DirectSearchLearner
 from pybrain.rl.learners.learner import DataSetLearner, ExploringLearner
 from pybrain.utilities import abstractMethod
@@ -26,6 +28,9 @@ class PolicyGradientLearner(DirectSearchLearner, DataSetLearner, ExploringLearne
     
     _module = None
     
+    # the derivatives before the first sample of parallel episodes
+    _batchDerivs = None
+    
     def __init__(self):        
         # gradient descender
         self.gd = GradientDescent()
@@ -127,6 +132,38 @@ class PolicyGradientLearner(DirectSearchLearner, DataSetLearner, ExploringLearne
         
         return explorative
     
+    def exploreBatch(self, states, actions):
+        if self._batchDerivs is None:
+            self._batchDerivs = self.network.derivs.copy()
+        # the module's buffers still hold the batch activation, one sample per
+        # row, so the backward pass of each sample is done on its row, like
+        # self.network would do it for a single sample
+        explorative = []
+        for row, (state, action) in enumerate(zip(states, actions)):
+            explorative.append(ExploringLearner.explore(self, state, action))
+            self.explorer.backward()
+            self.module.offset = row
+            self.module.backActivate(self.explorer.inputerror[self.explorer.offset])
+            self.loglh.appendLinked(self.network.derivs.copy())
+        self.module.offset = 0
+        return array(explorative)
+    
+    def addExploredSamples(self, states, actions):
+        for state, explorative in zip(states, actions):
+            action = self.module.activate(state)
+            self.explorer.reconstruct(state, action, explorative)
+            self.network.backward()
+            self.loglh.appendLinked(self.network.derivs.copy())
+    
+    def sortSamples(self, order):
+        # the stored derivatives are summed up over the samples, so the sums
+        # are recomputed in the new order
+        end = self.loglh.getLength()
+        rows = self.loglh['loglh'][end - len(order):end]
+        increments = diff(vstack((self._batchDerivs, rows)), axis=0)
+        rows[:] = self._batchDerivs + cumsum(increments[order], axis=0)
+        self._batchDerivs = None
+    
     def reset(self):
         self.loglh.clear() 
     
@@ -6,6 +6,7 @@ __author__ = 'Tom Schaul, tom@idsia.ch, Thomas Rueckstiess, ruecksti@in.tum.de'
 
 
 from pybrain.utilities import abstractMethod
+from scipy import array
 import logging
 
 
@@ -33,6 +34,20 @@ class ExploringLearner(Learner):
             return self.explorer.activate(state, action)
         else:
             logging.warning("No explorer found: no exploration could be done.")
+
+    def exploreBatch(self, states, actions):
+        """ Explore a batch of actions (one per row) for the given states, 
+        e.g. for several episodes that are run in parallel. """
+        if self.explorer is None:
+            logging.warning("No explorer found: no exploration could be done.")
+            return actions
+        return array([self.explorer.activate(s, a) for s, a in zip(states, actions)])
+
+    def addExploredSamples(self, states, actions):
+        """ Inform the learner about samples whose actions were explored by a 
+        copy of its explorer, e.g. in another process. Learners that keep 
+        per-sample information about the exploration compute it here. """
+        pass
                     
     
 class EpisodicLearner(Learner):
@@ -49,6 +64,13 @@ class EpisodicLearner(Learner):
         if self.explorer is not None:
             self.explorer.newEpisode()
             
+    def sortSamples(self, order):
+        """ The samples of the last len(order) calls to explore() belong to 
+        parallel episodes, and are stored in the history episode by episode, in 
+        the given order. Learners that keep their own per-sample information 
+        have to reorder it the same way. """
+        pass
+
     def reset(self):
         pass
 
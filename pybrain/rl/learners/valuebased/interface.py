@@ -1,6 +1,6 @@
 __author__ = 'Thomas Rueckstiess, ruecksti@in.tum.de'
 
-from scipy import argmax, array, r_, asarray
+from scipy import argmax, array, r_, asarray, column_stack, repeat, tile, eye
 from pybrain.utilities import abstractMethod
 from pybrain.structure.modules import Table, Module
 from pybrain.structure.parametercontainer import ParameterContainer
@@ -43,6 +43,10 @@ class ActionValueTable(Table, ActionValueInterface):
         """
         outbuf[0] = self.getMaxAction(inbuf[0])
 
+    def _forwardBatchImplementation(self, inbuf, outbuf):
+        table = self.params.reshape(self.numRows, self.numColumns)
+        outbuf[:, 0] = argmax(table[inbuf[:, 0].astype(int)], axis=1)
+
     def getMaxAction(self, state):
         """ Return the action with the maximal value for the given state. """
         return argmax(self.params.reshape(self.numRows, self.numColumns)[state, :].flatten())
@@ -67,6 +71,15 @@ class ActionValueNetwork(Module, ActionValueInterface):
         """
         outbuf[0] = self.getMaxAction(asarray(inbuf))
 
+    def _forwardBatchImplementation(self, inbuf, outbuf):
+        """ The values of all actions in all states of the batch are computed
+            by a single batch activation of the network. """
+        n = len(inbuf)
+        inputs = column_stack((repeat(inbuf, self.numActions, axis=0),
+                               tile(eye(self.numActions), (n, 1))))
+        values = self.network.activateBatch(inputs).reshape(n, self.numActions)
+        outbuf[:, 0] = argmax(values, axis=1)
+
     def getMaxAction(self, state):
         """ Return the action with the maximal value for the given state. """
         return argmax(self.getActionValues(state))
@@ -54,15 +54,16 @@ class Connection(Named):
         self.outdim = self.outSliceTo - self.outSliceFrom 
         
         # arguments for for xml
-        self.setArgs(inmod = self.inmod, outmod = self.outmod)
+        args = dict(inmod = self.inmod, outmod = self.outmod)
         if self.inSliceFrom > 0:
-            self.setArgs(inSliceFrom = self.inSliceFrom)
+            args['inSliceFrom'] = self.inSliceFrom
         if self.outSliceFrom > 0:
-            self.setArgs(outSliceFrom = self.outSliceFrom)
+            args['outSliceFrom'] = self.outSliceFrom
         if self.inSliceTo < self.inmod.outdim:
-            self.setArgs(inSliceTo = self.inSliceTo)
+            args['inSliceTo'] = self.inSliceTo
         if self.outSliceTo < self.outmod.indim:
-            self.setArgs(outSliceTo = self.outSliceTo)
+            args['outSliceTo'] = self.outSliceTo
+        self.setArgs(**args)
         
         
     def forward(self, inmodOffset=0, outmodOffset=0):
@@ -92,11 +93,50 @@ class Connection(Named):
             self.inmod.outputerror[inmodOffset, self.inSliceFrom:self.inSliceTo],
             self.inmod.outputbuffer[inmodOffset, self.inSliceFrom:self.inSliceTo])
 
+    def forwardBatch(self, length, inmodOffset=0, outmodOffset=0):
+        """Propagate `length` rows of the incoming module's output buffer to 
+        the outgoing module's input buffer, treating every row as an 
+        independent sample. 
+        
+        The rows start at inmodOffset for the inmod and at outmodOffset for the
+        outmod."""
+        self._forwardBatchImplementation(
+            self.inmod.outputbuffer[inmodOffset:inmodOffset + length, 
+                                    self.inSliceFrom:self.inSliceTo],
+            self.outmod.inputbuffer[outmodOffset:outmodOffset + length, 
+                                    self.outSliceFrom:self.outSliceTo])
+        
+    def backwardBatch(self, length, inmodOffset=0, outmodOffset=0):
+        """Propagate `length` rows of the outgoing module's input error back to
+        the incoming module's output error, treating every row as an 
+        independent sample. The rows start at the given offsets, as in 
+        .forwardBatch().
+        
+        If appropriate, the parameter derivatives are summed over the batch."""
+        inrows = slice(inmodOffset, inmodOffset + length)
+        outrows = slice(outmodOffset, outmodOffset + length)
+        self._backwardBatchImplementation(
+            self.outmod.inputerror[outrows, self.outSliceFrom:self.outSliceTo],
+            self.inmod.outputerror[inrows, self.inSliceFrom:self.inSliceTo],
+            self.inmod.outputbuffer[inrows, self.inSliceFrom:self.inSliceTo])
+
     def _forwardImplementation(self, inbuf, outbuf):
         abstractMethod()
     
     def _backwardImplementation(self, outerr, inerr, inbuf):
         abstractMethod()
+        
+    def _forwardBatchImplementation(self, inbuf, outbuf):
+        """Forward transformation of a 2D batch of samples (one per row). The 
+        default transforms the samples one by one."""
+        for inrow, outrow in zip(inbuf, outbuf):
+            self._forwardImplementation(inrow, outrow)
+    
+    def _backwardBatchImplementation(self, outerr, inerr, inbuf):
+        """Backward transformation of a 2D batch of samples (one per row). The
+        default transforms the samples one by one."""
+        for rows in zip(outerr, inerr, inbuf):
+            self._backwardImplementation(*rows)
 
     def __repr__(self):
         """A simple representation (this should probably be expanded by 
@@ -17,4 +17,10 @@ class IdentityConnection(Connection):
         outbuf += inbuf
         
     def _backwardImplementation(self, outerr, inerr, inbuf):
-        inerr += outerr
\ No newline at end of file
+        inerr += outerr
+        
+    def _forwardBatchImplementation(self, inbuf, outbuf):
+        outbuf += inbuf
+        
+    def _backwardBatchImplementation(self, outerr, inerr, inbuf):
+        inerr += outerr
@@ -63,3 +63,9 @@ class SharedFullConnection(SharedConnection, FullConnection):
     
     def _backwardImplementation(self, outerr, inerr, inbuf):
         FullConnection._backwardImplementation(self, outerr, inerr, inbuf)
+        
+    def _forwardBatchImplementation(self, inbuf, outbuf):
+        FullConnection._forwardBatchImplementation(self, inbuf, outbuf)
+    
+    def _backwardBatchImplementation(self, outerr, inerr, inbuf):
+        FullConnection._backwardBatchImplementation(self, outerr, inerr, inbuf)
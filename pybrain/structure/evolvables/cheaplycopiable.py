@@ -5,7 +5,10 @@ from pybrain.structure.modules.module import Module
 
 
 class CheaplyCopiable(ParameterContainer, Module):
-    """ a shallow version of a module, that it only copies/mutates the params, not the structure. """
+    """ a shallow version of a module, that it only copies/mutates the params, not the structure. 
+    
+    Networks do not need it: their own copies share their structure already, 
+    without sharing their buffers (see Network.copy()). """
     
     def __init__(self, module):
         self.__stored = module
@@ -1,4 +1,5 @@
 from biasunit import BiasUnit
+from convolution import ConvolutionLayer, PoolingLayer, PaddingLayer
 from gate import GateLayer, DoubleGateLayer, MultiplicationLayer, SwitchLayer
 from gaussianlayer import GaussianLayer
 from linearlayer import LinearLayer
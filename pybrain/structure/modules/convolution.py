@@ -0,0 +1,198 @@
+__author__ = 'agent, agent@local'
+
+from numpy.lib.stride_tricks import as_strided
+from scipy import dot, zeros, empty, arange
+
+from module import Module
+from pybrain.structure.parametercontainer import ParameterContainer
+
+
+def _shape(size):
+    """ (height, width) of a map, given as a side length or a tuple """
+    if isinstance(size, tuple):
+        return size
+    return (size, size)
+
+
+class ConvolutionLayer(Module, ParameterContainer):
+    """ A layer of feature maps, each of which convolves the input with a
+    square kernel of weights that are shared by all positions.
+
+    The input is a 2D map of positions with a number of channels each, stored
+    position by position (row-major), like the boards of the two-player games.
+    The output holds the values of all feature maps of every position where
+    the kernel fits entirely, stored in the same way.
+
+    The weights are ordered by kernel row, feature map, kernel column and
+    channel. All positions (and all samples of a batch) are handled by a
+    single matrix product with the patches of the input, which are gathered
+    through stride tricks. """
+
+    insize = None
+    channels = None
+    convSize = None
+    numFeatureMaps = None
+
+    def __init__(self, insize, channels, convSize, numFeatureMaps, name=None):
+        """
+        :arg insize: side length of the square input map, or (height, width)
+        :arg channels: number of values per input position
+        :arg convSize: side length of the square kernels
+        :arg numFeatureMaps: number of kernels, i.e. values per output position
+        """
+        self.setArgs(insize=insize, channels=channels, convSize=convSize,
+                     numFeatureMaps=numFeatureMaps)
+        h, w = _shape(insize)
+        self.outsize = (h - convSize + 1, w - convSize + 1)
+        Module.__init__(self, h * w * channels,
+                        self.outsize[0] * self.outsize[1] * numFeatureMaps, name)
+        ParameterContainer.__init__(self, convSize * numFeatureMaps * convSize * channels)
+
+    def _kernels(self):
+        """ the weights as a (patch size, numFeatureMaps) matrix """
+        k, nf = self.convSize, self.numFeatureMaps
+        return self.params.reshape(k, nf, -1).transpose(0, 2, 1).reshape(-1, nf)
+
+    def _patches(self, inbuf):
+        """ the input patches of all output positions, as the rows of a
+        (samples * positions, patch size) array """
+        n = inbuf.shape[0]
+        h, w = _shape(self.insize)
+        k = self.convSize
+        x = inbuf.reshape(n, h, w, self.channels)
+        s = x.strides
+        patches = as_strided(x, shape=(n, self.outsize[0], self.outsize[1], k, k, self.channels),
+                             strides=(s[0], s[1], s[2], s[1], s[2], s[3]))
+        return patches.reshape(-1, k * k * self.channels)
+
+    def _forwardImplementation(self, inbuf, outbuf):
+        self._forwardBatchImplementation(inbuf[None], outbuf[None])
+
+    def _backwardImplementation(self, outerr, inerr, outbuf, inbuf):
+        self._backwardBatchImplementation(outerr[None], inerr[None], outbuf[None], inbuf[None])
+
+    def _forwardBatchImplementation(self, inbuf, outbuf):
+        outbuf[:] = dot(self._patches(inbuf), self._kernels()).reshape(outbuf.shape)
+
+    def _backwardBatchImplementation(self, outerr, inerr, outbuf, inbuf):
+        k, nf = self.convSize, self.numFeatureMaps
+        n = outerr.shape[0]
+        oh, ow = self.outsize
+        errors = outerr.reshape(-1, nf)
+        # derivatives of the shared weights, summed over positions and samples
+        d = dot(self._patches(inbuf).T, errors)
+        self.derivs[:] += d.reshape(k, -1, nf).transpose(0, 2, 1).ravel()
+        # the errors of the patches are added up at the input positions
+        patchErrors = dot(errors, self._kernels().T).reshape(n, oh, ow, k, k, self.channels)
+        h, w = _shape(self.insize)
+        res = zeros((n, h, w, self.channels), inerr.dtype)
+        for i in range(k):
+            for j in range(k):
+                res[:, i:i + oh, j:j + ow] += patchErrors[:, :, :, i, j]
+        inerr[:] = res.reshape(inerr.shape)
+
+
+class PoolingLayer(Module):
+    """ Max-pooling of a 2D map (stored like for the ConvolutionLayer): every
+    output position holds the maxima, per channel, of a square block of input
+    positions. The blocks do not overlap, so the side lengths of the input
+    need to be multiples of the pool size. """
+
+    insize = None
+    channels = None
+    poolSize = None
+
+    def __init__(self, insize, channels, poolSize, name=None):
+        """
+        :arg insize: side length of the square input map, or (height, width)
+        :arg channels: number of values per position
+        :arg poolSize: side length of the blocks
+        """
+        self.setArgs(insize=insize, channels=channels, poolSize=poolSize)
+        h, w = _shape(insize)
+        assert h % poolSize == 0 and w % poolSize == 0, \
+            "The input size must be a multiple of the pool size."
+        self.outsize = (h / poolSize, w / poolSize)
+        Module.__init__(self, h * w * channels,
+                        self.outsize[0] * self.outsize[1] * channels, name)
+
+    def _blocks(self, inbuf):
+        """ the values of each block, as (samples, rows, columns, channels,
+        values) array """
+        p = self.poolSize
+        oh, ow = self.outsize
+        x = inbuf.reshape(inbuf.shape[0], oh, p, ow, p, self.channels)
+        return x.transpose(0, 1, 3, 5, 2, 4).reshape(x.shape[0], oh, ow, self.channels, p * p)
+
+    def _forwardImplementation(self, inbuf, outbuf):
+        self._forwardBatchImplementation(inbuf[None], outbuf[None])
+
+    def _backwardImplementation(self, outerr, inerr, outbuf, inbuf):
+        self._backwardBatchImplementation(outerr[None], inerr[None], outbuf[None], inbuf[None])
+
+    def _forwardBatchImplementation(self, inbuf, outbuf):
+        outbuf[:] = self._blocks(inbuf).max(axis=-1).reshape(outbuf.shape)
+
+    def _backwardBatchImplementation(self, outerr, inerr, outbuf, inbuf):
+        # the error goes to the (first) maximum of every block
+        p = self.poolSize
+        oh, ow = self.outsize
+        blocks = self._blocks(inbuf)
+        res = zeros(blocks.shape, inerr.dtype)
+        flat = res.reshape(-1, p * p)
+        flat[arange(len(flat)), blocks.reshape(-1, p * p).argmax(axis=1)] = outerr.ravel()
+        res = res.reshape(-1, oh, ow, self.channels, p, p).transpose(0, 1, 4, 2, 5, 3)
+        inerr[:] = res.reshape(inerr.shape)
+
+
+class PaddingLayer(Module, ParameterContainer):
+    """ Surrounds a 2D map (stored like for the ConvolutionLayer) with a border,
+    so that convolutions can produce an output for every position of the
+    original map. The value of the border is trainable, one per channel. """
+
+    insize = None
+    channels = None
+    before = None
+    after = None
+
+    def __init__(self, insize, channels, before, after=None, name=None):
+        """
+        :arg insize: side length of the square input map, or (height, width)
+        :arg channels: number of values per position
+        :arg before: width of the border above and left of the map
+        :key after: width of the border below and right of the map (default:
+                    the same)
+        """
+        if after is None:
+            after = before
+        self.setArgs(insize=insize, channels=channels, before=before, after=after)
+        h, w = _shape(insize)
+        self.outsize = (h + before + after, w + before + after)
+        Module.__init__(self, h * w * channels,
+                        self.outsize[0] * self.outsize[1] * channels, name)
+        ParameterContainer.__init__(self, channels)
+
+    def _inner(self, a):
+        """ view on the original map within a padded one """
+        h, w = _shape(self.insize)
+        return a[:, self.before:self.before + h, self.before:self.before + w]
+
+    def _forwardImplementation(self, inbuf, outbuf):
+        self._forwardBatchImplementation(inbuf[None], outbuf[None])
+
+    def _backwardImplementation(self, outerr, inerr, outbuf, inbuf):
+        self._backwardBatchImplementation(outerr[None], inerr[None], outbuf[None], inbuf[None])
+
+    def _forwardBatchImplementation(self, inbuf, outbuf):
+        res = empty((inbuf.shape[0],) + self.outsize + (self.channels,), outbuf.dtype)
+        res[...] = self.params
+        inner = self._inner(res)
+        inner[...] = inbuf.reshape(inner.shape)
+        outbuf[:] = res.reshape(outbuf.shape)
+
+    def _backwardBatchImplementation(self, outerr, inerr, outbuf, inbuf):
+        errors = outerr.reshape((outerr.shape[0],) + self.outsize + (self.channels,))
+        inner = self._inner(errors)
+        inerr[:] = inner.reshape(inerr.shape)
+        self.derivs[:] += (errors.reshape(-1, self.channels).sum(axis=0)
+                        - inner.reshape(-1, self.channels).sum(axis=0))
@@ -5,7 +5,15 @@ from scipy import tanh
 from neuronlayer import NeuronLayer
 from module import Module
 from pybrain.structure.parametercontainer import ParameterContainer
-from pybrain.tools.functions import sigmoid, sigmoidPrime, tanhPrime
+from pybrain.tools.functions import sigmoid
+
+
+def _cellView(buffername, index):
+    """Return a property that gives access to the `index`'th part of the
+    internal buffer `buffername`."""
+    def getter(self):
+        return getattr(self, buffername)[:, index * self.dim:(index + 1) * self.dim]
+    return property(getter)
 
 
 class LSTMLayer(NeuronLayer, ParameterContainer):
@@ -17,20 +25,28 @@ class LSTMLayer(NeuronLayer, ParameterContainer):
     - cell input
     - output gate
     
+    The activations of the gates and the cell input, the states and the
+    squashed states are kept side by side in a single internal buffer, their
+    errors in another one. That way the gates are squashed by a few array
+    operations, and the error of all four gates is the input error.
     """
 
     sequential = True
     peepholes = False
     maxoffset = 0
     
-    # Transfer functions and their derivatives
-    f = lambda _, x: sigmoid(x)
-    fprime = lambda _, x: sigmoidPrime(x)
-    g = lambda _, x: tanh(x)
-    gprime = lambda _, x: tanhPrime(x)
-    h = lambda _, x: tanh(x)
-    hprime = lambda _, x: tanhPrime(x)
-    
+    # Views on the parts of the internal buffers
+    ingate = _cellView('cells', 0)
+    forgetgate = _cellView('cells', 1)
+    cellinput = _cellView('cells', 2)
+    outgate = _cellView('cells', 3)
+    state = _cellView('cells', 4)
+    squashedstate = _cellView('cells', 5)
+    ingateError = _cellView('cellsError', 0)
+    forgetgateError = _cellView('cellsError', 1)
+    cellinputError = _cellView('cellsError', 2)
+    outgateError = _cellView('cellsError', 3)
+    stateError = _cellView('cellsError', 4)
 
     def __init__(self, dim, peepholes = False, name = None):
         """ 
@@ -40,17 +56,8 @@ class LSTMLayer(NeuronLayer, ParameterContainer):
         
         # Internal buffers, created dynamically:
         self.bufferlist = [
-            ('ingate', dim),
-            ('outgate', dim),
-            ('forgetgate', dim),
-            ('ingatex', dim),
-            ('outgatex', dim),
-            ('forgetgatex', dim),
-            ('state', dim),
-            ('ingateError', dim),
-            ('outgateError', dim),
-            ('forgetgateError', dim),
-            ('stateError', dim),
+            ('cells', dim * 6),
+            ('cellsError', dim * 5),
         ]
         
         Module.__init__(self, 4*dim, dim, name)
@@ -78,68 +85,121 @@ class LSTMLayer(NeuronLayer, ParameterContainer):
         """Tell wether the current offset is the maximum offset."""
         return self.maxoffset == self.offset
                         
+    def reset(self):
+        Module.reset(self)
+        self.maxoffset = 0
+        
+    def _shiftBuffers(self, steps):
+        Module._shiftBuffers(self, steps)
+        self.maxoffset = max(self.maxoffset - steps, 0)
+
     def _forwardImplementation(self, inbuf, outbuf):
         self.maxoffset = max(self.offset + 1, self.maxoffset)
-        
+        prev = self.offset - 1 if self.offset > 0 else None
+        self._forwardStep(inbuf, outbuf, self.offset, prev)
+        
+    def forwardBatch(self, length, offset=0):
+        """Process a block of `length` sequences at the same timestep, which
+        are stored in the rows starting at `offset`. The block before holds
+        the previous timestep of the same sequences."""
+        self.maxoffset = max(offset + length, self.maxoffset)
+        now = slice(offset, offset + length)
+        prev = slice(offset - length, offset) if offset > 0 else None
+        self._forwardStep(self.inputbuffer[now], self.outputbuffer[now],
+                          now, prev)
+
+    def _forwardStep(self, inbuf, outbuf, now, prev):
+        """Forward pass of a single timestep. `now` and `prev` index the
+        internal buffers at the current and the previous timestep; they are
+        offsets or, for batches of sequences, slices of rows. `prev` is None
+        at the first timestep."""
         dim = self.outdim
-        # slicing the input buffer into the 4 parts
-        try:
-            self.ingatex[self.offset] = inbuf[:dim]
-        except IndexError:
-            raise str((self.offset, self.ingatex.shape))
-        
-        self.forgetgatex[self.offset] = inbuf[dim:dim*2]
-        cellx = inbuf[dim*2:dim*3]
-        self.outgatex[self.offset] = inbuf[dim*3:]
-        
-        # peephole treatment
-        if self.peepholes and self.offset > 0:
-            self.ingatex[self.offset] += self.ingatePeepWeights * self.state[self.offset-1]
-            self.forgetgatex[self.offset] += self.forgetgatePeepWeights * self.state[self.offset-1]
+        cells = self.cells[now]
+        gates = cells[..., :dim*4]
+        state = cells[..., dim*4:dim*5]
+        squashedstate = cells[..., dim*5:]
+        
+        # the gate activations are computed in place from the input
+        gates[...] = inbuf
+        if prev is not None:
+            laststate = self.cells[prev, dim*4:dim*5]
+            # peephole treatment
+            if self.peepholes:
+                gates[..., :dim] += self.ingatePeepWeights * laststate
+                gates[..., dim:dim*2] += self.forgetgatePeepWeights * laststate
+        gates[..., :dim*2] = sigmoid(gates[..., :dim*2])
+        gates[..., dim*2:dim*3] = tanh(gates[..., dim*2:dim*3])
+        
+        state[...] = gates[..., :dim] * gates[..., dim*2:dim*3]
+        if prev is not None:
+            state += gates[..., dim:dim*2] * laststate
             
-        self.ingate[self.offset] = self.f(self.ingatex[self.offset])
-        self.forgetgate[self.offset] = self.f(self.forgetgatex[self.offset])
-        
-        self.state[self.offset] = self.ingate[self.offset] * self.g(cellx)
-        if self.offset > 0:
-            self.state[self.offset] += self.forgetgate[self.offset] * self.state[self.offset-1]
-        
+        outgate = gates[..., dim*3:]
         if self.peepholes:
-            self.outgatex[self.offset] += self.outgatePeepWeights * self.state[self.offset]
-        self.outgate[self.offset] = self.f(self.outgatex[self.offset])
+            outgate += self.outgatePeepWeights * state
+        outgate[...] = sigmoid(outgate)
         
-        outbuf[:] = self.outgate[self.offset] * self.h(self.state[self.offset])
+        squashedstate[...] = tanh(state)
+        outbuf[:] = outgate * squashedstate
     
     def _backwardImplementation(self, outerr, inerr, outbuf, inbuf):
+        prev = self.offset - 1 if self.offset > 0 else None
+        next = None if self._isLastTimestep() else self.offset + 1
+        self._backwardStep(outerr, inerr, self.offset, prev, next)
+
+    def backwardBatch(self, length, offset=0):
+        """Backward pass of a block of sequences, see .forwardBatch(). The
+        derivatives are summed over the block."""
+        now = slice(offset, offset + length)
+        prev = slice(offset - length, offset) if offset > 0 else None
+        if offset + length < self.maxoffset:
+            next = slice(offset + length, offset + 2 * length)
+        else:
+            next = None
+        self._backwardStep(self.outputerror[now], self.inputerror[now],
+                           now, prev, next)
+
+    def _backwardStep(self, outerr, inerr, now, prev, next):
+        """Backward pass of a single timestep, indexed like in
+        ._forwardStep(). `next` is None at the last timestep."""
         dim = self.outdim
-        cellx = inbuf[dim*2:dim*3]
-        
-        self.outgateError[self.offset] = self.fprime(self.outgatex[self.offset]) * outerr * self.h(self.state[self.offset])
-        self.stateError[self.offset] = outerr * self.outgate[self.offset] * self.hprime(self.state[self.offset])
-        if not self._isLastTimestep():
-            self.stateError[self.offset] += self.stateError[self.offset+1] * self.forgetgate[self.offset+1]
+        cells = self.cells[now]
+        ingate = cells[..., :dim]
+        forgetgate = cells[..., dim:dim*2]
+        cellinput = cells[..., dim*2:dim*3]
+        outgate = cells[..., dim*3:dim*4]
+        squashedstate = cells[..., dim*5:]
+        errors = self.cellsError[now]
+        stateError = errors[..., dim*4:]
+        
+        outgateError = outgate * (1 - outgate) * outerr * squashedstate
+        errors[..., dim*3:dim*4] = outgateError
+        stateError[...] = outerr * outgate * (1 - squashedstate * squashedstate)
+        if next is not None:
+            nexterrors = self.cellsError[next]
+            stateError += nexterrors[..., dim*4:] * self.cells[next, dim:dim*2]
             if self.peepholes:
-                self.stateError[self.offset] += self.ingateError[self.offset+1] * self.ingatePeepWeights
-                self.stateError[self.offset] += self.forgetgateError[self.offset+1] * self.forgetgatePeepWeights
+                stateError += nexterrors[..., :dim] * self.ingatePeepWeights
+                stateError += nexterrors[..., dim:dim*2] * self.forgetgatePeepWeights
         if self.peepholes:
-            self.stateError[self.offset] += self.outgateError[self.offset] * self.outgatePeepWeights
-        cellError = self.ingate[self.offset] * self.gprime(cellx) * self.stateError[self.offset]
-        if self.offset > 0:
-            self.forgetgateError[self.offset] = self.fprime(self.forgetgatex[self.offset]) * self.stateError[self.offset] * self.state[self.offset-1]
-        
-        self.ingateError[self.offset] = self.fprime(self.ingatex[self.offset]) * self.stateError[self.offset] * self.g(cellx)    
-        
-        # compute derivatives
+            stateError += outgateError * self.outgatePeepWeights
+        errors[..., dim*2:dim*3] = ingate * (1 - cellinput * cellinput) * stateError
+        if prev is not None:
+            laststate = self.cells[prev, dim*4:dim*5]
+            errors[..., dim:dim*2] = forgetgate * (1 - forgetgate) * stateError * laststate
+        else:
+            errors[..., dim:dim*2] = 0
+        errors[..., :dim] = ingate * (1 - ingate) * stateError * cellinput
+        
+        # compute derivatives, summed over the rows of a batch
         if self.peepholes:
-            self.outgatePeepDerivs += self.outgateError[self.offset] * self.state[self.offset]
-            if self.offset > 0:
-                self.ingatePeepDerivs += self.ingateError[self.offset] * self.state[self.offset-1]
-                self.forgetgatePeepDerivs += self.forgetgateError[self.offset] * self.state[self.offset-1]
+            state = cells[..., dim*4:dim*5]
+            self.outgatePeepDerivs += (outgateError * state).reshape(-1, dim).sum(0)
+            if prev is not None:
+                self.ingatePeepDerivs += (errors[..., :dim] * laststate).reshape(-1, dim).sum(0)
+                self.forgetgatePeepDerivs += (errors[..., dim:dim*2] * laststate).reshape(-1, dim).sum(0)
         
-        inerr[:dim] = self.ingateError[self.offset]
-        inerr[dim:dim*2] = self.forgetgateError[self.offset]
-        inerr[dim*2:dim*3] = cellError
-        inerr[dim*3:] = self.outgateError[self.offset]
+        inerr[:] = errors[..., :dim*4]
         
     def whichNeuron(self, inputIndex = None, outputIndex = None):
         if inputIndex != None:
@@ -1,6 +1,6 @@
 __author__ = 'Tom Schaul, tom@idsia.ch'
 
-from scipy import zeros, tanh
+from scipy import tanh
 
 from neuronlayer import NeuronLayer
 from module import Module
@@ -87,75 +87,113 @@ class MDLSTMLayer(NeuronLayer, ParameterContainer):
                 
     def _forwardImplementation(self, inbuf, outbuf):
         self.maxoffset = max(self.offset + 1, self.maxoffset)
+        self._forwardStep(inbuf, outbuf, self.offset)
+
+    def _backwardImplementation(self, outerr, inerr, outbuf, inbuf):
+        self._backwardStep(outerr, inerr, outbuf, inbuf, self.offset)
+
+    def forwardBatch(self, length, offset=0):
+        """Process `length` independent rows at once, starting at `offset`."""
+        self.maxoffset = max(offset + length, self.maxoffset)
+        now = slice(offset, offset + length)
+        self._forwardStep(self.inputbuffer[now], self.outputbuffer[now], now)
+
+    def backwardBatch(self, length, offset=0):
+        """Backward pass of independent rows, see .forwardBatch(). The
+        derivatives are summed over the rows."""
+        now = slice(offset, offset + length)
+        self._backwardStep(self.outputerror[now], self.inputerror[now],
+                           self.outputbuffer[now], self.inputbuffer[now], now)
+
+    def _forwardStep(self, inbuf, outbuf, now):
+        """Forward pass of the cells stored at `now` in the internal buffers:
+        an offset, or any index that selects a block of rows (one per row of
+        the in- and output buffers given)."""
         size = self.dim
+        dims = self.dimensions
         # slicing the input buffer into the 4 parts.
-        self.ingatex[self.offset] = inbuf[:size]
-        self.forgetgatex[self.offset] = inbuf[size:size*(1+self.dimensions)]
-        cellx = inbuf[size*(1+self.dimensions):size*(2+self.dimensions)]
-        self.outgatex[self.offset] = inbuf[size*(2+self.dimensions):size*(3+self.dimensions)]        
-        laststates = inbuf[size*(3+self.dimensions):]
+        ingatex = self.ingatex[now]
+        forgetgatex = self.forgetgatex[now]
+        outgatex = self.outgatex[now]
+        ingatex[...] = inbuf[..., :size]
+        forgetgatex[...] = inbuf[..., size:size*(1+dims)]
+        cellx = inbuf[..., size*(1+dims):size*(2+dims)]
+        outgatex[...] = inbuf[..., size*(2+dims):size*(3+dims)]
+        laststates = inbuf[..., size*(3+dims):]
         
         # Peephole treatment
         if self.peepholes:
-            for i in range(self.dimensions):
-                self.ingatex[self.offset] += self.ingatePeepWeights * laststates[size * i:size * (i + 1)]
-            self.forgetgatex[self.offset] += self.forgetgatePeepWeights * laststates
+            for i in range(dims):
+                ingatex += self.ingatePeepWeights * laststates[..., size*i:size*(i+1)]
+            forgetgatex += self.forgetgatePeepWeights * laststates
             
-        self.ingate[self.offset] = self.f(self.ingatex[self.offset])
-        self.forgetgate[self.offset] = self.f(self.forgetgatex[self.offset])
+        ingate = self.ingate[now]
+        forgetgate = self.forgetgate[now]
+        ingate[...] = self.f(ingatex)
+        forgetgate[...] = self.f(forgetgatex)
         
-        self.state[self.offset] = self.ingate[self.offset] * self.g(cellx)
-        for i in range(self.dimensions):
-            self.state[self.offset] += self.forgetgate[self.offset, size*i:size*(i+1)] * laststates[size*i:size*(i+1)]
+        state = self.state[now]
+        state[...] = ingate * self.g(cellx)
+        for i in range(dims):
+            state += forgetgate[..., size*i:size*(i+1)] * laststates[..., size*i:size*(i+1)]
         
         if self.peepholes:
-            self.outgatex[self.offset] += self.outgatePeepWeights * self.state[self.offset]
-        self.outgate[self.offset] = self.f(self.outgatex[self.offset])
+            outgatex += self.outgatePeepWeights * state
+        outgate = self.outgate[now]
+        outgate[...] = self.f(outgatex)
         
-        outbuf[:size] = self.outgate[self.offset] * self.h(self.state[self.offset])
-        outbuf[size:] = self.state[self.offset]
+        outbuf[..., :size] = outgate * self.h(state)
+        outbuf[..., size:] = state
     
-    def _backwardImplementation(self, outerr2, inerr, outbuf, inbuf):
+    def _backwardStep(self, outerr2, inerr, outbuf, inbuf, now):
+        """Backward pass of the cells stored at `now`, see ._forwardStep()."""
         size = self.dim
-        cellx = inbuf[size*(1+self.dimensions):size*(2+self.dimensions)]
-        laststates = inbuf[size*(3+self.dimensions):]
-        outerr = outerr2[:size]
-        nextstateerr = outerr2[size:]
+        dims = self.dimensions
+        cellx = inbuf[..., size*(1+dims):size*(2+dims)]
+        laststates = inbuf[..., size*(3+dims):]
+        outerr = outerr2[..., :size]
+        nextstateerr = outerr2[..., size:]
+        state = self.state[now]
+        ingate = self.ingate[now]
+        forgetgate = self.forgetgate[now]
+        outgate = self.outgate[now]
+        forgetgatex = self.forgetgatex[now]
         
-        self.outgateError[self.offset] = self.fprime(self.outgatex[self.offset]) * outerr * self.h(self.state[self.offset])
-        self.stateError[self.offset] = outerr * self.outgate[self.offset] * self.hprime(self.state[self.offset])
-        self.stateError[self.offset] += nextstateerr
+        outgateError = self.outgateError[now]
+        outgateError[...] = self.fprime(self.outgatex[now]) * outerr * self.h(state)
+        stateError = self.stateError[now]
+        stateError[...] = outerr * outgate * self.hprime(state)
+        stateError += nextstateerr
         if self.peepholes:
-            self.stateError[self.offset] += self.outgateError[self.offset] * self.outgatePeepWeights
-        cellError = self.ingate[self.offset] * self.gprime(cellx) * self.stateError[self.offset]
-        for i in range(self.dimensions):
-            self.forgetgateError[self.offset, size*i:size*(i+1)] = (self.fprime(self.forgetgatex[self.offset, size*i:size*(i+1)]) 
-                                                                  * self.stateError[self.offset] * laststates[size*i:size*(i+1)])
+            stateError += outgateError * self.outgatePeepWeights
+        cellError = ingate * self.gprime(cellx) * stateError
+        forgetgateError = self.forgetgateError[now]
+        for i in range(dims):
+            forgetgateError[..., size*i:size*(i+1)] = (self.fprime(forgetgatex[..., size*i:size*(i+1)]) 
+                                                       * stateError * laststates[..., size*i:size*(i+1)])
         
-        self.ingateError[self.offset] = self.fprime(self.ingatex[self.offset]) * self.stateError[self.offset] * self.g(cellx)    
+        ingateError = self.ingateError[now]
+        ingateError[...] = self.fprime(self.ingatex[now]) * stateError * self.g(cellx)
         
-        # compute derivatives
+        # compute derivatives, summed over the rows of a block
         if self.peepholes:
-            self.outgatePeepDerivs += self.outgateError[self.offset] * self.state[self.offset]
-            for i in range(self.dimensions):
-                self.ingatePeepDerivs += self.ingateError[self.offset] * laststates[size*i:size*(i+1)]
-                self.forgetgatePeepDerivs[size*i:size*(i+1)] += (self.forgetgateError[self.offset, size*i:size*(i+1)] 
-                                                                 * laststates[size*i:size*(i+1)])
+            self.outgatePeepDerivs += (outgateError * state).reshape(-1, size).sum(0)
+            for i in range(dims):
+                self.ingatePeepDerivs += (ingateError * laststates[..., size*i:size*(i+1)]).reshape(-1, size).sum(0)
+                self.forgetgatePeepDerivs[size*i:size*(i+1)] += (forgetgateError[..., size*i:size*(i+1)] 
+                                                                 * laststates[..., size*i:size*(i+1)]).reshape(-1, size).sum(0)
 
-        instateErrors = zeros((size * self.dimensions))
-        for i in range(self.dimensions):
-            instateErrors[size * i:size * (i + 1)] = (self.stateError[self.offset] * 
-                                                      self.forgetgate[self.offset, size*i:size*(i+1)])
+        inerr[..., :size] = ingateError
+        inerr[..., size:size*(1+dims)] = forgetgateError
+        inerr[..., size*(1+dims):size*(2+dims)] = cellError
+        inerr[..., size*(2+dims):size*(3+dims)] = outgateError
+        for i in range(dims):
+            instateErrors = inerr[..., size*(3+dims+i):size*(4+dims+i)]
+            instateErrors[...] = stateError * forgetgate[..., size*i:size*(i+1)]
             if self.peepholes:
-                instateErrors[size * i:size * (i + 1)] += self.ingateError[self.offset] * self.ingatePeepWeights
-                instateErrors[size * i:size * (i + 1)] += self.forgetgateError[self.offset, size*i:size*(i+1)] * \
-                                                          self.forgetgatePeepWeights[size*i:size*(i+1)]
-
-        inerr[:size] = self.ingateError[self.offset]
-        inerr[size:size*(1+self.dimensions)] = self.forgetgateError[self.offset]
-        inerr[size*(1+self.dimensions):size*(2+self.dimensions)] = cellError
-        inerr[size*(2+self.dimensions):size*(3+self.dimensions)] = self.outgateError[self.offset]
-        inerr[size * (3 + self.dimensions):] = instateErrors
+                instateErrors += ingateError * self.ingatePeepWeights
+                instateErrors += forgetgateError[..., size*i:size*(i+1)] * \
+                                 self.forgetgatePeepWeights[size*i:size*(i+1)]
             
     def meatSlice(self):
         """Return a moduleslice that wraps the meat part of the layer."""
@@ -130,8 +130,8 @@ class MdrnnLayer(NeuronLayer, ParameterContainer):
     def _forwardImplementation(self, inbuf, outbuf):
         raise NotImplementedError("Only for fast networks.")
         
-    def _growBuffers(self):
-        super(MdrnnLayer, self)._growBuffers()
+    def _growBuffers(self, length=None):
+        super(MdrnnLayer, self)._growBuffers(length)
         self.inlayer.inputbuffer = self.inlayer.outputbuffer = self.inputbuffer
         self.outlayer.inputbuffer = self.outlayer.outputbuffer = self.outputbuffer
 
@@ -1,6 +1,6 @@
 __author__ = 'Daan Wierstra and Tom Schaul'
 
-from scipy import zeros
+from scipy import zeros, asarray
 
 from pybrain.utilities import abstractMethod, Named
 
@@ -30,6 +30,9 @@ class Module(Named):
     
     bufferlist = None
     
+    # The type of the buffers' elements.
+    dtype = float
+    
     def __init__(self, indim, outdim, name=None, **args):
         """Create a Module with an input dimension of indim and an output 
         dimension of outdim."""
@@ -53,20 +56,42 @@ class Module(Named):
     def _resetBuffers(self, length=1):
         """Reset buffers to a length (in time dimension) of 1."""
         for buffername, dim in self.bufferlist:
-            setattr(self, buffername, zeros((length, dim)))
+            setattr(self, buffername, zeros((length, dim), self.dtype))
+        
+    def _saveBuffers(self):
+        """Return the current buffers as (module, name, buffer) triples, so 
+        that they can be put back after they have been reallocated."""
+        return [(self, name, getattr(self, name)) for name, _ in self.bufferlist]
         
-    def _growBuffers(self):
-        """Double the size of the modules buffers in its first dimension and 
-        keep the current values."""
+    def _growBuffers(self, length=None):
+        """Double the size of the modules buffers in its first dimension (or 
+        grow them to `length`, if given) and keep the current values."""
         currentlength = getattr(self, self.bufferlist[0][0]).shape[0]
+        if length is None:
+            length = currentlength * 2
         # Save the current buffers
         tmp = [getattr(self, n) for n, _ in self.bufferlist]
-        Module._resetBuffers(self, currentlength * 2)
+        Module._resetBuffers(self, length)
 
         for previous, (buffername, _dim) in zip(tmp, self.bufferlist):
             buffer_ = getattr(self, buffername)
             buffer_[:currentlength] = previous
             
+    def _shiftBuffers(self, steps):
+        """Drop the first `steps` timesteps of the buffers and move the 
+        remaining ones to the front, keeping the size of the buffers."""
+        for buffername, _dim in self.bufferlist:
+            buffer_ = getattr(self, buffername)
+            buffer_[:-steps] = buffer_[steps:].copy()
+            buffer_[-steps:] = 0
+            
+    def reserve(self, length):
+        """Allocate the buffers for sequences of up to `length` timesteps at
+        once, so that they do not have to grow while processing them."""
+        # Sequential modules always keep a spare timestep at the end.
+        if getattr(self, self.bufferlist[0][0]).shape[0] < length + 1:
+            self._growBuffers(length + 1)
+            
     def forward(self):
         """Produce the output from the input."""
         self._forwardImplementation(self.inputbuffer[self.offset],
@@ -79,6 +104,27 @@ class Module(Named):
                                      self.outputbuffer[self.offset],
                                      self.inputbuffer[self.offset])        
         
+    def forwardBatch(self, length, offset=0):
+        """Produce the outputs from `length` rows of the input buffer, starting 
+        at `offset`, treating every row as an independent sample.
+        
+        Sequential modules that support batches of sequences override this: 
+        for them, the rows are a block of samples of the same timestep, and
+        the `length` rows before `offset` hold the previous timestep."""
+        rows = slice(offset, offset + length)
+        self._forwardBatchImplementation(self.inputbuffer[rows],
+                                         self.outputbuffer[rows])
+        
+    def backwardBatch(self, length, offset=0):
+        """Produce the input errors from `length` rows of the output error 
+        buffer, starting at `offset`, treating every row as an independent 
+        sample."""
+        rows = slice(offset, offset + length)
+        self._backwardBatchImplementation(self.outputerror[rows],
+                                          self.inputerror[rows],
+                                          self.outputbuffer[rows],
+                                          self.inputbuffer[rows])
+        
     def reset(self):
         """Set all buffers, past and present, to zero."""
         self.offset = 0
@@ -113,6 +159,33 @@ class Module(Named):
         self.backward()
         return self.inputerror[self.offset].copy()
         
+    def activateBatch(self, inpts):
+        """Transform a 2D array of independent inputs (one sample per row) at
+        once and return the 2D array of outputs.
+        
+        The buffers are used as (batch, dim) arrays, so this is only possible
+        for non-sequential modules."""
+        assert not self.sequential, "Batch activation needs independent samples."
+        inpts = asarray(inpts)
+        length = inpts.shape[0]
+        if self.inputbuffer.shape[0] < length:
+            self._resetBuffers(length)
+        self.inputbuffer[:length] = inpts
+        self.forwardBatch(length)
+        return self.outputbuffer[:length].copy()
+    
+    def backActivateBatch(self, outerrs):
+        """Transform a 2D array of output errors (one sample per row) backward
+        and return the 2D array of input errors. 
+        
+        Has to be preceded by a call to .activateBatch() with the same number
+        of samples. The parameter derivatives are summed over the batch."""
+        outerrs = asarray(outerrs)
+        length = outerrs.shape[0]
+        self.outputerror[:length] = outerrs
+        self.backwardBatch(length)
+        return self.inputerror[:length].copy()
+        
     def _forwardImplementation(self, inbuf, outbuf):
         """Actual forward transformation function. To be overwritten in 
         subclasses."""
@@ -123,3 +196,17 @@ class Module(Named):
         in subclasses, does not have to.
         
         Should also compute the derivatives of the parameters."""
+        
+    def _forwardBatchImplementation(self, inbuf, outbuf):
+        """Forward transformation of a 2D batch of samples (one per row). Can be
+        overwritten in subclasses with a vectorized version, the default 
+        transforms the samples one by one."""
+        for inrow, outrow in zip(inbuf, outbuf):
+            self._forwardImplementation(inrow, outrow)
+            
+    def _backwardBatchImplementation(self, outerr, inerr, outbuf, inbuf):
+        """Backward transformation of a 2D batch of samples (one per row). Can 
+        be overwritten in subclasses with a vectorized version, the default 
+        transforms the samples one by one."""
+        for rows in zip(outerr, inerr, outbuf, inbuf):
+            self._backwardImplementation(*rows)
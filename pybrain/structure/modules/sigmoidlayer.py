@@ -13,3 +13,9 @@ class SigmoidLayer(NeuronLayer):
     def _backwardImplementation(self, outerr, inerr, outbuf, inbuf):
         inerr[:] = outbuf * (1 - outbuf) * outerr
         
+    def _forwardBatchImplementation(self, inbuf, outbuf):
+        outbuf[:] = sigmoid(inbuf)
+        
+    def _backwardBatchImplementation(self, outerr, inerr, outbuf, inbuf):
+        inerr[:] = outbuf * (1 - outbuf) * outerr
+        
@@ -13,3 +13,10 @@ class TanhLayer(NeuronLayer):
         
     def _backwardImplementation(self, outerr, inerr, outbuf, inbuf):
         inerr[:] = (1 - outbuf**2) * outerr
+        
+    def _forwardBatchImplementation(self, inbuf, outbuf):
+        outbuf[:] = tanh(inbuf)
+        
+    def _backwardBatchImplementation(self, outerr, inerr, outbuf, inbuf):
+        inerr[:] = (1 - outbuf**2) * outerr
+
@@ -1,8 +1,8 @@
 from pybrain.structure.modules.linearlayer import LinearLayer
 from pybrain.structure.modules.tanhlayer import TanhLayer
-from pybrain.structure.moduleslice import ModuleSlice
+from pybrain.structure.modules.convolution import ConvolutionLayer
 from pybrain.structure.networks.feedforward import FeedForwardNetwork
-from pybrain.structure.connections.shared import MotherConnection, SharedFullConnection
+from pybrain.structure.connections.identity import IdentityConnection
 from pybrain.structure.modules.sigmoidlayer import SigmoidLayer
 
 __author__ = 'Tom Schaul, tom@idsia.ch'
@@ -26,30 +26,31 @@ class SimpleConvolutionalNetwork(FeedForwardNetwork):
     def _buildStructure(self, inputdim, insize, inlayer, convSize, numFeatureMaps):
         #build layers        
         outdim = insize - convSize + 1
+        conv = ConvolutionLayer(insize, inputdim, convSize, numFeatureMaps, name='conv')
+        self.addModule(conv)
         hlayer = TanhLayer(outdim * outdim * numFeatureMaps, name='h')
         self.addModule(hlayer)
         
+        # the feature maps of every position are combined by the same weights
+        combine = ConvolutionLayer(outdim, numFeatureMaps, 1, 1, name='combine')
+        self.addModule(combine)
         outlayer = SigmoidLayer(outdim * outdim, name='out')
         self.addOutputModule(outlayer)
         
-        # build shared weights
-        convConns = []
-        for i in range(convSize):
-            convConns.append(MotherConnection(convSize * numFeatureMaps * inputdim, name='conv' + str(i)))
-        outConn = MotherConnection(numFeatureMaps)
-        
         # establish the connections.
-        for i in range(outdim):
-            for j in range(outdim):
-                offset = i * outdim + j
-                outmod = ModuleSlice(hlayer, inSliceFrom=offset * numFeatureMaps, inSliceTo=(offset + 1) * numFeatureMaps,
-                                     outSliceFrom=offset * numFeatureMaps, outSliceTo=(offset + 1) * numFeatureMaps)
-                self.addConnection(SharedFullConnection(outConn, outmod, outlayer, outSliceFrom=offset, outSliceTo=offset + 1))
-                
-                for k, mc in enumerate(convConns):
-                    offset = insize * (i + k) + j
-                    inmod = ModuleSlice(inlayer, outSliceFrom=offset * inputdim, outSliceTo=offset * inputdim + convSize * inputdim)
-                    self.addConnection(SharedFullConnection(mc, inmod, outmod))
+        self.addConnection(IdentityConnection(inlayer, conv))
+        self.addConnection(IdentityConnection(conv, hlayer))
+        self.addConnection(IdentityConnection(hlayer, combine))
+        self.addConnection(IdentityConnection(combine, outlayer))
+        
+    def _containerIterator(self):
+        """ The parameters are ordered like the mother connections of the former 
+        construction (sorted by name): the weights combining the feature maps, 
+        the padding values (if any), and then the convolution weights. """
+        order = ['combine', 'pad', 'conv']
+        containers = list(super(SimpleConvolutionalNetwork, self)._containerIterator())
+        containers.sort(key=lambda c: order.index(c.name) if c.name in order else -1)
+        return iter(containers)
             
         
 if __name__ == '__main__':
@@ -65,7 +66,7 @@ if __name__ == '__main__':
              ]
     res = N.activate(ravel(array(input)))
     res = res.reshape(4, 4)
-    print N['pad'].inputbuffer[0].reshape(6, 6, 2)[:, :, 0]
+    print N['pad'].outputbuffer[0].reshape(6, 6, 2)[:, :, 0]
     print res
     
     t = CaptureGameTask(4)
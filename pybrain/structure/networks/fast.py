@@ -0,0 +1,341 @@
+#! /usr/bin/env python2.5
+# -*- coding: utf-8 -*-
+
+"""Module that contains fast implementations of layered networks, which need
+nothing but NumPy.
+
+A fast network is compiled from a sorted FeedForwardNetwork or
+RecurrentNetwork whose modules are stateless layers and whose connections are
+full, shared or identity connections. All layers keep their buffers as column
+ranges of a handful of (time, dim) arrays. The full connections that leave a
+layer from the same input slice, and whose parameters lie next to each other
+in the network's parameter array, are treated as a single stacked weight
+matrix: one matrix product serves all of them.
+
+The weight matrices are views into the parameter and derivative arrays of the
+original network, so both networks always share their parameters."""
+
+
+__author__ = 'agent, agent@local'
+
+
+from scipy import dot, outer, zeros
+
+from pybrain.structure.modules.module import Module
+from pybrain.structure.modules.biasunit import BiasUnit
+from pybrain.structure.modules.linearlayer import LinearLayer
+from pybrain.structure.modules.sigmoidlayer import SigmoidLayer
+from pybrain.structure.modules.tanhlayer import TanhLayer
+from pybrain.structure.modules.softmax import SoftmaxLayer
+from pybrain.structure.connections.full import FullConnection
+from pybrain.structure.connections.identity import IdentityConnection
+from pybrain.structure.connections.shared import SharedFullConnection
+from pybrain.structure.parametercontainer import ParameterContainer
+from pybrain.structure.networks.feedforward import FeedForwardNetworkComponent
+from pybrain.structure.networks.recurrent import RecurrentNetworkComponent
+
+
+# Layers without any state, whose transformations can be applied to arbitrary
+# buffers.
+statelessLayers = BiasUnit, LinearLayer, SigmoidLayer, TanhLayer, SoftmaxLayer
+
+
+class _Layer(object):
+    """A module of the original network together with the column ranges of
+    its buffers."""
+
+    def __init__(self, module, inslice, outslice):
+        self.module = module
+        self.inslice = inslice
+        self.outslice = outslice
+        self.outgoing = []
+
+
+class _Projection(object):
+    """A number of connections that leave the same slice of a layer's output
+    and are computed by a single (stacked) matrix product.
+
+    Identity connections are projections without weights."""
+
+    def __init__(self, inslice, parts, container=None, paramrange=None):
+        # Columns of the source layer's output.
+        self.inslice = inslice
+        # List of (rows of the stacked product, columns of the target input).
+        self.parts = parts
+        # Either a mother connection or the network, and the range of the
+        # weights inside its parameters.
+        self.container = container
+        self.paramrange = paramrange
+        self.weights = self.dweights = None
+
+    def bind(self):
+        """Create the views on the parameters and derivatives."""
+        if self.container is None:
+            return
+        start, stop = self.paramrange
+        rows = self.parts[-1][0].stop
+        cols = self.inslice.stop - self.inslice.start
+        self.weights = self.container.params[start:stop].view()
+        self.weights.shape = rows, cols
+        self.dweights = self.container.derivs[start:stop].view()
+        self.dweights.shape = rows, cols
+
+    def forward(self, inbuf, outbuf, inrows, outrows):
+        if self.weights is None:
+            outbuf[outrows, self.parts[0][1]] += inbuf[inrows, self.inslice]
+            return
+        product = dot(inbuf[inrows, self.inslice], self.weights.T)
+        for rows, target in self.parts:
+            outbuf[outrows, target] += product[..., rows]
+
+    def backward(self, outerr, inerr, inbuf, inrows, outrows, batch=False):
+        if self.weights is None:
+            inerr[inrows, self.inslice] += outerr[outrows, self.parts[0][1]]
+            return
+        if len(self.parts) == 1:
+            err = outerr[outrows, self.parts[0][1]]
+        else:
+            shape = outerr[outrows, self.parts[0][1]].shape[:-1]
+            err = zeros(shape + (self.weights.shape[0],), self.weights.dtype)
+            for rows, target in self.parts:
+                err[..., rows] = outerr[outrows, target]
+        inerr[inrows, self.inslice] += dot(err, self.weights)
+        if batch:
+            self.dweights += dot(err.T, inbuf[inrows, self.inslice])
+        else:
+            self.dweights += outer(err, inbuf[inrows, self.inslice])
+
+
+class FastNetwork(Module, ParameterContainer):
+    """Base class of the fast networks. Subclasses mix in the activation logic
+    of the corresponding network component."""
+
+    hasDerivatives = True
+
+    def __init__(self, net):
+        net.sortModules()
+        self.network = net
+
+        layers = {}
+        indim = outdim = 0
+        for m in net.modulesSorted:
+            if type(m) not in statelessLayers:
+                raise ValueError("Module %s can not be converted." % m)
+            layers[m] = _Layer(m, slice(indim, indim + m.indim),
+                                  slice(outdim, outdim + m.outdim))
+            indim += m.indim
+            outdim += m.outdim
+        self.layers = [layers[m] for m in net.modulesSorted]
+        self._layers = layers
+
+        # Where do the parameters of each container start?
+        self._paramindex = {}
+        index = 0
+        for pc in net._containerIterator():
+            self._paramindex[pc] = index
+            index += pc.paramdim
+
+        for m in net.modulesSorted:
+            layers[m].outgoing = self._projections(net.connections[m], layers)
+        self.recurrentProjections = self._projections(
+            getattr(net, 'recurrentConns', []), layers)
+
+        self.bufferlist = [('layerinput', indim),
+                           ('layeroutput', outdim),
+                           ('layerinputerror', indim),
+                           ('layeroutputerror', outdim)]
+        Module.__init__(self, net.indim, net.outdim, name=net.name)
+        self._bind()
+
+    def _projections(self, connections, layers):
+        """Compile the connections into projections, stacking consecutive full
+        connections with contiguous parameters."""
+        projections = []
+        previous = None
+        for c in connections:
+            source, target = layers[c.inmod], layers[c.outmod]
+            inslice = slice(source.outslice.start + c.inSliceFrom,
+                            source.outslice.start + c.inSliceTo)
+            targetslice = slice(target.inslice.start + c.outSliceFrom,
+                                target.inslice.start + c.outSliceTo)
+            if isinstance(c, SharedFullConnection):
+                parts = [(slice(0, c.outdim), targetslice)]
+                p = _Projection(inslice, parts, c.mother, (0, c.paramdim))
+            elif type(c) is FullConnection:
+                start = self._paramindex[c]
+                if (previous is not None
+                    and previous.container is self.network
+                    and previous.inslice == inslice
+                    and previous.paramrange[1] == start):
+                    # Stack the connection onto the previous one.
+                    rows = previous.parts[-1][0].stop
+                    previous.parts.append(
+                        (slice(rows, rows + c.outdim), targetslice))
+                    previous.paramrange = previous.paramrange[0], start + c.paramdim
+                    continue
+                parts = [(slice(0, c.outdim), targetslice)]
+                p = _Projection(inslice, parts, self.network,
+                                (start, start + c.paramdim))
+            elif type(c) is IdentityConnection:
+                p = _Projection(inslice, [(None, targetslice)])
+            else:
+                raise ValueError("Connection %s can not be converted." % c)
+            projections.append(p)
+            previous = p
+        return projections
+
+    def _bind(self):
+        """Create the views on the parameters of the original network."""
+        self._boundParams = self.network.params
+        self._boundDerivs = self.network.derivs
+        for layer in self.layers:
+            for p in layer.outgoing:
+                p.bind()
+        for p in self.recurrentProjections:
+            p.bind()
+
+    def _checkBinding(self):
+        # The original network might have been given new arrays meanwhile.
+        if (self.network.params is not self._boundParams or
+            self.network.derivs is not self._boundDerivs):
+            self._bind()
+
+    def _getParams(self):
+        return self.network.params
+
+    def _setParams(self, p):
+        self.network.params[:] = p
+
+    _params = property(_getParams, _setParams)
+
+    @property
+    def _derivs(self):
+        return self.network.derivs
+
+    @property
+    def paramdim(self):
+        return self.network.paramdim
+
+    def _setParameters(self, p, owner=None):
+        self.network._setParameters(p, owner)
+
+    def resetDerivatives(self):
+        self.network.resetDerivatives()
+
+    def _forward(self, inbuf, outbuf, rows, batch=False):
+        """Activate all layers on the given rows of the buffers."""
+        self._checkBinding()
+        layerin, layerout = self.layerinput, self.layeroutput
+        index = 0
+        for m in self.network.inmodules:
+            layerin[rows, self._layers[m].inslice] = inbuf[..., index:index + m.indim]
+            index += m.indim
+        self._forwardRecurrent(rows)
+        for layer in self.layers:
+            if batch:
+                layer.module._forwardBatchImplementation(
+                    layerin[rows, layer.inslice], layerout[rows, layer.outslice])
+            else:
+                layer.module._forwardImplementation(
+                    layerin[rows, layer.inslice], layerout[rows, layer.outslice])
+            for p in layer.outgoing:
+                p.forward(layerout, layerin, rows, rows)
+        index = 0
+        for m in self.network.outmodules:
+            outbuf[..., index:index + m.outdim] = layerout[rows, self._layers[m].outslice]
+            index += m.outdim
+
+    def _backward(self, outerr, inerr, rows, batch=False):
+        """Backpropagate the errors through all layers on the given rows of
+        the buffers."""
+        self._checkBinding()
+        layerin, layerout = self.layerinput, self.layeroutput
+        layerinerr, layerouterr = self.layerinputerror, self.layeroutputerror
+        index = 0
+        for m in self.network.outmodules:
+            layerouterr[rows, self._layers[m].outslice] = outerr[..., index:index + m.outdim]
+            index += m.outdim
+        self._backwardRecurrent(rows)
+        for layer in reversed(self.layers):
+            for p in layer.outgoing:
+                p.backward(layerinerr, layerouterr, layerout, rows, rows, batch)
+            if batch:
+                layer.module._backwardBatchImplementation(
+                    layerouterr[rows, layer.outslice],
+                    layerinerr[rows, layer.inslice],
+                    layerout[rows, layer.outslice],
+                    layerin[rows, layer.inslice])
+            else:
+                layer.module._backwardImplementation(
+                    layerouterr[rows, layer.outslice],
+                    layerinerr[rows, layer.inslice],
+                    layerout[rows, layer.outslice],
+                    layerin[rows, layer.inslice])
+        index = 0
+        for m in self.network.inmodules:
+            inerr[..., index:index + m.indim] = layerinerr[rows, self._layers[m].inslice]
+            index += m.indim
+
+    def _forwardRecurrent(self, rows):
+        """Hook for the inputs that arrive from the previous timestep."""
+
+    def _backwardRecurrent(self, rows):
+        """Hook for the errors that arrive from the following timestep."""
+
+
+class FastFeedForwardNetwork(FeedForwardNetworkComponent, FastNetwork):
+    """NumPy implementation of a layered FeedForwardNetwork."""
+
+    def __init__(self, net):
+        FastNetwork.__init__(self, net)
+
+    def _forwardImplementation(self, inbuf, outbuf):
+        self._forward(inbuf, outbuf, self.offset)
+
+    def _backwardImplementation(self, outerr, inerr, outbuf, inbuf):
+        self._backward(outerr, inerr, self.offset)
+
+    def _forwardBatchImplementation(self, inbuf, outbuf):
+        self._forward(inbuf, outbuf, slice(0, len(inbuf)), batch=True)
+
+    def _backwardBatchImplementation(self, outerr, inerr, outbuf, inbuf):
+        self._backward(outerr, inerr, slice(0, len(outerr)), batch=True)
+
+
+class FastRecurrentNetwork(RecurrentNetworkComponent, FastNetwork):
+    """NumPy implementation of a layered RecurrentNetwork."""
+
+    def __init__(self, net):
+        RecurrentNetworkComponent.__init__(self)
+        FastNetwork.__init__(self, net)
+        self.recurrentConns = net.recurrentConns
+
+    def _forwardImplementation(self, inbuf, outbuf):
+        self._forward(inbuf, outbuf, self.offset)
+
+    def _backwardImplementation(self, outerr, inerr, outbuf, inbuf):
+        self._backward(outerr, inerr, self.offset)
+
+    def _forwardRecurrent(self, offset):
+        if offset > 0:
+            for p in self.recurrentProjections:
+                p.forward(self.layeroutput, self.layerinput, offset - 1, offset)
+
+    def _backwardRecurrent(self, offset):
+        if not self._isLastTimestep():
+            for p in self.recurrentProjections:
+                p.backward(self.layerinputerror, self.layeroutputerror,
+                           self.layeroutput, offset, offset + 1)
+
+
+def buildFastNetwork(net):
+    """Return a fast network that shares its parameters with the given
+    FeedForwardNetwork or RecurrentNetwork.
+
+    Raise a ValueError if the network contains components that are not
+    supported."""
+    if isinstance(net, RecurrentNetworkComponent):
+        return FastRecurrentNetwork(net)
+    elif isinstance(net, FeedForwardNetworkComponent):
+        return FastFeedForwardNetwork(net)
+    raise ValueError("Only feed-forward and recurrent networks are supported.")
@@ -6,6 +6,8 @@
 
 __author__ = 'Justin Bayer, bayer.justin@googlemail.com'
 
+from scipy import zeros
+
 from pybrain.structure.networks.network import Network
 
 
@@ -18,6 +20,29 @@ class FeedForwardNetworkComponent(object):
         """Do one transformation of an input and return the result."""
         self.reset()
         return super(FeedForwardNetworkComponent, self).activate(inpt)
+    
+    def activateBatch(self, inpts):
+        """Transform a 2D array of inputs (one sample per row) at once and 
+        return the 2D array of outputs."""
+        self.reset()
+        return super(FeedForwardNetworkComponent, self).activateBatch(inpts)
+    
+    def activateOnDataset(self, dataset, batchsize=1024):
+        """Run the network's forward pass on the given dataset, `batchsize` 
+        samples at a time, and return the output."""
+        out = zeros((len(dataset), self.outdim), self.dtype)
+        # The batches may need larger buffers. The current ones are put back
+        # afterwards, so that single activations stay cheap and keep their
+        # execution plan.
+        saved = self._saveBuffers()
+        index = 0
+        # Like in Module.activateOnDataset, the first linked field is the input.
+        for batch in dataset.batches(dataset.link[0], batchsize):
+            out[index:index + len(batch)] = self.activateBatch(batch)
+            index += len(batch)
+        for module, name, buffer_ in saved:
+            setattr(module, name, buffer_)
+        return out
         
     def _forwardImplementation(self, inbuf, outbuf):
         assert self.sorted, ".sortModules() has not been called"
@@ -27,10 +52,8 @@ class FeedForwardNetworkComponent(object):
             m.inputbuffer[offset] = inbuf[index:index + m.indim]
             index += m.indim
         
-        for m in self.modulesSorted:
-            m.forward()
-            for c in self.connections[m]:
-                c.forward()
+        for kernel in self._executionPlan().forward:
+            kernel(offset, offset)
                 
         index = 0
         for m in self.outmodules:
@@ -45,14 +68,48 @@ class FeedForwardNetworkComponent(object):
             m.outputerror[offset] = outerr[index:index + m.outdim]
             index += m.outdim
         
+        for kernel in self._executionPlan().backward:
+            kernel(offset, offset)
+                
+        index = 0
+        for m in self.inmodules:
+            inerr[index:index + m.indim] = m.inputerror[offset]
+            index += m.indim
+            
+    def _forwardBatchImplementation(self, inbuf, outbuf):
+        assert self.sorted, ".sortModules() has not been called"
+        length = inbuf.shape[0]
+        index = 0
+        for m in self.inmodules:
+            m.inputbuffer[:length] = inbuf[:, index:index + m.indim]
+            index += m.indim
+        
+        for m in self.modulesSorted:
+            m.forwardBatch(length)
+            for c in self.connections[m]:
+                c.forwardBatch(length)
+                
+        index = 0
+        for m in self.outmodules:
+            outbuf[:, index:index + m.outdim] = m.outputbuffer[:length]
+            index += m.outdim
+            
+    def _backwardBatchImplementation(self, outerr, inerr, outbuf, inbuf):
+        assert self.sorted, ".sortModules() has not been called"
+        length = outerr.shape[0]
+        index = 0
+        for m in self.outmodules:
+            m.outputerror[:length] = outerr[:, index:index + m.outdim]
+            index += m.outdim
+        
         for m in reversed(self.modulesSorted):
             for c in self.connections[m]:
-                c.backward()
-            m.backward()
+                c.backwardBatch(length)
+            m.backwardBatch(length)
                 
         index = 0
         for m in self.inmodules:
-            inerr[index:index + m.indim] = m.inputerror[offset]
+            inerr[:, index:index + m.indim] = m.inputerror[:length]
             index += m.indim
             
             
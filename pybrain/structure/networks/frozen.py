@@ -0,0 +1,97 @@
+"""Module that contains the frozen structure shared by the copies of a network.
+
+Copying a network (see Network.copy()) does not copy its structure at once:
+the structure is frozen into a pickle once, which all the copies share, and a
+copy only holds its own parameters and the plain values (numbers, strings,
+lists of those, ...) among the attributes of the network. It is given a structure of its own,
+with fresh buffers, when it is first activated or reset.
+
+Copies that are only stored, mutated, compared or copied again thus cost
+little more than their parameters. Copies that are used get their structure
+from the pickle, which is much faster than a deep copy, and never share any
+buffers with each other, so they can be evaluated in parallel (each copy by a
+single thread at a time)."""
+
+
+__author__ = 'agent, agent@local'
+
+
+from cPickle import Pickler, Unpickler, HIGHEST_PROTOCOL
+from cStringIO import StringIO
+
+from scipy import zeros, dtype
+
+
+# The types of the attribute values that copies can share with the network.
+_plainTypes = (bool, int, long, float, complex, basestring, type(None), type,
+               dtype)
+
+# The attributes that a copy takes over from the network as it is now, rather
+# than as it was when frozen.
+_currentAttributes = ['_name', 'stdParams', 'mutationStd']
+
+
+def _isPlain(value):
+    if isinstance(value, (tuple, list)):
+        return all(_isPlain(x) for x in value)
+    return isinstance(value, _plainTypes)
+
+
+class FrozenStructure(object):
+    """The state of a network and all its components, as it was when frozen.
+
+    References to the network itself are kept apart, so that the structure can
+    be given to any other instance of its class."""
+
+    def __init__(self, net):
+        self.netclass = net.__class__
+        state = net.__getstate__()
+        # The plain values are given to the copies right away.
+        self.plain = dict((k, v) for k, v in state.iteritems() if _isPlain(v))
+        f = StringIO()
+        p = Pickler(f, HIGHEST_PROTOCOL)
+        p.persistent_id = lambda x: 'net' if x is net else None
+        p.dump(state)
+        self.pickled = f.getvalue()
+
+    def thaw(self, net):
+        """Return a new copy of the state, referring to `net` wherever it
+        referred to the frozen network."""
+        u = Unpickler(StringIO(self.pickled))
+        u.persistent_load = lambda _: net
+        return u.load()
+
+
+def lazyCopy(net):
+    """Return a copy of the network `net`, which has already been frozen, with
+    a copy of its parameters and no structure yet."""
+    frozen = net._frozen
+    cp = object.__new__(frozen.netclass)
+    own = cp.__dict__
+    own.update(frozen.plain)
+    for key, value in frozen.plain.iteritems():
+        # Lists (e.g. the buffer list) can be extended by every copy.
+        if isinstance(value, list):
+            own[key] = list(value)
+    for key in _currentAttributes:
+        if key in net.__dict__:
+            own[key] = net.__dict__[key]
+    own['_frozen'] = frozen
+    own['_lazy'] = True
+    if '_params' in net.__dict__:
+        own['_params'] = net._params.copy()
+        own['_derivs'] = zeros(net.paramdim, net._params.dtype)
+    return cp
+
+
+def thaw(net):
+    """Give the copy `net` a structure of its own. What has been set on the
+    copy before takes precedence over the frozen state."""
+    own = net.__dict__
+    del own['_lazy']
+    state = own['_frozen'].thaw(net)
+    state.update(own)
+    own.update(state)
+    if '_params' in own:
+        net._setParameters(net._params, net.owner)
+        net._setDerivatives(net._derivs, net.owner)
@@ -5,6 +5,8 @@ __author__ = 'Daan Wierstra and Tom Schaul'
 
 import scipy
 import logging
+from collections import deque
+from numpy.random import randn
 
 from pybrain.structure.moduleslice import ModuleSlice
 from pybrain.structure.modules.module import Module
@@ -12,6 +14,8 @@ from pybrain.structure.parametercontainer import ParameterContainer
 from pybrain.utilities import combineLists
 from pybrain.structure.connections.shared import SharedConnection
 from pybrain.structure.evolvables.evolvable import Evolvable
+from pybrain.structure.networks.plan import ExecutionPlan
+from pybrain.structure.networks.frozen import FrozenStructure, lazyCopy, thaw
 
 
 class NetworkConstructionException(Exception):
@@ -33,6 +37,18 @@ class Network(Module, ParameterContainer):
     
     offset = property(__getOffset, __setOffset)
     
+    # The compiled form of the network, see .sortModules().
+    _plan = None
+    
+    # The modules by name, see .__getitem__().
+    _moduleIndex = None
+    
+    # The structure shared by the copies of the network, see .copy().
+    _frozen = None
+    
+    # Set on copies that have not been given a structure of their own yet.
+    _lazy = False
+    
     def __init__(self, name=None, **args):
         ParameterContainer.__init__(self, **args)
         self.name = name
@@ -40,6 +56,7 @@ class Network(Module, ParameterContainer):
         # stored in a set.
         self.modules = set()
         self.modulesSorted = []
+        self._moduleIndex = {}
         # The connections are stored in a dictionary: the key is the module 
         # where the connection leaves from, the value is a list of the 
         # corresponding connections.
@@ -52,7 +69,21 @@ class Network(Module, ParameterContainer):
         # new connections are added.
         self.sorted = False
         
+    def __getattr__(self, name):
+        # Only called for attributes that are missing: copies get their 
+        # structure once it is needed.
+        if name.startswith('__') or not self._lazy:
+            raise AttributeError(name)
+        thaw(self)
+        return getattr(self, name)
+    
+    def _thaw(self):
+        """Give a copy of a network a structure of its own (see .copy())."""
+        if self._lazy:
+            thaw(self)
+        
     def __str__(self):
+        self._thaw()
         sortedByName = lambda itr: sorted(itr, key=lambda i: i.name)
         
         params = {
@@ -71,10 +102,18 @@ class Network(Module, ParameterContainer):
         
     def __getitem__(self, name):
         """Return the module with the given name."""
-        for m in self.modules:
-            if m.name == name:
-                return m
-        return None
+        self._thaw()
+        m = None
+        if self._moduleIndex is not None:
+            m = self._moduleIndex.get(name)
+        if m is None or m.name != name:
+            # Modules can be renamed after they have been added, so the index 
+            # is rebuilt before giving up.
+            self._moduleIndex = {}
+            for x in self.modules:
+                self._moduleIndex.setdefault(x.name, x)
+            m = self._moduleIndex.get(name)
+        return m
         
     def _containerIterator(self):
         """Return an iterator over the non-empty ParameterContainers of the 
@@ -97,6 +136,8 @@ class Network(Module, ParameterContainer):
             m = m.base
         if m not in self.modules:
             self.modules.add(m)
+            if self._moduleIndex is not None:
+                self._moduleIndex.setdefault(m.name, m)
         if not m in self.connections:
             self.connections[m] = []
         if m.paramdim > 0:
@@ -106,6 +147,7 @@ class Network(Module, ParameterContainer):
                 ("Module %s is sequential, and added to a FFN. Are you sure " + 
                 "you know what you're doing?") % m)
         self.sorted = False
+        self._frozen = None
 
     def addInputModule(self, m):
         """Add the given module to the network and mark it as an input module.
@@ -136,14 +178,33 @@ class Network(Module, ParameterContainer):
         elif c.paramdim > 0:
             c.owner = self
         self.sorted = False
+        self._frozen = None
 
-    def _growBuffers(self):
+    def __getstate__(self):
+        # The execution plan refers to the buffers of this very instance, so 
+        # it is left out of copies and pickles and recompiled on demand. The 
+        # frozen structure is only of use to the copies of this instance.
+        self._thaw()
+        state = self.__dict__.copy()
+        state.pop('_plan', None)
+        state.pop('_frozen', None)
+        return state
+
+    def _growBuffers(self, length=None):
+        for m in self.modules:
+            m._growBuffers(length)
+        super(Network, self)._growBuffers(length)
+        self._plan = None
+        
+    def _shiftBuffers(self, steps):
+        # The buffers stay the same objects, so the plan is still valid.
         for m in self.modules:
-            m._growBuffers()
-        super(Network, self)._growBuffers()
+            m._shiftBuffers(steps)
+        super(Network, self)._shiftBuffers(steps)
 
     def reset(self):
         """Reset all component modules and the network."""
+        self._thaw()
         Module.reset(self)
         for m in self.modules:
             m.reset()    
@@ -151,18 +212,49 @@ class Network(Module, ParameterContainer):
     def _setParameters(self, p, owner=None):        
         """ put slices of this array back into the modules """        
         ParameterContainer._setParameters(self, p, owner)
+        if self._lazy:
+            # The modules get their slices when the copy is thawed.
+            return
         index = 0
         for x in self._containerIterator():
             x._setParameters(self.params[index:index + x.paramdim], self)
             index += x.paramdim
+        self._plan = None
+    
+    def setDtype(self, dtype):
+        """Use `dtype` (e.g. 'float32') as the type of the parameters, the 
+        derivatives and the buffers of the network and all its components.
+        
+        The parameters keep their values, the buffers are reset."""
+        self._thaw()
+        self._setModuleDtype(dtype)
+        if self.paramdim > 0:
+            self._setParameters(self.params.astype(dtype))
+            self._setDerivatives(self.derivs.astype(dtype))
+        if self.sorted:
+            self._resetBuffers(self.inputbuffer.shape[0])
+            
+    def _setModuleDtype(self, dtype):
+        self.dtype = dtype
+        self._frozen = None
+        for m in self.modules:
+            if isinstance(m, Network):
+                m._setModuleDtype(dtype)
+            else:
+                m.dtype = dtype
+        for c in self._containerIterator():
+            c.dtype = dtype
     
     def _setDerivatives(self, d, owner=None):
         """ put slices of this array back into the modules """        
         ParameterContainer._setDerivatives(self, d, owner)
+        if self._lazy:
+            return
         index = 0
         for x in self._containerIterator():
             x._setDerivatives(self.derivs[index:index + x.paramdim], self)
             index += x.paramdim
+        self._plan = None
         
     def _forwardImplementation(self, inbuf, outbuf):
         raise NotImplemented("Must be implemented by subclass.")
@@ -177,30 +269,27 @@ class Network(Module, ParameterContainer):
         #     http://www.bitformation.com/art/python_toposort.html
                 
         # Create a directed graph, including a counter of incoming connections.
-        graph = {}
-        for node in self.modules:
-            if not graph.has_key(node):
-                # Zero incoming connections.
-                graph[node] = [0]
-        for c in combineLists(self.connections.values()):
-            graph[c.inmod].append(c.outmod)
-            # Update the count of incoming arcs in outnode.
-            graph[c.outmod][0] += 1 
+        graph = dict((node, [0]) for node in self.modules)
+        for conns in self.connections.itervalues():
+            for c in conns:
+                graph[c.inmod].append(c.outmod)
+                # Update the count of incoming arcs in outnode.
+                graph[c.outmod][0] += 1 
 
         # Find all roots (nodes with zero incoming arcs).
-        roots = [node for (node, nodeinfo) in graph.items() if nodeinfo[0] == 0]
+        roots = [node for (node, nodeinfo) in graph.iteritems() if nodeinfo[0] == 0]
         
         # Make sure the ordering on all runs is the same.
         roots.sort(key=lambda x: x.name)        
+        roots = deque(roots)
         
         # Repeatedly emit a root and remove it from the graph. Removing
         # a node may convert some of the node's direct children into roots.
-        # Whenever that happens, we append the new roots to the list of
+        # Whenever that happens, we append the new roots to the queue of
         # current roots.
         self.modulesSorted = []
-        while len(roots) != 0:
-            root = roots[0]
-            roots = roots[1:]
+        while roots:
+            root = roots.popleft()
             self.modulesSorted.append(root)
             for child in graph[root][1:]:
                 graph[child][0] -= 1
@@ -216,6 +305,9 @@ class Network(Module, ParameterContainer):
         datastructure.
         
         Needs to be called before activation."""
+        # Later copies take over the current structure.
+        self._thaw()
+        self._frozen = None
         if self.sorted:
             return
         # Sort the modules.
@@ -225,19 +317,29 @@ class Network(Module, ParameterContainer):
             self.connections[m].sort(key=lambda x: x.name)
         self.motherconnections.sort(key=lambda x: x.name)
             
-        # Create a single array with all parameters.
-        tmp = [pc.params for pc in self._containerIterator()]
-        total_size = sum(scipy.size(i) for i in tmp)
-        ParameterContainer.__init__(self, total_size)
+        # Create a single array with all parameters and one with all 
+        # derivatives, and make the containers use slices of them, in a 
+        # single pass over the containers.
+        containers = list(self._containerIterator())
+        total_size = sum(pc.paramdim for pc in containers)
+        self.paramdim = total_size
         if total_size > 0:
-            self.params[:] = scipy.concatenate(tmp)
-            self._setParameters(self.params)
-        
-            # Create a single array with all derivatives.
-            tmp = [pc.derivs for pc in self._containerIterator()]
-            self.resetDerivatives()
-            self.derivs[:] = scipy.concatenate(tmp)
-            self._setDerivatives(self.derivs)
+            # The values are taken from the containers, but the random draw 
+            # that used to initialize the array is kept, so that seeded runs 
+            # give the same results as before.
+            randn(total_size)
+            self.hasDerivatives = True
+            self._params = scipy.empty(total_size, self.dtype)
+            self._derivs = scipy.empty(total_size, self.dtype)
+            index = 0
+            for pc in containers:
+                params = self._params[index:index + pc.paramdim]
+                derivs = self._derivs[index:index + pc.paramdim]
+                params[:] = pc.params
+                derivs[:] = pc.derivs
+                pc._setParameters(params, self)
+                pc._setDerivatives(derivs, self)
+                index += pc.paramdim
         
         # TODO: make this a property; indim and outdim are invalid before 
         # .sortModules is called!
@@ -245,24 +347,58 @@ class Network(Module, ParameterContainer):
         self.indim = sum(m.indim for m in self.inmodules)
         self.outdim = sum(m.outdim for m in self.outmodules)
 
-        self.indim = 0
-        for m in self.inmodules:
-            self.indim += m.indim
-        self.outdim = 0
-        for m in self.outmodules:
-            self.outdim += m.outdim
-
         # Initialize the network buffers.
         self.bufferlist = []
         Module.__init__(self, self.indim, self.outdim, name=self.name)
         self.sorted = True
+        # The network is compiled into a flat list of kernels on its first 
+        # activation, see ._executionPlan(). Networks that are only built, 
+        # copied or stored do not pay for it.
+        self._plan = None
+        
+    def _executionPlan(self):
+        """Return the execution plan of the network, recompiling it if the 
+        buffers or parameters have been reallocated since."""
+        if self._plan is None:
+            self._plan = self._compilePlan()
+        return self._plan
+        
+    def _compilePlan(self):
+        """Return a new execution plan of the network."""
+        return ExecutionPlan(self)
+        
+    def _saveBuffers(self):
+        # The execution plan is bound to the current buffers, so it is kept 
+        # along with them.
+        saved = super(Network, self)._saveBuffers()
+        saved.append((self, '_plan', self._plan))
+        for m in self.modules:
+            saved += m._saveBuffers()
+        return saved
         
     def _resetBuffers(self, length=1):
         super(Network, self)._resetBuffers(length)
         for m in self.modules:
             m._resetBuffers(length)
+        self._plan = None
     
     def copy(self, keepBuffers=False):
+        """Return a copy of the network, with a copy of the parameters.
+        
+        The copies of a sorted network share its structure, frozen on the 
+        first copy, and only get a structure of their own when they are first 
+        activated or reset (see pybrain.structure.networks.frozen). Adding 
+        modules or connections, sorting and .setDtype() show in later copies; 
+        other changes to the components of the network only do once 
+        .sortModules() has been called again.
+        
+        If `keepBuffers` is set, the network is copied as a whole instead, 
+        with the current values of its buffers."""
+        if self.sorted and not keepBuffers:
+            if self._frozen is None:
+                self._resetBuffers()
+                self._frozen = FrozenStructure(self)
+            return lazyCopy(self)
         if not keepBuffers:
             self._resetBuffers()
         cp = Evolvable.copy(self)
@@ -271,15 +407,23 @@ class Network(Module, ParameterContainer):
         return cp
 
     def convertToFastNetwork(self):
-        """ Attempt to transform the network into a fast network. If fast networks are not available,
-        or the network cannot be converted, it returns None. """
+        """ Attempt to transform the network into a fast network. If the network 
+        cannot be converted, it returns None. 
+        
+        The C++ networks of arac are used if available. Otherwise, the network 
+        is compiled into a NumPy network (see pybrain.structure.networks.fast),
+        which shares its parameters with this network. """
         
         from pybrain.structure.networks import FeedForwardNetwork, RecurrentNetwork
         try:
             from arac.pybrainbridge import _RecurrentNetwork, _FeedForwardNetwork #@UnresolvedImport
-        except:
-            print "No fast networks available."
-            return None
+        except ImportError:
+            from pybrain.structure.networks.fast import buildFastNetwork
+            try:
+                return buildFastNetwork(self)
+            except ValueError:
+                print "Network cannot be converted."
+                return None
         
         net = self.copy()
         if isinstance(net, FeedForwardNetwork):
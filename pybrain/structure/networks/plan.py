@@ -0,0 +1,268 @@
+"""Module that contains the execution plans of networks.
+
+An execution plan is a flat list of kernels, into which a sorted network is
+compiled once. Each kernel is a closure over the buffers and parameter views
+of the modules and connections it handles, so executing the plan does not
+need to walk the module graph, look up the connections, slice the buffers or
+dispatch through several layers of methods for every timestep.
+
+Every kernel is called with two offsets, the one for the incoming and the one
+for the outgoing side (modules only use the first one).
+
+Since the kernels hold on to the arrays themselves, a plan becomes invalid as
+soon as the buffers or parameters of the network are reallocated; the network
+takes care of dropping it in that case."""
+
+
+__author__ = 'agent, agent@local'
+
+
+from scipy import dot, outer, zeros
+
+from pybrain.structure.modules.module import Module
+from pybrain.structure.modules.biasunit import BiasUnit
+from pybrain.structure.connections.connection import Connection
+from pybrain.structure.connections.full import FullConnection
+from pybrain.structure.connections.shared import SharedFullConnection
+
+
+def _overrides(obj, cls, methodname):
+    """Tell whether `obj` replaces the method `methodname` of `cls`."""
+    return getattr(type(obj), methodname).im_func is not \
+           getattr(cls, methodname).im_func
+
+
+def _isPlainFull(c):
+    """Tell whether the connection computes a plain matrix product with its
+    parameters, which allows to fuse it with others."""
+    return type(c) in (FullConnection, SharedFullConnection)
+
+
+def _matrixView(a, shape):
+    """Return a view of `a` with the given shape; fail if that is only possible
+    by copying, since the kernels would not see later changes then."""
+    view = a.view()
+    view.shape = shape
+    return view
+
+
+def _isWhole(c):
+    """Tell whether the connection spans the whole buffers of both of its
+    modules, so that it can work on entire rows."""
+    return (c.inSliceFrom == 0 and c.inSliceTo == c.inmod.outdim and
+            c.outSliceFrom == 0 and c.outSliceTo == c.outmod.indim)
+
+
+def _shared(buffers):
+    """Return the buffer if all of `buffers` are the same one, else None."""
+    if buffers and all(b is buffers[0] for b in buffers):
+        return buffers[0]
+
+
+def _isBias(c):
+    """Tell whether the connection leaves from a bias unit, whose output is
+    constantly one. The matrix product then reduces to adding the weights."""
+    return type(c.inmod) is BiasUnit and c.indim == 1
+
+
+def moduleForwardKernel(m):
+    if _overrides(m, Module, 'forward'):
+        def kernel(offset, _):
+            m.forward()
+        return kernel
+    impl = m._forwardImplementation
+    inbuf, outbuf = m.inputbuffer, m.outputbuffer
+    def kernel(offset, _):
+        impl(inbuf[offset], outbuf[offset])
+    return kernel
+
+
+def moduleBackwardKernel(m, setOffset=False):
+    if _overrides(m, Module, 'backward'):
+        if setOffset:
+            def kernel(offset, _):
+                m.offset = offset
+                m.backward()
+        else:
+            def kernel(offset, _):
+                m.backward()
+        return kernel
+    impl = m._backwardImplementation
+    outerr, inerr = m.outputerror, m.inputerror
+    outbuf, inbuf = m.outputbuffer, m.inputbuffer
+    if setOffset:
+        def kernel(offset, _):
+            m.offset = offset
+            impl(outerr[offset], inerr[offset], outbuf[offset], inbuf[offset])
+    else:
+        def kernel(offset, _):
+            impl(outerr[offset], inerr[offset], outbuf[offset], inbuf[offset])
+    return kernel
+
+
+def connectionForwardKernels(connections):
+    """Return the kernels that propagate the outputs through the given
+    connections. All plain full connections are fused into a single kernel."""
+    kernels = []
+    products = []
+    biases = []
+    whole = True
+    for c in connections:
+        inslice = slice(c.inSliceFrom, c.inSliceTo)
+        outslice = slice(c.outSliceFrom, c.outSliceTo)
+        if _isPlainFull(c):
+            weights = _matrixView(c.params, (c.outdim, c.indim))
+            if _isBias(c):
+                biases.append((weights[:, 0], c.outmod.inputbuffer, outslice))
+            else:
+                products.append((weights, c.inmod.outputbuffer, inslice,
+                                 c.outmod.inputbuffer, outslice))
+            whole = whole and _isWhole(c)
+        elif _overrides(c, Connection, 'forward'):
+            kernels.append(lambda inoffset, outoffset, c=c:
+                           c.forward(inoffset, outoffset))
+        else:
+            kernels.append(_connectionForward(c, inslice, outslice))
+
+    target = _shared([p[3] for p in products] + [b[1] for b in biases])
+    if whole and target is not None:
+        kernels.insert(0, _wholeForward([p[:2] for p in products],
+                                        [b[0] for b in biases], target))
+    elif products or biases:
+        def kernel(inoffset, outoffset):
+            for weights, outbuf, outslice in biases:
+                outbuf[outoffset, outslice] += weights
+            for weights, inbuf, inslice, outbuf, outslice in products:
+                outbuf[outoffset, outslice] += dot(weights,
+                                                   inbuf[inoffset, inslice])
+        kernels.insert(0, kernel)
+    return kernels
+
+
+def _wholeForward(products, biases, target):
+    """Return the kernel for connections into the whole input of the same
+    module: their contributions are summed up and added to its row at once,
+    which avoids slicing the buffers for every connection."""
+    def kernel(inoffset, outoffset):
+        total = zeros(target.shape[1], target.dtype)
+        for weights, inbuf in products:
+            total += dot(weights, inbuf[inoffset])
+        for weights in biases:
+            total += weights
+        target[outoffset] += total
+    return kernel
+
+
+def connectionBackwardKernels(connections):
+    """Return the kernels that propagate the errors back through the given
+    connections. All plain full connections are fused into a single kernel."""
+    kernels = []
+    products = []
+    biases = []
+    whole = True
+    for c in connections:
+        inslice = slice(c.inSliceFrom, c.inSliceTo)
+        outslice = slice(c.outSliceFrom, c.outSliceTo)
+        if _isPlainFull(c):
+            weights = _matrixView(c.params, (c.outdim, c.indim))
+            dweights = _matrixView(c.derivs, (c.outdim, c.indim))
+            if _isBias(c):
+                # The error on the output of a bias unit is never used.
+                biases.append((dweights[:, 0], c.outmod.inputerror, outslice))
+            else:
+                products.append((weights, dweights,
+                                 c.inmod.outputbuffer, c.inmod.outputerror,
+                                 inslice, c.outmod.inputerror, outslice))
+            whole = whole and _isWhole(c)
+        elif _overrides(c, Connection, 'backward'):
+            kernels.append(lambda inoffset, outoffset, c=c:
+                           c.backward(inoffset, outoffset))
+        else:
+            kernels.append(_connectionBackward(c, inslice, outslice))
+
+    source = _shared([p[2] for p in products])
+    if whole and (source is not None or not products):
+        inerr = products[0][3] if products else None
+        kernels.insert(0, _wholeBackward([(p[0], p[1], p[5]) for p in products],
+                                         [b[:2] for b in biases], source, inerr))
+    elif products or biases:
+        def kernel(inoffset, outoffset):
+            for dweights, outerr, outslice in biases:
+                dweights += outerr[outoffset, outslice]
+            for weights, dweights, inbuf, inerr, inslice, outerr, outslice \
+                in products:
+                err = outerr[outoffset, outslice]
+                inerr[inoffset, inslice] += dot(err, weights)
+                dweights += outer(err, inbuf[inoffset, inslice])
+        kernels.insert(0, kernel)
+    return kernels
+
+
+def _wholeBackward(products, biases, inbuf, inerr):
+    """Return the kernel for connections from the whole output of the same
+    module (or from bias units), which works on entire rows."""
+    def kernel(inoffset, outoffset):
+        for dweights, outerr in biases:
+            dweights += outerr[outoffset]
+        if products:
+            x = inbuf[inoffset]
+            total = zeros(inerr.shape[1], inerr.dtype)
+            for weights, dweights, outerr in products:
+                err = outerr[outoffset]
+                total += dot(err, weights)
+                dweights += outer(err, x)
+            inerr[inoffset] += total
+    return kernel
+
+
+def _connectionForward(c, inslice, outslice):
+    impl = c._forwardImplementation
+    inbuf, outbuf = c.inmod.outputbuffer, c.outmod.inputbuffer
+    def kernel(inoffset, outoffset):
+        impl(inbuf[inoffset, inslice], outbuf[outoffset, outslice])
+    return kernel
+
+
+def _connectionBackward(c, inslice, outslice):
+    impl = c._backwardImplementation
+    outerr, inerr = c.outmod.inputerror, c.inmod.outputerror
+    inbuf = c.inmod.outputbuffer
+    def kernel(inoffset, outoffset):
+        impl(outerr[outoffset, outslice], inerr[inoffset, inslice],
+             inbuf[inoffset, inslice])
+    return kernel
+
+
+class ExecutionPlan(object):
+    """The compiled form of a sorted network.
+
+    `forward` and `backward` hold the kernels for a single timestep,
+    `recurrentForward` and `recurrentBackward` the kernels that connect a
+    timestep with its predecessor."""
+
+    def __init__(self, net):
+        recurrentConns = getattr(net, 'recurrentConns', [])
+        # The modules of recurrent networks have to know which timestep they
+        # are working on during the backward pass.
+        setOffset = net.sequential
+
+        # Forward pass: gather the incoming connections of every module right
+        # before its activation, so that they can be fused.
+        incoming = dict((m, []) for m in net.modulesSorted)
+        for m in net.modulesSorted:
+            for c in net.connections[m]:
+                incoming[c.outmod].append(c)
+        self.forward = []
+        for m in net.modulesSorted:
+            self.forward += connectionForwardKernels(incoming[m])
+            self.forward.append(moduleForwardKernel(m))
+
+        # Backward pass: the outgoing connections of every module are fused,
+        # their errors are summed up before the module itself is processed.
+        self.backward = []
+        for m in reversed(net.modulesSorted):
+            self.backward += connectionBackwardKernels(net.connections[m])
+            self.backward.append(moduleBackwardKernel(m, setOffset))
+
+        self.recurrentForward = connectionForwardKernels(recurrentConns)
+        self.recurrentBackward = connectionBackwardKernels(recurrentConns)
@@ -8,7 +8,11 @@
 __author__ = 'Justin Bayer, bayer.justin@googlemail.com'
 
 
+from scipy import asarray, newaxis
+
+from pybrain.structure.modules.module import Module
 from pybrain.structure.networks.network import Network
+from pybrain.structure.networks.plan import _overrides
 from pybrain.structure.connections.shared import SharedConnection
 
 
@@ -16,6 +20,10 @@ class RecurrentNetworkComponent(object):
     
     sequential = True
     
+    # If set, the buffers only keep that many past timesteps, see 
+    # .limitHistory().
+    historylength = None
+    
     def __init__(self, name=None, *args, **kwargs):
         self.recurrentConns = []
         self.maxoffset = 0
@@ -43,6 +51,7 @@ class RecurrentNetworkComponent(object):
             c.owner = self
         self.recurrentConns.append(c)
         self.sorted = False
+        self._frozen = None
         
     def activate(self, inpt):
         """Do one transformation of an input and return the result."""
@@ -57,10 +66,126 @@ class RecurrentNetworkComponent(object):
         self.backward()
         return self.inputerror[self.offset].copy()
 
+    def limitHistory(self, steps):
+        """Only keep the last `steps` timesteps in the buffers, instead of the
+        whole history since the last .reset(). 
+        
+        This is meant for unbounded online use: the buffers are allocated once
+        for twice that many timesteps. Whenever they are full, the last `steps`
+        timesteps are moved to their front, so the memory stays bounded. 
+        Backpropagation through time can go back at least `steps` timesteps 
+        (truncated BPTT). Pass None to let the buffers grow again."""
+        assert steps is None or steps > 0
+        self.historylength = steps
+        if steps is not None:
+            self.reserve(2 * steps)
+        
+    def _dropHistory(self, steps):
+        """Forget the oldest `steps` timesteps."""
+        self._shiftBuffers(steps)
+        self.offset -= steps
+        self.maxoffset = max(self.maxoffset - steps, self.offset)
+            
+    def activateSequenceBatch(self, inpts):
+        """Transform a batch of input sequences at once and return the outputs.
+        
+        The inputs are given as a 3D array of shape (time, batch, dim), the 
+        outputs are returned in the same layout. Sequences of different lengths
+        have to be padded at their end; the outputs at those timesteps are 
+        meaningless and should be masked out in .backActivateSequenceBatch().
+        
+        Internally, the buffers hold the timesteps one after the other, each as
+        a block of rows (one per sequence). This resets the network."""
+        self._checkSequenceBatch()
+        inpts = asarray(inpts)
+        length, batchsize, _ = inpts.shape
+        rows = length * batchsize
+        if self.inputbuffer.shape[0] != rows:
+            self._resetBuffers(rows)
+        self.reset()
+        self.inputbuffer[:] = inpts.reshape(rows, self.indim)
+        self._forwardSequenceBatch(length, batchsize)
+        self._sequenceBatchShape = length, batchsize
+        return self.outputbuffer.reshape(length, batchsize, self.outdim).copy()
+        
+    def backActivateSequenceBatch(self, outerrs, mask=None):
+        """Backpropagate the output errors of the batch of sequences given to
+        the last call of .activateSequenceBatch() through time and return the
+        input errors. The derivatives are summed over all sequences.
+        
+        `outerrs` is a 3D array of shape (time, batch, dim). If given, `mask`
+        is an array of shape (time, batch) that is 1 for the actual samples 
+        and 0 for the padding, which has to be at the end of the sequences."""
+        length, batchsize = self._sequenceBatchShape
+        outerrs = asarray(outerrs).reshape(length * batchsize, self.outdim)
+        if mask is not None:
+            outerrs = outerrs * asarray(mask).reshape(length * batchsize)[:, newaxis]
+        self.outputerror[:] = outerrs
+        self._backwardSequenceBatch(length, batchsize)
+        return self.inputerror.reshape(length, batchsize, self.indim).copy()
+    
+    def _checkSequenceBatch(self):
+        # Only networks made of modules know how to do it, not e.g. the fast 
+        # networks that mix in this component.
+        if not isinstance(self, Network):
+            raise ValueError("%s cannot process batches of sequences." % self.name)
+        assert self.sorted, ".sortModules() has not been called"
+        for m in self.modules:
+            # Nested networks keep only a single batch in their buffers, and 
+            # sequential modules have to know about the layout of the rows.
+            if (isinstance(m, Network) or 
+                m.sequential and not _overrides(m, Module, 'forwardBatch')):
+                raise ValueError("%s cannot process batches of sequences." % m)
+        
+    def _forwardSequenceBatch(self, length, batchsize):
+        index = 0
+        for m in self.inmodules:
+            m.inputbuffer[:] = self.inputbuffer[:, index:index + m.indim]
+            index += m.indim
+        
+        for t in range(length):
+            offset = t * batchsize
+            if t > 0:
+                for c in self.recurrentConns:
+                    c.forwardBatch(batchsize, offset - batchsize, offset)
+            for m in self.modulesSorted:
+                m.forwardBatch(batchsize, offset)
+                for c in self.connections[m]:
+                    c.forwardBatch(batchsize, offset, offset)
+                    
+        index = 0
+        for m in self.outmodules:
+            self.outputbuffer[:, index:index + m.outdim] = m.outputbuffer
+            index += m.outdim
+        
+    def _backwardSequenceBatch(self, length, batchsize):
+        index = 0
+        for m in self.outmodules:
+            m.outputerror[:] = self.outputerror[:, index:index + m.outdim]
+            index += m.outdim
+            
+        for t in reversed(range(length)):
+            offset = t * batchsize
+            if t < length - 1:
+                for c in self.recurrentConns:
+                    c.backwardBatch(batchsize, offset, offset + batchsize)
+            for m in reversed(self.modulesSorted):
+                for c in self.connections[m]:
+                    c.backwardBatch(batchsize, offset, offset)
+                m.backwardBatch(batchsize, offset)
+                
+        index = 0
+        for m in self.inmodules:
+            self.inputerror[:, index:index + m.indim] = m.inputerror
+            index += m.indim
+        
     def forward(self):
         """Produce the output from the input."""
         if not (self.offset + 1 < self.inputbuffer.shape[0]):
-            self._growBuffers()
+            if self.historylength and self.offset > self.historylength:
+                self._dropHistory(self.offset - self.historylength)
+            else:
+                self._growBuffers()
         super(RecurrentNetworkComponent, self).forward()
         self.offset += 1
         self.maxoffset = max(self.offset, self.maxoffset)
@@ -82,14 +207,13 @@ class RecurrentNetworkComponent(object):
             m.inputbuffer[offset] = inbuf[index:index + m.indim]
             index += m.indim
         
+        plan = self._executionPlan()
         if offset > 0:
-            for c in self.recurrentConns:
-                c.forward(offset - 1, offset)
+            for kernel in plan.recurrentForward:
+                kernel(offset - 1, offset)
         
-        for m in self.modulesSorted:
-            m.forward()
-            for c in self.connections[m]:
-                c.forward(offset, offset)
+        for kernel in plan.forward:
+            kernel(offset, offset)
 
         index = 0
         for m in self.outmodules:
@@ -104,15 +228,13 @@ class RecurrentNetworkComponent(object):
             m.outputerror[offset] = outerr[index:index + m.outdim]
             index += m.outdim
         
+        plan = self._executionPlan()
         if not self._isLastTimestep():
-            for c in self.recurrentConns:
-                c.backward(offset, offset + 1)
-        
-        for m in reversed(self.modulesSorted):
-            for c in self.connections[m]:
-                c.backward(offset, offset)
-            m.offset = offset
-            m.backward()
+            for kernel in plan.recurrentBackward:
+                kernel(offset, offset + 1)
+        
+        for kernel in plan.backward:
+            kernel(offset, offset)
                 
         index = 0
         for m in self.inmodules:
@@ -0,0 +1,324 @@
+"""Module that contains the sweep plan of swiping networks.
+
+The hidden modules of a swiping network (one per cell of the grid and swipe
+direction) only depend on their predecessors along every dimension. All the
+modules on a wavefront (an anti-diagonal of the grid, for every swipe
+direction) are thus independent of each other and can be processed at once.
+
+The sweep plan keeps the buffers of all hidden modules side by side, ordered
+by wavefront, and processes every wavefront by a few array operations: one for
+every group of connections that share their weights, and one for the modules
+themselves. A pass then takes a number of steps proportional to the sum of the
+side lengths of the grid, instead of the number of modules.
+
+The hidden modules keep views on the joint buffers, so they can be inspected
+as usual. The other modules of the network are handled by the same kernels as
+in an execution plan."""
+
+
+__author__ = 'agent, agent@local'
+
+
+from copy import copy
+
+from scipy import array, zeros, dot, arange, unique, bincount
+
+from pybrain.structure.modules.module import Module
+from pybrain.structure.connections.full import FullConnection
+from pybrain.structure.connections.identity import IdentityConnection
+from pybrain.structure.connections.shared import SharedFullConnection
+from pybrain.structure.networks.network import Network
+from pybrain.structure.networks.plan import _overrides, _matrixView, \
+    moduleForwardKernel, moduleBackwardKernel, connectionForwardKernels, \
+    connectionBackwardKernels
+
+
+class _Ends(object):
+    """One side of a group of connections: the positions of their values in
+    the (flattened) buffers of a module, or in the joint buffers of the hidden
+    modules. There is one row of positions per connection."""
+
+    def __init__(self, values, errors, indices):
+        self.values = values
+        self.errors = errors
+        self.indices = indices
+        # if positions repeat, the additions need to be summed up first
+        self.repeated = len(unique(indices)) < indices.size
+
+    def get(self, buf, offset):
+        return buf[offset].reshape(-1)[self.indices]
+
+    def add(self, buf, offset, x):
+        flat = buf[offset].reshape(-1)
+        if self.repeated:
+            flat += bincount(self.indices.ravel(), x.ravel(), len(flat))
+        else:
+            flat[self.indices] += x
+
+
+class _ConnectionGroup(object):
+    """A group of connections with the same weights (or none, for identity
+    connections), which are processed together."""
+
+    def __init__(self, conns, inends, outends):
+        self.inends = inends
+        self.outends = outends
+        c = conns[0]
+        if type(c) is IdentityConnection:
+            self.weights = None
+        else:
+            self.weights = _matrixView(c.params, (c.outdim, c.indim))
+            self.dweights = _matrixView(c.derivs, (c.outdim, c.indim))
+
+    def forward(self, offset):
+        x = self.inends.get(self.inends.values, offset)
+        if self.weights is not None:
+            x = dot(x, self.weights.T)
+        self.outends.add(self.outends.values, offset, x)
+
+    def backward(self, offset):
+        err = self.outends.get(self.outends.errors, offset)
+        if self.weights is None:
+            self.inends.add(self.inends.errors, offset, err)
+        else:
+            self.inends.add(self.inends.errors, offset, dot(err, self.weights))
+            self.dweights += dot(err.T, self.inends.get(self.inends.values, offset))
+
+
+class SweepPlan(object):
+    """The compiled form of a sorted feed-forward network, in which the given
+    `hidden` modules are processed wavefront by wavefront.
+
+    Like an ExecutionPlan, it has the kernels of a forward and a backward pass
+    in `forward` and `backward`. Raises a ValueError if the hidden modules
+    cannot be processed together: they all need to be of the same class and
+    size, without parameters, and connected by full, shared full or identity
+    connections only."""
+
+    recurrentForward = []
+    recurrentBackward = []
+
+    def __init__(self, net, hidden):
+        if net.sequential:
+            raise ValueError("Only feed-forward networks can be swept.")
+        hidden = set(hidden)
+        if not hidden or not hidden <= net.modules:
+            raise ValueError("The hidden modules are not part of the network.")
+        incoming = dict((m, []) for m in net.modulesSorted)
+        for m in net.modulesSorted:
+            for c in net.connections[m]:
+                incoming[c.outmod].append(c)
+        self._checkModules(hidden)
+
+        # Every hidden module comes one wavefront after its last predecessor.
+        level = {}
+        for m in net.modulesSorted:
+            if m in hidden:
+                level[m] = max([level[c.inmod] + 1 for c in incoming[m]
+                                if c.inmod in hidden] + [0])
+        ordered = sorted([m for m in net.modulesSorted if m in hidden],
+                         key=lambda m: level[m])
+        self.row = dict((m, i) for i, m in enumerate(ordered))
+        self.levels = []
+        for i, m in enumerate(ordered):
+            if level[m] == len(self.levels):
+                self.levels.append([i, i])
+            self.levels[-1][1] = i + 1
+
+        # The other modules come before or after the hidden ones.
+        after = set()
+        for m in net.modulesSorted:
+            if m not in hidden and [c for c in incoming[m]
+                                    if c.inmod in hidden or c.inmod in after]:
+                after.add(m)
+        before = [m for m in net.modulesSorted
+                  if m not in hidden and m not in after]
+        after = [m for m in net.modulesSorted if m in after]
+
+        # Group the connections of the hidden modules.
+        pre, post, inner = [], [], []
+        for m in net.modulesSorted:
+            for c in net.connections[m]:
+                if (c.inmod in hidden or c.outmod in hidden) and type(c) not in \
+                    (FullConnection, SharedFullConnection, IdentityConnection):
+                    raise ValueError("%s cannot be swept." % c)
+                if c.outmod in hidden:
+                    if c.inmod in hidden:
+                        inner.append(c)
+                    elif c.inmod in before:
+                        pre.append(c)
+                    else:
+                        raise ValueError("The hidden modules are not a "
+                                         "contiguous part of the network.")
+                elif c.inmod in hidden:
+                    post.append(c)
+        self._adoptBuffers(ordered)
+        self.pre = self._group(pre)
+        self.post = self._group(post)
+        # Forward, the connections are processed before the wavefront they
+        # lead to, backward after the one they come from.
+        leadingTo = [[] for _ in self.levels]
+        comingFrom = [[] for _ in self.levels]
+        for c in inner:
+            leadingTo[level[c.outmod]].append(c)
+            comingFrom[level[c.inmod]].append(c)
+        self.forwardGroups = map(self._group, leadingTo)
+        self.backwardGroups = map(self._group, comingFrom)
+
+        self.forward = []
+        for m in before:
+            self.forward += connectionForwardKernels(incoming[m])
+            self.forward.append(moduleForwardKernel(m))
+        self.forward.append(self._sweepForward)
+        for m in after:
+            self.forward += connectionForwardKernels(
+                [c for c in incoming[m] if c.inmod not in hidden])
+            self.forward.append(moduleForwardKernel(m))
+
+        self.backward = []
+        for m in reversed(after):
+            self.backward += connectionBackwardKernels(net.connections[m])
+            self.backward.append(moduleBackwardKernel(m))
+        self.backward.append(self._sweepBackward)
+        for m in reversed(before):
+            self.backward += connectionBackwardKernels(
+                [c for c in net.connections[m] if c.outmod not in hidden])
+            self.backward.append(moduleBackwardKernel(m))
+        self.others = before + after
+
+    def _checkModules(self, hidden):
+        m = iter(hidden).next()
+        for x in hidden:
+            if (type(x) is not type(m) or x.indim != m.indim
+                or x.outdim != m.outdim or x.bufferlist != m.bufferlist):
+                raise ValueError("The hidden modules need to be identical.")
+        if m.paramdim or m.sequential or isinstance(m, Network):
+            raise ValueError("Modules with parameters, sequential modules and "
+                             "networks cannot be swept.")
+        if _overrides(m, Module, 'forward') or _overrides(m, Module, 'backward'):
+            raise ValueError("Modules need to use the standard passes.")
+        # Modules with internal buffers need to know where they are stored.
+        self.stepwise = len(m.bufferlist) > 4
+        if self.stepwise and not hasattr(m, '_forwardStep'):
+            raise ValueError("%s cannot process several cells at once." % m)
+
+    def _adoptBuffers(self, ordered):
+        """Allocate the joint buffers (time, modules, values), and make the
+        modules use views on them."""
+        m = ordered[0]
+        self.buffers = {}
+        for name, dim in m.bufferlist:
+            buf = getattr(m, name)
+            joint = zeros((buf.shape[0], len(ordered), dim), buf.dtype)
+            for i, x in enumerate(ordered):
+                joint[:, i] = getattr(x, name)
+                setattr(x, name, joint[:, i])
+            self.buffers[name] = joint
+        # A stand-in for all the modules, working on the joint buffers.
+        self.worker = copy(m)
+        self.worker.__dict__.update(self.buffers)
+
+    def _ends(self, conns, incoming):
+        """The positions in the buffers of one side of the given connections."""
+        if incoming:
+            mods = [c.inmod for c in conns]
+            starts = [c.inSliceFrom for c in conns]
+            dim = conns[0].indim
+        else:
+            mods = [c.outmod for c in conns]
+            starts = [c.outSliceFrom for c in conns]
+            dim = conns[0].outdim
+        if mods[0] in self.row:
+            rowdim = mods[0].outdim if incoming else mods[0].indim
+            starts = [self.row[m] * rowdim + s for m, s in zip(mods, starts)]
+            names = ['outputbuffer', 'outputerror'] if incoming else \
+                    ['inputbuffer', 'inputerror']
+            values, errors = [self.buffers[n] for n in names]
+        elif incoming:
+            values, errors = mods[0].outputbuffer, mods[0].outputerror
+        else:
+            values, errors = mods[0].inputbuffer, mods[0].inputerror
+        indices = array(starts)[:, None] + arange(dim)
+        return _Ends(values, errors, indices)
+
+    def _group(self, conns):
+        """Split the connections into groups that can be processed at once:
+        with the same weights, at the same place in their modules, and every
+        hidden module at most once on each side."""
+        groups = {}
+        keys = []
+        for c in conns:
+            if type(c) is IdentityConnection:
+                weights = None
+            elif type(c) is SharedFullConnection:
+                weights = c.mother
+            else:
+                weights = c
+            key = [weights, c.indim, c.outdim]
+            for m, start in [(c.inmod, c.inSliceFrom), (c.outmod, c.outSliceFrom)]:
+                key += [start, None] if m in self.row else [None, m]
+            key = tuple(key)
+            if key not in groups:
+                groups[key] = []
+                keys.append(key)
+            batches = groups[key]
+            used = [self.row.get(c.inmod), self.row.get(c.outmod)]
+            for batch, usedin, usedout in batches:
+                if used[0] not in usedin and used[1] not in usedout:
+                    break
+            else:
+                batch, usedin, usedout = [], set(), set()
+                batches.append((batch, usedin, usedout))
+            batch.append(c)
+            if used[0] is not None:
+                usedin.add(used[0])
+            if used[1] is not None:
+                usedout.add(used[1])
+        res = []
+        for key in keys:
+            for batch, _, _ in groups[key]:
+                res.append(_ConnectionGroup(batch, self._ends(batch, True),
+                                            self._ends(batch, False)))
+        return res
+
+    def _sweepForward(self, offset, _):
+        for g in self.pre:
+            g.forward(offset)
+        b = self.buffers
+        for (start, stop), groups in zip(self.levels, self.forwardGroups):
+            for g in groups:
+                g.forward(offset)
+            now = (offset, slice(start, stop))
+            if self.stepwise:
+                self.worker._forwardStep(b['inputbuffer'][now],
+                                         b['outputbuffer'][now], now)
+            else:
+                self.worker._forwardBatchImplementation(b['inputbuffer'][now],
+                                                        b['outputbuffer'][now])
+        for g in self.post:
+            g.forward(offset)
+
+    def _sweepBackward(self, offset, _):
+        for g in self.post:
+            g.backward(offset)
+        b = self.buffers
+        for (start, stop), groups in reversed(zip(self.levels,
+                                                  self.backwardGroups)):
+            for g in groups:
+                g.backward(offset)
+            now = (offset, slice(start, stop))
+            args = (b['outputerror'][now], b['inputerror'][now],
+                    b['outputbuffer'][now], b['inputbuffer'][now])
+            if self.stepwise:
+                self.worker._backwardStep(*(args + (now,)))
+            else:
+                self.worker._backwardBatchImplementation(*args)
+        for g in self.pre:
+            g.backward(offset)
+
+    def reset(self):
+        """Set the buffers of all modules to zero."""
+        for buf in self.buffers.values():
+            buf[:] = 0
+        for m in self.others:
+            m.reset()
@@ -1,6 +1,9 @@
 __author__ = 'Tom Schaul, tom@idsia.ch'
 
 from pybrain.structure.networks.feedforward import FeedForwardNetwork
+from pybrain.structure.networks.sweep import SweepPlan
+from pybrain.structure.modules.module import Module
+from pybrain.structure.moduleslice import ModuleSlice
 from pybrain.structure.connections.shared import MotherConnection, SharedFullConnection
 from pybrain.utilities import iterCombinations
 
@@ -20,6 +23,13 @@ class SwipingNetwork(FeedForwardNetwork):
     
     # dimensions of the swiping grid
     dims = None
+    
+    # process the hidden modules wavefront by wavefront (see the SweepPlan), 
+    # instead of one by one, whenever the structure allows it
+    sweep = True
+    
+    # the modules of the hidden mesh
+    _hiddenModules = None
         
     def __init__(self, inmesh=None, hiddenmesh=None, outmesh=None, predefined=None, **args):
         if predefined != None:
@@ -64,6 +74,8 @@ class SwipingNetwork(FeedForwardNetwork):
             self.addOutputModule(c)
         for c in hiddenmesh:
             self.addModule(c)
+        self._hiddenModules = [c.base if isinstance(c, ModuleSlice) else c 
+                               for c in hiddenmesh]
         
         # create the motherconnections if they are not provided
         if 'inconn' not in self.predefined:
@@ -115,6 +127,22 @@ class SwipingNetwork(FeedForwardNetwork):
                     if previousunit[dim] >= 0 and previousunit[dim] < maxval:
                         self.addConnection(SharedFullConnection(hconn, hiddenmesh[previousunit], hiddenmesh[hunit]))                                
         
+    def _compilePlan(self):
+        if self.sweep and self._hiddenModules:
+            try:
+                return SweepPlan(self, self._hiddenModules)
+            except ValueError:
+                pass
+        return super(SwipingNetwork, self)._compilePlan()
+    
+    def reset(self):
+        if isinstance(self._plan, SweepPlan):
+            # the buffers of all the hidden modules are reset at once
+            Module.reset(self)
+            self._plan.reset()
+        else:
+            super(SwipingNetwork, self).reset()
+        
     def _iterateOverUnits(self):
         """ iterate over the coordinates defines by the ranges of self.dims. """
         return iterCombinations(self.dims)
@@ -1,11 +1,14 @@
 __author__ = 'Daan Wierstra and Tom Schaul'
 
-from scipy import dot, argmax
+from scipy import dot, argmax, newaxis
 from random import shuffle
 
 from trainer import Trainer
 from pybrain.utilities import fListToString 
 from pybrain.auxiliary import GradientDescent
+from pybrain.datasets.sequential import SequentialDataSet
+from pybrain.structure.networks.feedforward import FeedForwardNetwork
+from pybrain.structure.networks.recurrent import RecurrentNetwork
 
 
 class BackpropTrainer(Trainer):
@@ -15,7 +18,7 @@ class BackpropTrainer(Trainer):
         
     def __init__(self, module, dataset=None, learningrate=0.01, lrdecay=1.0,
                  momentum=0., verbose=False, batchlearning=False,
-                 weightdecay=0.):
+                 weightdecay=0., minibatchsize=None):
         """Create a BackpropTrainer to train the specified `module` on the 
         specified `dataset`.
         
@@ -30,12 +33,20 @@ class BackpropTrainer(Trainer):
         
         `weightdecay` corresponds to the weightdecay rate, where 0 is no weight
         decay at all.
+        
+        If `minibatchsize` is set and the module is not sequential, the samples
+        are not processed one by one: the gradient of contiguous chunks of 
+        that many samples is computed in a single vectorized pass, and the
+        parameters are updated once per chunk (unless `batchlearning` is set).
+        For a RecurrentNetwork on a SequentialDataSet, the chunks consist of 
+        that many sequences, which are backpropagated through time in parallel.
         """
         Trainer.__init__(self, module)
         self.setData(dataset)
         self.verbose = verbose
         self.batchlearning = batchlearning
         self.weightdecay = weightdecay
+        self.minibatchsize = minibatchsize
         self.epoch = 0
         self.totalepochs = 0
         # set up gradient descender
@@ -51,12 +62,26 @@ class BackpropTrainer(Trainer):
         self.module.resetDerivatives()
         errors = 0        
         ponderation = 0.
-        shuffledSequences = []
-        for seq in self.ds._provideSequences():
-            shuffledSequences.append(seq)
-        shuffle(shuffledSequences)
-        for seq in shuffledSequences:
-            e, p = self._calcDerivs(seq)
+        if self.minibatchsize and not self.module.sequential:
+            length = len(self.ds)
+            chunks = [(start, min(start + self.minibatchsize, length)) 
+                      for start in xrange(0, length, self.minibatchsize)]
+            calcDerivs = self._calcBatchDerivs
+        elif (self.minibatchsize and isinstance(self.module, RecurrentNetwork)
+              and isinstance(self.ds, SequentialDataSet)):
+            indices = range(self.ds.getNumSequences())
+            chunks = [indices[start:start + self.minibatchsize]
+                      for start in xrange(0, len(indices), self.minibatchsize)]
+            calcDerivs = self._calcSequenceBatchDerivs
+        else:
+            chunks = list(self.ds._provideSequences())
+            calcDerivs = self._calcDerivs
+            if self.module.sequential:
+                # Allocate the buffers for the longest sequence right away.
+                self.module.reserve(max(len(seq) for seq in chunks))
+        shuffle(chunks)
+        for chunk in chunks:
+            e, p = calcDerivs(chunk)
             errors += e
             ponderation += p
             if not self.batchlearning:
@@ -102,6 +127,45 @@ class BackpropTrainer(Trainer):
                 self.module.backActivate(outerr)
             
         return error, ponderation
+    
+    def _calcBatchDerivs(self, bounds):
+        """Calculate error function and backpropagate output errors of the 
+        samples between the given (start, stop) `bounds` in a single pass, 
+        to yield the gradient."""
+        start, stop = bounds
+        inpt = self.ds.data['input'][start:stop]
+        target = self.ds.data['target'][start:stop]
+        outerr = target - self.module.activateBatch(inpt)
+        if self.ds.hasField('importance'):
+            importance = self.ds.data['importance'][start:stop]
+            error = 0.5 * (importance * outerr ** 2).sum()
+            ponderation = importance.sum()
+            outerr *= importance
+        else:
+            error = 0.5 * (outerr ** 2).sum()
+            ponderation = float(outerr.size)
+        self.module.backActivateBatch(outerr)
+        return error, ponderation
+            
+    def _calcSequenceBatchDerivs(self, indices):
+        """Calculate error function and backpropagate output errors of the 
+        sequences with the given `indices` through time in a single pass, to 
+        yield the gradient."""
+        inpt, mask = self.ds.getSequenceBatch(indices, 'input')
+        target, _ = self.ds.getSequenceBatch(indices, 'target')
+        outerr = target - self.module.activateSequenceBatch(inpt)
+        if self.ds.hasField('importance'):
+            # The importance of the padding is zero already.
+            importance, _ = self.ds.getSequenceBatch(indices, 'importance')
+            error = 0.5 * (importance * outerr ** 2).sum()
+            ponderation = importance.sum()
+            outerr *= importance
+        else:
+            outerr *= mask[:, :, newaxis]
+            error = 0.5 * (outerr ** 2).sum()
+            ponderation = mask.sum() * outerr.shape[2]
+        self.module.backActivateSequenceBatch(outerr, mask)
+        return error, ponderation
             
     def _checkGradient(self, dataset=None, silent=False):
         """Numeric check of the computed gradient for debugging purposes."""
@@ -137,6 +201,19 @@ class BackpropTrainer(Trainer):
         if dataset == None:
             dataset = self.ds
         dataset.reset()
+        if isinstance(self.module, FeedForwardNetwork) and not verbose:
+            # The samples are independent, so the whole dataset can be pushed
+            # through the network by vectorized passes.
+            outerr = dataset.getField('target') - self.module.activateOnDataset(dataset)
+            if dataset.hasField('importance'):
+                importance = dataset.getField('importance')
+                ponderation = importance.sum()
+                error = 0.5 * (importance * outerr ** 2).sum()
+            else:
+                ponderation = outerr.size
+                error = 0.5 * (outerr ** 2).sum()
+            assert ponderation > 0
+            return error / ponderation
         if verbose:
             print '\nTesting on data:'
         errors = []
@@ -169,14 +246,18 @@ class BackpropTrainer(Trainer):
         if dataset == None:
             dataset = self.ds
         dataset.reset()
-        out = []
-        targ = []
-        for seq in dataset._provideSequences():
-            self.module.reset()
-            for input, target in seq:
-                res = self.module.activate(input)
-                out.append(argmax(res))
-                targ.append(argmax(target))
+        if isinstance(self.module, FeedForwardNetwork):
+            out = list(self.module.activateOnDataset(dataset).argmax(axis=1))
+            targ = list(dataset.getField('target').argmax(axis=1))
+        else:
+            out = []
+            targ = []
+            for seq in dataset._provideSequences():
+                self.module.reset()
+                for input, target in seq:
+                    res = self.module.activate(input)
+                    out.append(argmax(res))
+                    targ.append(argmax(target))
         if return_targets:
             return out, targ
         else:
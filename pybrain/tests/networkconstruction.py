@@ -0,0 +1,52 @@
+""" This script measures how long it takes to build the large swiping networks
+(which consist of thousands of modules and connections), and to do their
+first activation (which compiles the execution plan).
+
+Usage: python networkconstruction.py [repetitions]
+"""
+
+__author__ = 'agent, agent@local'
+
+import sys
+from time import time
+from scipy import ones
+
+from pybrain.structure import MDLSTMLayer
+from pybrain.structure.networks.custom.capturegame import CaptureGameNetwork
+from pybrain.structure.networks.multidimensional import MultiDimensionalRNN
+
+
+benchmarks = [
+    ('CaptureGameNetwork(9)', lambda: CaptureGameNetwork(size=9, hsize=3)),
+    ('CaptureGameNetwork(19)', lambda: CaptureGameNetwork(size=19, hsize=3)),
+    ('CaptureGameNetwork(19, MDLSTM)',
+     lambda: CaptureGameNetwork(size=19, hsize=2, componentclass=MDLSTMLayer)),
+    ('MultiDimensionalRNN((40, 40))', lambda: MultiDimensionalRNN((40, 40))),
+    ('MultiDimensionalRNN((12, 12, 12))', lambda: MultiDimensionalRNN((12, 12, 12))),
+    ]
+
+
+def timeConstruction(build, repetitions=1):
+    """ Return the network, and the best times for building it and for its
+    first activation. """
+    best = [None, None]
+    for _ in range(repetitions):
+        start = time()
+        net = build()
+        built = time()
+        net.activate(ones(net.indim))
+        done = time()
+        for i, t in enumerate([built - start, done - built]):
+            if best[i] is None or t < best[i]:
+                best[i] = t
+    return net, best[0], best[1]
+
+
+if __name__ == '__main__':
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    print '%-35s %8s %8s %8s %8s' % ('', 'modules', 'conns', 'build', 'activate')
+    for name, build in benchmarks:
+        net, tbuild, tactivate = timeConstruction(build, repetitions)
+        nconns = sum(len(conns) for conns in net.connections.values())
+        print '%-35s %8d %8d %7.2fs %7.2fs' % (name, len(net.modules), nconns,
+                                               tbuild, tactivate)
@@ -38,6 +38,24 @@ Now the same for RPROP
     epoch      3  total error      0.13036   avg weight       0.92604
     >>> abs(n.params[5:10] - array([ -0.19241111,  1.43404022,  0.23062397, -0.40105413,  0.62100109])).round(5)
     array([ 0.,  0.,  0.,  0.,  0.])
+    
+Minibatches on a feed-forward network yield the same gradient as processing 
+the samples one by one
+
+    >>> ds = SupervisedDataSet(2, 2)
+    >>> for _ in range(10):
+    ...     ds.addSample(random.randn(2), random.randn(2))
+    >>> n = buildNetwork(ds.indim, 4, ds.outdim)
+    >>> p = n.params.copy()
+    >>> t = BackpropTrainer(n, ds, batchlearning=True)
+    >>> e = t.train()
+    >>> single = n.params.copy()
+    >>> n.params[:] = p
+    >>> t = BackpropTrainer(n, ds, batchlearning=True, minibatchsize=3)
+    >>> abs(t.train() - e) < 1e-10
+    True
+    >>> abs(n.params - single).max() < 1e-10
+    True
 
 """
 
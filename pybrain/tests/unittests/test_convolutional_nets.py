@@ -7,6 +7,14 @@ Let's build a convolutional network designed for board games:
     >>> N = ConvolutionalBoardNetwork(4, 3, 5)
     >>> print N.paramdim
     97
+
+The parameters are laid out as they always were: the 5 weights combining the
+feature maps, the 2 padding values, and the weights of the 3 kernel rows:
+
+    >>> [(m.name, m.paramdim) for m in N._containerIterator()]
+    [('combine', 5), ('pad', 2), ('conv', 90)]
+    >>> (N.params[:5] == N['combine'].params).all(), (N.params[5:7] == N['pad'].params).all()
+    (True, True)
     
 This is what a typical input would look like (on a 4x4 board)
 
@@ -20,7 +28,7 @@ We let the network process the input:
 
     >>> res = N.activate(ravel(array(input)))
     >>> res = res.reshape(4,4)
-    >>> inp =  N['pad'].inputbuffer[0].reshape(6,6,2)[:,:,0]
+    >>> inp =  N['pad'].outputbuffer[0].reshape(6,6,2)[:,:,0]
 
 The input of the first features (e.g. white stone presence) is in the middle, like we set it: 
 
@@ -0,0 +1,93 @@
+"""
+
+Memory mapped datasets keep their fields in .npy files in a directory:
+
+    >>> import os
+    >>> from scipy import random
+    >>> from pybrain.datasets import MemoryMappedSupervisedDataSet
+    >>> random.seed(42)
+    >>> directory = tempfile.mkdtemp()
+    >>> ds = MemoryMappedSupervisedDataSet(directory, 3, 2)
+    >>> for _ in range(10):
+    ...     ds.addSample(random.randn(3), random.randn(2))
+    >>> len(ds)
+    10
+    >>> sorted(f for f in os.listdir(directory))
+    ['input.npy', 'target.npy']
+
+Batches are views on the files:
+
+    >>> batches = list(ds.batches('input', 4))
+    >>> [len(b) for b in batches]
+    [4, 4, 2]
+    >>> batches[0].base is not None
+    True
+    >>> bool((batches[1] == ds['input'][4:8]).all())
+    True
+    >>> batches = list(ds.randomBatches('input', 4))
+    >>> sorted(len(b) for b in batches)
+    [2, 4, 4]
+
+They can be used for training and validation like any other dataset:
+
+    >>> from pybrain.tools.shortcuts import buildNetwork
+    >>> from pybrain.tools.validation import ModuleValidator
+    >>> from pybrain.supervised import BackpropTrainer
+    >>> n = buildNetwork(3, 4, 2)
+    >>> t = BackpropTrainer(n, ds, minibatchsize=4)
+    >>> 0 < float(t.train()) < 10
+    True
+    >>> 0 < float(ModuleValidator.MSE(n, ds)) < 10
+    True
+    >>> 0 < float(t.testOnData(ds)) < 10
+    True
+
+After flushing, the dataset can be opened again without loading the data:
+
+    >>> ds.flush()
+    >>> ds2 = MemoryMappedSupervisedDataSet.loadFromDirectory(directory)
+    >>> len(ds2), ds2.indim, ds2.outdim
+    (10, 3, 2)
+    >>> bool((ds2['target'] == ds['target']).all())
+    True
+    >>> ds2.addSample([1, 2, 3], [4, 5])
+    >>> list(ds2['input'][-1])
+    [1.0, 2.0, 3.0]
+
+Pickles only refer to the directory:
+
+    >>> import pickle
+    >>> ds3 = pickle.loads(pickle.dumps(ds2))
+    >>> len(ds3)
+    11
+    >>> ds3.directory == directory
+    True
+
+Copies get files of their own, so the dataset can also be split, e.g. for
+training until convergence on a validation set:
+
+    >>> ds4 = ds3.copy()
+    >>> ds4.directory != directory, len(ds4)
+    (True, 11)
+    >>> ds4.addSample([0, 0, 0], [0, 0])
+    >>> len(ds4), len(MemoryMappedSupervisedDataSet.loadFromDirectory(directory))
+    (12, 11)
+    >>> t = BackpropTrainer(n, ds3)
+    >>> trainErrors, validationErrors = t.trainUntilConvergence(maxEpochs=3)
+    >>> len(trainErrors), len(validationErrors)
+    (5, 5)
+
+    >>> shutil.rmtree(directory)
+
+"""
+
+__author__ = 'agent, agent@local'
+
+import shutil
+import tempfile
+
+from pybrain.tests import runModuleTestSuite
+
+
+if __name__ == "__main__":
+    runModuleTestSuite(__import__('__main__'))
@@ -0,0 +1,135 @@
+"""
+
+    >>> from scipy import random
+    >>> from pybrain.tools.shortcuts import buildNetwork
+    >>> from test_recurrent_network import buildRecurrentNetwork
+    >>> from test_nested_network import buildNestedNetwork
+    >>> from test_shared_connections import buildSharedCrossedNetwork
+    >>> from test_sliced_connections import buildSlicedNetwork
+    >>> random.seed(42)
+
+Test a number of network architectures, and compare if the NumPy fast networks
+produce the same outputs, input errors and derivatives as the Python
+implementation.
+
+Simple net
+    >>> testEquivalence(buildNetwork(2, 2))
+    True
+
+A lot of layers
+    >>> net = buildNetwork(2, 3, 4, 3, 2, 3, 4, 3, 2)
+    >>> testEquivalence(net)
+    True
+
+Nonstandard components; the connections of the bias are stacked into a single
+weight matrix
+    >>> from pybrain.structure import TanhLayer, SoftmaxLayer
+    >>> net = buildNetwork(2, 3, 2, bias=True, outclass=TanhLayer)
+    >>> testEquivalence(net)
+    True
+    >>> net = buildNetwork(2, 3, 2, bias=True, outclass=SoftmaxLayer)
+    >>> testEquivalence(net)
+    True
+
+Shared connections
+    >>> net = buildSharedCrossedNetwork()
+    >>> testEquivalence(net)
+    True
+
+Sliced connections
+    >>> net = buildSlicedNetwork()
+    >>> testEquivalence(net)
+    True
+
+Nested networks
+    >>> net = buildNestedNetwork()
+    >>> testEquivalence(net)
+    Network cannot be converted.
+
+Recurrent networks
+    >>> net = buildRecurrentNetwork()
+    >>> net.params[:] = [1, 1, 0.5]
+    >>> testEquivalence(net)
+    True
+    >>> net = buildNetwork(2, 3, 2, bias=True, recurrent=True)
+    >>> h = net['hidden0']
+    >>> net.addRecurrentConnection(FullConnection(h, h))
+    >>> net.addRecurrentConnection(FullConnection(net['out'], h))
+    >>> net.sortModules()
+    >>> testEquivalence(net)
+    True
+
+The parameters are shared with the original network:
+
+    >>> net = buildNetwork(2, 3, 1)
+    >>> fnet = net.convertToFastNetwork()
+    >>> fnet.params is net.params
+    True
+    >>> net._setParameters(net.params * 0)
+    >>> fnet.activate([1, 2])
+    array([ 0.])
+
+Feed-forward fast networks process batches as well:
+
+    >>> net = buildNetwork(3, 4, 2, bias=True)
+    >>> fnet = net.convertToFastNetwork()
+    >>> inputs = random.randn(5, 3)
+    >>> outerrs = random.randn(5, 2)
+    >>> net.resetDerivatives()
+    >>> out = net.activateBatch(inputs)
+    >>> inerr = net.backActivateBatch(outerrs)
+    >>> derivs = net.derivs.copy()
+    >>> net.resetDerivatives()
+    >>> epsilonCheck(abs(fnet.activateBatch(inputs) - out).max())
+    True
+    >>> epsilonCheck(abs(fnet.backActivateBatch(outerrs) - inerr).max())
+    True
+    >>> epsilonCheck(abs(net.derivs - derivs).max())
+    True
+
+"""
+
+__author__ = 'agent, agent@local'
+
+
+from scipy import array
+
+from pybrain.structure import FullConnection
+from pybrain.tests.helpers import buildAppropriateDataset, epsilonCheck
+from pybrain.tests import runModuleTestSuite
+
+
+def runNetwork(net, ds):
+    """Run the network forward and backward on the dataset and return the
+    outputs, input errors and derivatives."""
+    net.resetDerivatives()
+    outs, inerrs = [], []
+    if net.sequential:
+        for seq in ds:
+            seq = list(seq)
+            net.reset()
+            for inpt, _ in seq:
+                outs.append(net.activate(inpt))
+            for _, target in reversed(seq):
+                inerrs.append(net.backActivate(target))
+    else:
+        for inpt, target in ds:
+            outs.append(net.activate(inpt))
+            inerrs.append(net.backActivate(target))
+    return array(outs), array(inerrs), net.derivs.copy()
+
+
+def testEquivalence(net):
+    fnet = net.convertToFastNetwork()
+    if fnet == None:
+        return None
+    ds = buildAppropriateDataset(net)
+    # Both networks write their derivatives into the same array.
+    for res, fres in zip(runNetwork(net, ds), runNetwork(fnet, ds)):
+        if not epsilonCheck(abs(res - fres).max()):
+            return res, fres
+    return True
+
+
+if __name__ == "__main__":
+    runModuleTestSuite(__import__('__main__'))
@@ -0,0 +1,89 @@
+"""
+
+Activate a feed-forward network on a whole batch of samples at once and check
+that the result is the same as activating it sample by sample.
+
+    >>> from scipy import random
+    >>> from pybrain.structure import SoftmaxLayer
+    >>> from pybrain.tools.shortcuts import buildNetwork
+    >>> random.seed(42)
+    >>> n = buildNetwork(3, 5, 2, outclass=SoftmaxLayer)
+    >>> inputs = random.randn(7, 3)
+    >>> outerrs = random.randn(7, 2)
+
+The per-sample passes, accumulating the derivatives over all samples:
+
+    >>> n.resetDerivatives()
+    >>> outs = [n.activate(x) for x in inputs]
+    >>> n.resetDerivatives()
+    >>> inerrs = []
+    >>> for x, e in zip(inputs, outerrs):
+    ...     tmp = n.activate(x)
+    ...     inerrs.append(n.backActivate(e))
+    >>> derivs = n.derivs.copy()
+
+The batch passes:
+
+    >>> n.resetDerivatives()
+    >>> batchouts = n.activateBatch(inputs)
+    >>> batchouts.shape
+    (7, 2)
+    >>> batchinerrs = n.backActivateBatch(outerrs)
+    >>> batchinerrs.shape
+    (7, 3)
+    >>> epsilonCheck(abs(batchouts - outs).max())
+    True
+    >>> epsilonCheck(abs(batchinerrs - inerrs).max())
+    True
+    >>> epsilonCheck(abs(n.derivs - derivs).max())
+    True
+
+Single activations still work after a batch has been processed:
+
+    >>> epsilonCheck(abs(n.activate(inputs[3]) - outs[3]).max())
+    True
+
+Nested networks, which fall back to per-sample processing inside of
+modules without a vectorized implementation:
+
+    >>> n = buildNestedNetwork()
+    >>> inputs = random.randn(4, 1)
+    >>> outs = [n.activate(x) for x in inputs]
+    >>> epsilonCheck(abs(n.activateBatch(inputs) - outs).max())
+    True
+
+Whole datasets are evaluated in chunks of samples; the result is the same as
+evaluating them sample by sample:
+
+    >>> from pybrain.datasets import SupervisedDataSet
+    >>> from pybrain.supervised import BackpropTrainer
+    >>> n = buildNetwork(3, 5, 2)
+    >>> ds = SupervisedDataSet(3, 2)
+    >>> for _ in range(10):
+    ...     ds.addSample(random.randn(3), random.randn(2))
+    >>> outs = [n.activate(x) for x, _ in ds]
+    >>> epsilonCheck(abs(n.activateOnDataset(ds, batchsize=4) - outs).max())
+    True
+
+Afterwards, the network works on its former buffers again, with the same
+execution plan:
+
+    >>> plan = n._executionPlan()
+    >>> n.inputbuffer.shape, n.activateOnDataset(ds).shape
+    ((1, 3), (10, 2))
+    >>> n.inputbuffer.shape, n._executionPlan() is plan
+    ((1, 3), True)
+    >>> t = BackpropTrainer(n, ds)
+    >>> epsilonCheck(t.testOnData() - ds.evaluateModuleMSE(n))
+    True
+
+"""
+
+__author__ = 'agent, agent@local'
+
+from pybrain.tests import runModuleTestSuite, epsilonCheck
+from test_nested_network import buildNestedNetwork
+
+
+if __name__ == "__main__":
+    runModuleTestSuite(__import__('__main__'))
@@ -0,0 +1,96 @@
+"""
+
+The copies of a network share its structure, and only hold their own
+parameters until they are used:
+
+    >>> from scipy import random
+    >>> from pybrain import LSTMLayer, FeedForwardNetwork
+    >>> from pybrain.tools.shortcuts import buildNetwork
+    >>> random.seed(6)
+    >>> n = buildNetwork(3, 4, 2, hiddenclass=LSTMLayer, recurrent=True)
+    >>> c = n.copy()
+    >>> c.mutate()
+    >>> d = c.copy()
+    >>> 'modules' in c.__dict__, d._frozen is c._frozen is n._frozen
+    (False, True)
+    >>> type(c) is n.__class__, c.paramdim == n.paramdim
+    (True, True)
+    >>> (c.params == n.params).all(), (d.params == c.params).all()
+    (False, True)
+
+Once used, a copy has a structure of its own, which works on its parameters:
+
+    >>> xs = random.randn(5, n.indim)
+    >>> (outputs(d, xs) == outputs(c, xs)).all()
+    True
+    >>> 'modules' in c.__dict__, c['hidden0'] is n['hidden0']
+    (True, False)
+    >>> c.params[:] = n.params
+    >>> (outputs(c, xs) == outputs(n, xs)).all()
+    True
+
+Copies are independent of each other, so they can be evaluated in parallel:
+
+    >>> from threading import Thread
+    >>> copies = [n.copy() for _ in range(4)]
+    >>> for x in copies:
+    ...     x.randomize()
+    >>> expected = [outputs(x.copy(), xs) for x in copies]
+    >>> results = {}
+    >>> threads = [Thread(target=evaluate, args=(x, xs, results)) for x in copies]
+    >>> for t in threads:
+    ...     t.start()
+    >>> for t in threads:
+    ...     t.join()
+    >>> [(results[x] == e).all() for x, e in zip(copies, expected)]
+    [True, True, True, True]
+
+Unused copies can be pickled like any network:
+
+    >>> import cPickle
+    >>> e = cPickle.loads(cPickle.dumps(n.copy()))
+    >>> e.__class__.__name__, (outputs(e, xs) == outputs(n, xs)).all()
+    ('RecurrentNetwork', True)
+
+Changes to the structure show in the copies made afterwards:
+
+    >>> from pybrain import LinearLayer, FullConnection
+    >>> n = FeedForwardNetwork()
+    >>> n.addInputModule(LinearLayer(2, name='in'))
+    >>> n.addOutputModule(LinearLayer(1, name='out'))
+    >>> n.addConnection(FullConnection(n['in'], n['out']))
+    >>> n.sortModules()
+    >>> n.copy().paramdim
+    2
+    >>> n.addModule(LinearLayer(3, name='h'))
+    >>> n.addConnection(FullConnection(n['in'], n['h']))
+    >>> n.copy()['h'].name
+    'h'
+    >>> n.addConnection(FullConnection(n['h'], n['out']))
+    >>> n.sortModules()
+    >>> n.copy().paramdim
+    11
+    >>> n.setDtype('float32')
+    >>> n.copy().activate([1, 2]).dtype
+    dtype('float32')
+
+"""
+
+__author__ = 'agent, agent@local'
+
+from scipy import array
+
+from pybrain.tests import runModuleTestSuite
+
+
+def outputs(net, xs):
+    net.reset()
+    return array([net.activate(x) for x in xs])
+
+
+def evaluate(net, xs, results):
+    results[net] = outputs(net, xs)
+
+
+if __name__ == "__main__":
+    runModuleTestSuite(__import__('__main__'))
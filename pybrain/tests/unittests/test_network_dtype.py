@@ -0,0 +1,77 @@
+"""
+
+Networks can use another floating point type than float64 for their
+parameters, derivatives and buffers:
+
+    >>> from scipy import random
+    >>> from pybrain.tools.shortcuts import buildNetwork
+    >>> random.seed(42)
+    >>> n = buildNetwork(3, 4, 2, dtype='float32')
+    >>> n.params.dtype, n.derivs.dtype
+    (dtype('float32'), dtype('float32'))
+    >>> set(m.outputbuffer.dtype.name for m in n.modules)
+    set(['float32'])
+
+The modules and connections work on slices of the network's arrays:
+
+    >>> set(c.params.dtype.name for c in n.connections[n['in']])
+    set(['float32'])
+    >>> n.activateBatch(random.randn(5, 3)).dtype
+    dtype('float32')
+
+The results are the same as in double precision, up to the precision of
+float32:
+
+    >>> m = n.copy()
+    >>> m.setDtype('float64')
+    >>> m.params.dtype
+    dtype('float64')
+    >>> x = random.randn(3)
+    >>> out = n.activate(x)
+    >>> out.dtype
+    dtype('float32')
+    >>> abs(out - m.activate(x)).max() < 1e-5
+    True
+
+Datasets can store their samples in float32 as well, while the sequence
+indices stay exact:
+
+    >>> from pybrain.datasets import SequentialDataSet
+    >>> from pybrain.supervised import BackpropTrainer
+    >>> ds = SequentialDataSet(3, 2)
+    >>> ds.setDtype('float32')
+    >>> for _ in range(10):
+    ...     ds.addSample(random.randn(3), random.randn(2))
+    >>> ds['input'].dtype, ds['target'].dtype, ds['sequence_index'].dtype
+    (dtype('float32'), dtype('float32'), dtype('float64'))
+
+Copies and pickles keep the type, also for fields added later:
+
+    >>> import cPickle
+    >>> for d in [ds.copy(), cPickle.loads(cPickle.dumps(ds))]:
+    ...     d.addField('extra', 1)
+    ...     print d.dtype, d['input'].dtype, d['extra'].dtype
+    float32 float32 float32
+    float32 float32 float32
+
+Training keeps the type of the parameters:
+
+    >>> from pybrain.datasets import SupervisedDataSet
+    >>> ds = SupervisedDataSet(3, 2)
+    >>> ds.setDtype('float32')
+    >>> for _ in range(10):
+    ...     ds.addSample(random.randn(3), random.randn(2))
+    >>> t = BackpropTrainer(n, ds, minibatchsize=5, momentum=0.9)
+    >>> error = t.train()
+    >>> n.params.dtype, t.descent.momentumvector.dtype
+    (dtype('float32'), dtype('float32'))
+
+"""
+
+__author__ = 'agent, agent@local'
+
+from pybrain.tests import runModuleTestSuite
+
+
+if __name__ == "__main__":
+    runModuleTestSuite(__import__('__main__'))
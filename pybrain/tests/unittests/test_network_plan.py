@@ -0,0 +1,53 @@
+"""
+
+Networks execute a compiled plan of their modules and connections. The plan
+refers to the buffers and parameters of the network, so it has to stay
+consistent when those are reallocated.
+
+    >>> from scipy import random
+    >>> from pybrain.tools.shortcuts import buildNetwork
+    >>> random.seed(42)
+    >>> n = buildNetwork(2, 3, 1, recurrent=True)
+    >>> inputs = random.randn(5, 2)
+    >>> outs = [n.activate(x) for x in inputs]
+
+Growing the buffers past their initial length recompiles the plan:
+
+    >>> len(n.outputbuffer) >= 5
+    True
+
+Copies get a plan of their own and do not write into the original:
+
+    >>> c = n.copy()
+    >>> c.params[:] = 0
+    >>> c.reset()
+    >>> c.activate(inputs[0])
+    array([ 0.])
+    >>> n.reset()
+    >>> epsilonCheck(abs(n.activate(inputs[0]) - outs[0]).max())
+    True
+
+So do pickled networks:
+
+    >>> import pickle
+    >>> p = pickle.loads(pickle.dumps(n))
+    >>> p.reset()
+    >>> epsilonCheck(abs(p.activate(inputs[0]) - outs[0]).max())
+    True
+
+Setting a new parameter array is picked up by the plan as well:
+
+    >>> n._setParameters(n.params * 0)
+    >>> n.reset()
+    >>> n.activate(inputs[0])
+    array([ 0.])
+
+"""
+
+__author__ = 'agent, agent@local'
+
+from pybrain.tests import runModuleTestSuite, epsilonCheck
+
+
+if __name__ == "__main__":
+    runModuleTestSuite(__import__('__main__'))
@@ -46,6 +46,47 @@ Is it the same ordering than our reference?
     >>> print ord3
     [<LinearLayer 'l0'>, <LinearLayer 'l2'>, <LinearLayer 'l3'>, <LinearLayer 'l5'>, <LinearLayer 'l6'>, <LinearLayer 'l7'>, <LinearLayer 'l8'>, <LinearLayer 'l9'>, <LinearLayer 'l1'>, <LinearLayer 'l4'>]
     
+Sorting also gathers the parameters of all connections in a single array, 
+keeping their values, which the connections then share:
+
+    >>> before = [c.params.copy() for c in conns]
+    >>> n.sortModules()
+    >>> n.paramdim == len(conns)
+    True
+    >>> all((c.params == b).all() for c, b in zip(conns, before))
+    True
+    >>> n.params[:] = 0
+    >>> all((c.params == 0).all() for c in conns)
+    True
+
+Sorting draws as many random numbers as there are parameters, like earlier
+versions did when initializing the array, so seeded runs keep their results:
+
+    >>> from scipy import random
+    >>> mods = buildSomeModules(10)
+    >>> n = Network()
+    >>> for m in mods:
+    ...    n.addModule(m)
+    ...
+    >>> for c in buildSomeConnections(mods):
+    ...    n.addConnection(c)
+    ...
+    >>> random.seed(0)
+    >>> n.sortModules()
+    >>> after = random.randn()
+    >>> random.seed(0)
+    >>> _ = random.randn(n.paramdim)
+    >>> after == random.randn()
+    True
+
+Modules are found by their name, even if that changed after they were added:
+
+    >>> n['l3']
+    <LinearLayer 'l3'>
+    >>> n['l3'].name = 'renamed'
+    >>> n['renamed'], n['l3']
+    (<LinearLayer 'renamed'>, None)
+    
 """
 
 __author__ = 'Tom Schaul, tom@idsia.ch'
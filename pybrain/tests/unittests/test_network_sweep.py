@@ -0,0 +1,90 @@
+"""
+
+Swiping networks process their hidden modules wavefront by wavefront, with the
+same results as when processing them one by one:
+
+    >>> from scipy import random
+    >>> from pybrain import MDLSTMLayer
+    >>> from pybrain.structure.networks.multidimensional import MultiDimensionalRNN, MultiDimensionalLSTM
+    >>> from pybrain.structure.networks.custom.capturegame import CaptureGameNetwork
+    >>> from pybrain.structure.networks.sweep import SweepPlan
+    >>> random.seed(4)
+
+    >>> for net in [MultiDimensionalRNN((4, 5)), MultiDimensionalRNN((3, 3, 4)),
+    ...             MultiDimensionalLSTM((4, 3)), CaptureGameNetwork(size=4),
+    ...             CaptureGameNetwork(size=4, hsize=2, componentclass=MDLSTMLayer)]:
+    ...     print passes(net, False) == passes(net, True), isinstance(net._plan, SweepPlan)
+    True True
+    True True
+    True True
+    True True
+    True True
+
+A 4x5 grid has 8 wavefronts, with up to 4 modules per swipe direction:
+
+    >>> net = MultiDimensionalRNN((4, 5))
+    >>> [stop - start for start, stop in net._executionPlan().levels]
+    [4, 8, 12, 16, 16, 12, 8, 4]
+
+The hidden modules see their values as usual:
+
+    >>> out = net.activate(random.randn(net.indim))
+    >>> m = net['hidden(2, 3, 1)']
+    >>> (m.outputbuffer == net._plan.buffers['outputbuffer'][:, net._plan.row[m]]).all()
+    True
+    >>> (m.outputbuffer[0] == 0).all()
+    False
+
+    >>> from pybrain.tests import gradientCheck
+    >>> gradientCheck(MultiDimensionalLSTM((3, 3)))
+    Perfect gradient
+    True
+
+Batches of samples are processed module by module, with all samples at once,
+also for multi-dimensional LSTM cells:
+
+    >>> from scipy import array
+    >>> net = MultiDimensionalLSTM((3, 3))
+    >>> xs, errs = random.randn(4, net.indim), random.randn(4, net.outdim)
+    >>> net.resetDerivatives()
+    >>> out = net.activateBatch(xs)
+    >>> inerrs = net.backActivateBatch(errs)
+    >>> derivs = net.derivs.copy()
+    >>> net.resetDerivatives()
+    >>> single = []
+    >>> for x, err in zip(xs, errs):
+    ...     _ = net.activate(x)
+    ...     single.append(net.backActivate(err))
+    >>> abs(inerrs - array(single)).max() < 1e-12, abs(derivs - net.derivs).max() < 1e-12
+    (True, True)
+
+Hidden modules with parameters of their own cannot be swept, those networks
+are processed module by module:
+
+    >>> net = CaptureGameNetwork(size=3, hsize=2, componentclass=MDLSTMLayer, peepholes=True)
+    >>> isinstance(net._executionPlan(), SweepPlan)
+    False
+
+"""
+
+__author__ = 'agent, agent@local'
+
+from scipy import random
+
+from pybrain.tests import runModuleTestSuite
+
+
+def passes(net, sweep):
+    """ The outputs, input errors and derivatives of a forward and a backward
+    pass (rounded), with or without sweeping. """
+    net.sweep = sweep
+    net._plan = None
+    random.seed(0)
+    out = net.activate(random.randn(net.indim))
+    net.resetDerivatives()
+    inerr = net.backActivate(random.randn(net.outdim))
+    return [list(a.round(10)) for a in (out, inerr, net.derivs)]
+
+
+if __name__ == "__main__":
+    runModuleTestSuite(__import__('__main__'))
@@ -0,0 +1,45 @@
+"""
+
+CMA-ES can update its eigendecomposition lazily, which is much cheaper in
+high dimensions and still converges:
+
+    >>> from scipy import random
+    >>> from pybrain.optimization import CMAES, SeparableCMAES
+    >>> from pybrain.rl.environments.functions import SphereFunction, ElliFunction
+    >>> random.seed(42)
+    >>> l = CMAES(SphereFunction(10), random.randn(10), eigenGap=1.)
+    >>> _, fitness = l.learn()
+    >>> fitness < 1e-9
+    True
+
+Between the updates, B and D are left as they are:
+
+    >>> l = CMAES(SphereFunction(10), random.randn(10), eigenGap=1., maxLearningSteps=1)
+    >>> B = l.B
+    >>> _ = l.learn()
+    >>> l.B is B
+    True
+
+The separable variant only adapts the diagonal of the covariance matrix, so
+its cost is linear in the number of parameters:
+
+    >>> l = SeparableCMAES(ElliFunction(10), random.randn(10))
+    >>> _, fitness = l.learn()
+    >>> fitness < 1e-9
+    True
+    >>> l.C.shape, l.D.shape
+    ((10,), (10,))
+    >>> l = SeparableCMAES(SphereFunction(1000), random.randn(1000), maxLearningSteps=2)
+    >>> _ = l.learn()
+    >>> l.numEvaluations
+    72
+
+"""
+
+__author__ = 'agent, agent@local'
+
+from pybrain.tests import runModuleTestSuite
+
+
+if __name__ == '__main__':
+    runModuleTestSuite(__import__('__main__'))
@@ -0,0 +1,112 @@
+"""
+
+Coevolution can play the relative evaluations of a tournament in parallel, by
+any executor with a map method. The bookkeeping is done in order, so the
+results are the same as with serial evaluation:
+
+    >>> from multiprocessing.pool import ThreadPool
+    >>> from pybrain.optimization.populationbased.coevolution import Coevolution, CompetitiveCoevolution
+
+    >>> pool = ThreadPool(3)
+    >>> for algo in (Coevolution, CompetitiveCoevolution):
+    ...     serial = evaluate(makeCoevolution(algo, tournamentSize=3))
+    ...     parallel = evaluate(makeCoevolution(algo, tournamentSize=3, executor=pool))
+    ...     print algo.__name__, serial == parallel
+    Coevolution True
+    CompetitiveCoevolution True
+
+Every job is played with its own seed, without touching the random generators
+that other threads use, so even a stochastic relative evaluator gives the same
+results with threads as one at a time, over several generations:
+
+    >>> for algo in (Coevolution, CompetitiveCoevolution):
+    ...     serial = learn(makeCoevolution(algo, relEvaluator=noisySums, maxGenerations=3,
+    ...                                    executor=SerialExecutor()))
+    ...     parallel = learn(makeCoevolution(algo, relEvaluator=noisySums, maxGenerations=3, executor=pool))
+    ...     print algo.__name__, serial == parallel
+    Coevolution True
+    CompetitiveCoevolution True
+
+With a deterministic relative evaluator, the results between players whose
+parameters did not change since the last generation can be reused. With
+elitism, the selected players stay in the population, so fewer evaluations
+are needed for the same generations, with the same outcome:
+
+    >>> plain = makeCoevolution(Coevolution, elitism=True, maxGenerations=5)
+    >>> best = plain.learn()
+    >>> memo = makeCoevolution(Coevolution, elitism=True, maxGenerations=5, memoizeResults=True)
+    >>> (memo.learn().params == best.params).all()
+    True
+    >>> plain.hallOfFitnesses == memo.hallOfFitnesses
+    True
+    >>> memo.steps < plain.steps
+    True
+
+The reused results are recorded like the others:
+
+    >>> sorted(map(str, memo.allResults.values())) == sorted(map(str, plain.allResults.values()))
+    True
+
+And they are reused in parallel as well:
+
+    >>> parallel = makeCoevolution(Coevolution, elitism=True, maxGenerations=5,
+    ...                            memoizeResults=True, executor=pool)
+    >>> _ = parallel.learn()
+    >>> pool.terminate()
+    >>> parallel.steps < plain.steps
+    True
+
+"""
+
+__author__ = 'agent, agent@local'
+
+import random
+
+from scipy import random as sprandom, sign
+
+from pybrain.structure.parametercontainer import ParameterContainer
+from pybrain.tests import runModuleTestSuite
+
+
+def compareSums(p1, p2):
+    """ An anti-symmetric, deterministic relative evaluator. """
+    return float(sign(p1.params.sum() - p2.params.sum()))
+
+
+def noisySums(p1, p2):
+    """ A stochastic relative evaluator. """
+    return float(sign(p1.params.sum() - p2.params.sum() + sprandom.randn()))
+
+
+def makeCoevolution(algo, relEvaluator=compareSums, **kwargs):
+    random.seed(1)
+    sprandom.seed(1)
+    seeds = [ParameterContainer(3)]
+    for s in seeds:
+        s.randomize()
+    return algo(relEvaluator, seeds, populationSize=6, **kwargs)
+
+
+def evaluate(x):
+    """ The fitnesses of the first population, and the results between its
+    players (by their index, since they are different objects in every run). """
+    fitnesses = x._evaluatePopulation()
+    pops = [x.pop, getattr(x, 'parasitePop', [])]
+    players = dict((p, (i, j)) for i, pop in enumerate(pops) for j, p in enumerate(pop))
+    results = sorted((players[p], players[opp], r) for (p, opp), r in x.allResults.items())
+    return fitnesses, results, x.steps
+
+
+class SerialExecutor(object):
+    """ Plays the jobs one at a time, in the calling thread. """
+    map = staticmethod(map)
+
+
+def learn(x):
+    """ The parameters of the best player, and the fitnesses of all generations. """
+    best = x.learn()
+    return list(best.params), x.hallOfFitnesses, x.steps
+
+
+if __name__ == "__main__":
+    runModuleTestSuite(__import__('__main__'))
@@ -0,0 +1,68 @@
+"""
+
+Population-based optimizers can evaluate the candidates of a batch in
+parallel, by any executor with a map method. The results are the same as
+with serial evaluation:
+
+    >>> from multiprocessing import Pool
+    >>> from multiprocessing.pool import ThreadPool
+    >>> from pybrain.optimization import CMAES, GA, ES
+    >>> from pybrain.rl.environments.functions.unimodal import SphereFunction
+
+    >>> serial = runOptimizer(CMAES, SphereFunction(3))
+    >>> pool = Pool(2)
+    >>> parallel = runOptimizer(CMAES, SphereFunction(3), executor=pool)
+    >>> pool.terminate()
+    >>> serial == parallel
+    True
+    >>> serial[0]
+    35
+
+The direction of the search is flipped by the optimizer when needed, and
+wrapped parameters are handled as well:
+
+    >>> from pybrain.structure.parametercontainer import ParameterContainer
+    >>> pool = ThreadPool(3)
+    >>> for algo in (GA, ES):
+    ...     serial = runOptimizer(algo, SphereFunction(3))
+    ...     parallel = runOptimizer(algo, SphereFunction(3), executor=pool)
+    ...     print algo.__name__, serial == parallel
+    GA True
+    ES True
+    >>> pc = ParameterContainer(3)
+    >>> serial = runOptimizer(CMAES, paramsSum, initEvaluable=pc)
+    >>> parallel = runOptimizer(CMAES, paramsSum, initEvaluable=pc, executor=pool)
+    >>> pool.terminate()
+    >>> serial == parallel
+    True
+
+"""
+
+__author__ = 'agent, agent@local'
+
+import random
+
+import scipy
+
+from pybrain.tests import runModuleTestSuite
+
+
+def paramsSum(pc):
+    return sum(pc.params)
+
+
+def runOptimizer(algo, evaluator, initEvaluable=None, **kwargs):
+    """Run a few steps of the optimizer with a fixed seed and return the number
+    of evaluations, the best fitness and all fitnesses."""
+    random.seed(42)
+    scipy.random.seed(42)
+    if initEvaluable is None:
+        initEvaluable = scipy.random.randn(3)
+    l = algo(evaluator, initEvaluable, maxLearningSteps=4,
+             storeAllEvaluations=True, **kwargs)
+    _, fitness = l.learn()
+    return l.numEvaluations, fitness, list(l._allEvaluations)
+
+
+if __name__ == '__main__':
+    runModuleTestSuite(__import__('__main__'))
@@ -0,0 +1,78 @@
+"""
+
+Separable and exponential NES find the optimum of simple functions:
+
+    >>> from scipy import random
+    >>> from pybrain.optimization import SNES, XNES
+    >>> from pybrain.rl.environments.functions import SphereFunction, RosenbrockFunction
+    >>> random.seed(42)
+    >>> for algo, f in [(SNES, SphereFunction(5)), (XNES, RosenbrockFunction(5))]:
+    ...     l = algo(f, random.randn(5), minimize=True, desiredEvaluation=1e-10, 
+    ...              maxEvaluations=20000)
+    ...     _, fitness = l.learn()
+    ...     print algo.__name__, fitness < 1e-10
+    SNES True
+    XNES True
+
+Importance mixing reuses samples of the previous batch, which saves
+evaluations:
+
+    >>> l = SNES(SphereFunction(5), random.randn(5), minimize=True, maxLearningSteps=50)
+    >>> _ = l.learn()
+    >>> l2 = SNES(SphereFunction(5), random.randn(5), minimize=True, maxLearningSteps=50,
+    ...           importanceMixing=True)
+    >>> _ = l2.learn()
+    >>> l.numEvaluations > 1.5 * l2.numEvaluations
+    True
+    >>> len(l2._samples) == l2.batchSize
+    True
+
+Some samples are always fresh, even if the distribution does not change:
+
+    >>> l3 = SNES(SphereFunction(5), random.randn(5), minimize=True, importanceMixing=True,
+    ...           centerLearningRate=0., covLearningRate=0.)
+    >>> counts = []
+    >>> for _ in range(20):
+    ...     before = l3.numEvaluations
+    ...     _ = l3.learn(1)
+    ...     counts.append(l3.numEvaluations - before)
+    >>> min(counts) > 0
+    True
+
+XNES keeps the standard normal draws of its samples and the log-determinant of
+its covariance factor up to date, instead of solving for them:
+
+    >>> from numpy.linalg import slogdet, solve
+    >>> l = XNES(RosenbrockFunction(4), random.randn(4), minimize=True, maxLearningSteps=20,
+    ...          importanceMixing=True)
+    >>> _ = l.learn()
+    >>> abs(slogdet(l.A)[1] - l._logDet()) < 1e-10
+    True
+    >>> z = solve(l.A, (l._samples - l.center).T).T
+    >>> abs(l._toCurrent(l._standardized) - z).max() < 1e-10
+    True
+
+SNES only keeps vectors, so it handles many parameters:
+
+    >>> l = SNES(SphereFunction(10000), random.randn(10000), maxLearningSteps=2)
+    >>> _ = l.learn()
+    >>> l.sigma.shape
+    (10000,)
+
+The utilities are the logarithmic ones of CMA-ES:
+
+    >>> from pybrain.tools.rankingfunctions import HansenRanking
+    >>> HansenRanking()(array([3., 1., 4., 2.])).round(3)
+    array([ 0.405,  0.   ,  1.099,  0.   ])
+
+"""
+
+__author__ = 'agent, agent@local'
+
+from scipy import array
+
+from pybrain.tests import runModuleTestSuite
+
+
+if __name__ == '__main__':
+    runModuleTestSuite(__import__('__main__'))
@@ -39,6 +39,37 @@ Set all the weights to one, and the recurrent one to 0.5, and then do some check
     >>> n.activate(0)[0]
     0.0
     
+The buffers can be allocated for a given sequence length at once, so that they
+do not have to grow while a sequence is processed:
+
+    >>> n.reset()
+    >>> n.reserve(10)
+    >>> buf = n.inputbuffer
+    >>> outs = [n.activate(1) for _ in range(10)]
+    >>> n.inputbuffer is buf
+    True
+    
+For unbounded online use, only the last few timesteps can be kept. The 
+buffers then stay the same, while the results are not affected:
+
+    >>> m = n.copy()
+    >>> n.reset()
+    >>> n.limitHistory(3)
+    >>> buf = n.inputbuffer
+    >>> outs = [n.activate(1)[0] for _ in range(20)]
+    >>> n.inputbuffer is buf
+    True
+    >>> m.reset()
+    >>> outs == [m.activate(1)[0] for _ in range(20)]
+    True
+    
+Backpropagation through time still reaches back over the kept timesteps:
+
+    >>> [n.backActivate(1)[0] for _ in range(3)]
+    [1.0, 1.5, 1.75]
+    >>> [m.backActivate(1)[0] for _ in range(3)]
+    [1.0, 1.5, 1.75]
+    
 """
 __author__ = 'Tom Schaul, tom@idsia.ch'
 
@@ -0,0 +1,77 @@
+"""
+
+The batch environments simulate many carts at once, with the same dynamics
+as the single ones:
+
+    >>> from scipy import random, array
+    >>> from pybrain.rl.environments.cartpole import CartPoleEnvironment, \\
+    ...     DoublePoleEnvironment, NonMarkovDoublePoleEnvironment, \\
+    ...     BatchCartPoleEnvironment, BatchDoublePoleEnvironment, \\
+    ...     BatchNonMarkovDoublePoleEnvironment, BalanceTask, BatchBalanceTask
+
+    >>> def trajectory(env, actions):
+    ...     sensors = []
+    ...     for a in actions:
+    ...         env.performAction(a)
+    ...         sensors.append(env.getSensors())
+    ...     return array(sensors)
+    >>> actions = random.uniform(-5, 5, (20, 3))
+    >>> for single, batch in [(CartPoleEnvironment, BatchCartPoleEnvironment),
+    ...                       (DoublePoleEnvironment, BatchDoublePoleEnvironment),
+    ...                       (NonMarkovDoublePoleEnvironment,
+    ...                        BatchNonMarkovDoublePoleEnvironment)]:
+    ...     env = batch(3)
+    ...     random.seed(1)
+    ...     env.reset()
+    ...     batched = trajectory(env, actions)
+    ...     env = single()
+    ...     random.seed(1)
+    ...     singles = []
+    ...     for i in range(3):
+    ...         env.reset()
+    ...         singles.append(trajectory(env, actions[:, i]))
+    ...     print batch.__name__, batched.shape, abs(batched - array(singles).swapaxes(0, 1)).max()
+    BatchCartPoleEnvironment (20, 3, 4) 0.0
+    BatchDoublePoleEnvironment (20, 3, 6) 0.0
+    BatchNonMarkovDoublePoleEnvironment (20, 3, 3) 0.0
+
+The BatchBalanceTask gives the same rewards as the BalanceTask, for every cart,
+and the episode of every cart ends on its own:
+
+    >>> actions = random.uniform(-0.3, 0.3, (200, 3))
+    >>> task = BatchBalanceTask(BatchCartPoleEnvironment(3), 100)
+    >>> random.seed(2)
+    >>> task.reset()
+    >>> while not task.isFinished():
+    ...     task.performAction(actions[task.t])
+    >>> single = BalanceTask(CartPoleEnvironment(), 100)
+    >>> random.seed(2)
+    >>> totals = []
+    >>> for i in range(3):
+    ...     single.reset()
+    ...     while not single.isFinished():
+    ...         single.performAction(actions[single.t, i:i + 1])
+    ...     totals.append(single.getTotalReward())
+    >>> list(task.getTotalReward()) == totals
+    True
+
+A non-sequential module is evaluated on all carts by batch activations:
+
+    >>> from pybrain.tools.shortcuts import buildNetwork
+    >>> net = buildNetwork(4, 1, bias=False)
+    >>> net._setParameters(array([5.2, 1.5, 3.5, 2.1]))
+    >>> task = BatchBalanceTask(BatchCartPoleEnvironment(10), 300)
+    >>> task.f(net) > -100
+    True
+    >>> task.t
+    300
+
+"""
+
+__author__ = 'agent, agent@local'
+
+from pybrain.tests import runModuleTestSuite
+
+
+if __name__ == "__main__":
+    runModuleTestSuite(__import__('__main__'))
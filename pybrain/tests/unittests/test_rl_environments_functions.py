@@ -0,0 +1,67 @@
+"""
+
+The benchmark functions evaluate the rows of an (n, xdim) array in a single
+vectorized call, with the same results as row by row:
+
+    >>> from scipy import random
+    >>> from pybrain.rl.environments.functions import *
+    >>> from pybrain.rl.environments.functions.multimodal import BraninFunction
+    >>> from pybrain.rl.environments.functions.multiobjective import KurBenchmark
+    >>> random.seed(42)
+    >>> for f in [SphereFunction(4), SchwefelFunction(4), ElliFunction(4),
+    ...           RosenbrockFunction(4), RastriginFunction(4), AckleyFunction(4),
+    ...           GriewankFunction(4), Schwefel_2_13Function(4), BraninFunction(2),
+    ...           SharpRFunction(4), KurBenchmark()]:
+    ...     if not checkBatch(f):
+    ...         print f
+    
+So do the transformations:
+
+    >>> checkBatch(oppositeFunction(CigarFunction(3)))
+    True
+    >>> checkBatch(RotateFunction(TranslateFunction(WeierstrassFunction(3))))
+    True
+
+Optimizers use this to evaluate their batches, without changing the results:
+
+    >>> from pybrain.optimization import CMAES
+    >>> random.seed(42)
+    >>> f = RosenbrockFunction(3)
+    >>> l = CMAES(f, random.randn(3), maxLearningSteps=10)
+    >>> res = l.learn()
+    >>> f.fBatch = lambda xs: array([f.f(x) for x in xs])
+    >>> random.seed(42)
+    >>> l = CMAES(f, random.randn(3), maxLearningSteps=10)
+    >>> res2 = l.learn()
+    >>> epsilonCheck(res[1] - res2[1])
+    True
+
+Unless a subclass changes the function without vectorizing it as well:
+
+    >>> class ConstantFunction(SphereFunction):
+    ...     def f(self, x):
+    ...         return 42.
+    >>> ConstantFunction(3)._batchable(), SphereFunction(3)._batchable()
+    (False, True)
+    >>> TranslateFunction(ConstantFunction(3))._batchable()
+    False
+    >>> CMAES(ConstantFunction(3), random.randn(3), maxLearningSteps=3).learn()[1]
+    42.0
+
+"""
+
+__author__ = 'agent, agent@local'
+
+from scipy import array, random
+
+from pybrain.tests import runModuleTestSuite, epsilonCheck
+
+
+def checkBatch(f):
+    xs = random.randn(5, f.xdim)
+    values = array([f(x) for x in xs])
+    return abs(f.fBatch(xs) - values).max() < 1e-8 * (1 + abs(values).max())
+
+
+if __name__ == '__main__':
+    runModuleTestSuite(__import__('__main__'))
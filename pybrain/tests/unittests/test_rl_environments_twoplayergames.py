@@ -0,0 +1,90 @@
+"""
+
+The board games keep their groups, liberties and legal moves up to date
+incrementally, and can undo moves and be copied cheaply.
+
+    >>> from scipy import random
+    >>> from pybrain.rl.environments.twoplayergames import CaptureGame, GomokuGame
+    >>> from pybrain.rl.environments.twoplayergames.pente import PenteGame
+
+A helper that summarizes everything a player can see of a game:
+
+    >>> def state(game):
+    ...     res = [str(game), game.movesDone, list(game.getBoardArray())]
+    ...     for c in [game.BLACK, game.WHITE]:
+    ...         res += [game.getLegals(c), game.getKilling(c)]
+    ...     if isinstance(game, CaptureGame):
+    ...         res += [game.groups, game.liberties, game.getAcceptable(1), game.getAcceptable(-1)]
+    ...         res += [game.getGroupSize(p) for p in game._iterPos()]
+    ...     if isinstance(game, PenteGame):
+    ...         res.append(game.pairsTaken)
+    ...     return res
+
+And one that plays random moves until the game is over, and then undoes all
+of them, checking that every position is restored:
+
+    >>> def playAndUndo(game):
+    ...     states = []
+    ...     c = game.startcolor
+    ...     while not game.gameOver():
+    ...         states.append(state(game))
+    ...         game.doMove(c, game.getLegals(c)[random.randint(len(game.getLegals(c)))])
+    ...         c = -c
+    ...     moves = len(states)
+    ...     while states:
+    ...         game.undoMove()
+    ...         assert state(game) == states.pop()
+    ...     return moves > 0
+
+    >>> random.seed(3)
+    >>> all(playAndUndo(CaptureGame(5)) for _ in range(20))
+    True
+    >>> all(playAndUndo(CaptureGame(4, suicideenabled=False)) for _ in range(20))
+    True
+    >>> all(playAndUndo(GomokuGame((7, 7))) for _ in range(10))
+    True
+    >>> all(playAndUndo(PenteGame((7, 7))) for _ in range(10))
+    True
+
+The counts of empty neighbors, which tell the capture game where a move can be
+suicide, also account for the marker of the final move, and for undoing it:
+
+    >>> def freeNeighborsKept(game):
+    ...     return all(game._freeNeighbors[game._index[p]] == 
+    ...                len([n for n in game._nbs[p] if game.b[n] == game.EMPTY])
+    ...                for p in game._positions)
+    >>> def playToEnd(game):
+    ...     c = game.startcolor
+    ...     while not game.gameOver():
+    ...         game.doMove(c, game.getLegals(c)[random.randint(len(game.getLegals(c)))])
+    ...         c = -c
+    ...     ended = freeNeighborsKept(game)
+    ...     game.undoMove()
+    ...     return ended and freeNeighborsKept(game)
+    >>> all(playToEnd(CaptureGame(4)) for _ in range(20))
+    True
+
+A copy can be played on without changing the original:
+
+    >>> c = CaptureGame(5)
+    >>> c.doMove(1, (2, 2))
+    True
+    >>> before = state(c)
+    >>> d = c.copy()
+    >>> d.doMove(-1, (2, 3))
+    True
+    >>> d.doMove(1, (1, 3))
+    True
+    >>> state(c) == before
+    True
+    >>> sorted(d.liberties[d.groups[(2, 3)]])
+    [(2, 4), (3, 3)]
+
+"""
+
+__author__ = 'agent, agent@local'
+
+from pybrain.tests import runModuleTestSuite
+
+if __name__ == "__main__":
+    runModuleTestSuite(__import__('__main__'))
@@ -0,0 +1,86 @@
+"""
+
+Episodic experiments can run their episodes in parallel, by any executor
+with a map method. The episodes end up in the agent's history, in order:
+
+    >>> from multiprocessing import Pool
+    >>> from scipy import random, ravel
+    >>> from pybrain.tools.shortcuts import buildNetwork
+    >>> from pybrain.rl.environments.simple import SimpleEnvironment, MinimizeTask
+    >>> from pybrain.rl.agents import LearningAgent
+    >>> from pybrain.rl.learners import Reinforce
+    >>> from pybrain.rl.experiments import EpisodicExperiment
+
+    >>> net = buildNetwork(2, 3, 2)
+    >>> task = MinimizeTask(SimpleEnvironment(2))
+    >>> serial = LearningAgent(net)
+    >>> expected = EpisodicExperiment(task, serial).doEpisodes(5)
+    >>> agent = LearningAgent(net)
+    >>> experiment = EpisodicExperiment(task, agent)
+    >>> pool = Pool(2)
+    >>> experiment.executor = pool
+    >>> experiment.episodesPerJob = 2
+    >>> rewards = experiment.doEpisodes(5)
+    >>> map(len, rewards)
+    [15, 15, 15, 15, 15]
+    >>> abs(ravel(rewards) - ravel(expected)).max() < 1e-10
+    True
+    >>> agent.history.getNumSequences()
+    5
+    >>> abs(agent.history['state'] - serial.history['state']).max() < 1e-10
+    True
+
+Every job gets its own random seed, so that the exploration (and noise in the
+tasks) differs between the workers, but is reproducible:
+
+    >>> task.env.setNoise(0.1)
+    >>> results = []
+    >>> for _ in range(2):
+    ...     random.seed(42)
+    ...     agent = LearningAgent(net, Reinforce())
+    ...     experiment = EpisodicExperiment(task, agent)
+    ...     experiment.executor = pool
+    ...     rewards = experiment.doEpisodes(4)
+    ...     results.append(ravel(rewards))
+    >>> (results[0] == results[1]).all()
+    True
+    >>> len(set(tuple(r) for r in rewards))
+    4
+
+Learners that need information about the exploration of each sample compute it
+afterwards, like the log likelihoods of policy gradient learners:
+
+    >>> agent.learner.loglh.getLength() == agent.history.getLength()
+    True
+    >>> agent.learn()
+    >>> pool.terminate()
+
+The same holds within a single process, where the jobs share the random 
+generators of the program:
+
+    >>> from multiprocessing.pool import ThreadPool
+    >>> threads = ThreadPool(3)
+    >>> results = []
+    >>> for executor in [SerialExecutor(), threads, threads]:
+    ...     random.seed(42)
+    ...     experiment = EpisodicExperiment(task, LearningAgent(net, Reinforce()))
+    ...     experiment.executor = executor
+    ...     results.append(ravel(experiment.doEpisodes(6)))
+    >>> (results[0] == results[1]).all(), (results[0] == results[2]).all()
+    (True, True)
+    >>> threads.terminate()
+
+"""
+
+__author__ = 'agent, agent@local'
+
+from pybrain.tests import runModuleTestSuite
+
+
+class SerialExecutor(object):
+    """ Runs the jobs one by one. """
+    map = staticmethod(map)
+
+
+if __name__ == "__main__":
+    runModuleTestSuite(__import__('__main__'))
@@ -0,0 +1,60 @@
+"""
+
+Tournaments can play their games in parallel, by any executor with a map
+method. All the games between two agents are played in one job, on copies of
+the game and the agents:
+
+    >>> from multiprocessing import Pool
+    >>> from scipy import random
+    >>> from pybrain.rl.environments.twoplayergames import CaptureGame
+    >>> from pybrain.rl.environments.twoplayergames.capturegameplayers import RandomCapturePlayer, KillingPlayer
+    >>> from pybrain.rl.experiments.tournament import Tournament
+
+    >>> game = CaptureGame(5)
+    >>> agents = [RandomCapturePlayer(game, name='rand'), KillingPlayer(game, name='kill')]
+    >>> tourn = Tournament(game, agents)
+    >>> pool = Pool(2)
+    >>> tourn.executor = pool
+    >>> results = tourn.organize(20)
+    >>> print tourn.rounds, tourn.numGames
+    20 40
+    >>> sorted((a.name, b.name, len(r)) for (a, b), r in results.items())
+    [('kill', 'rand', 20), ('rand', 'kill', 20)]
+    >>> all(w in agents for r in results.values() for w in r)
+    True
+
+Every job gets its own random seed, so the games are reproducible:
+
+    >>> wins = []
+    >>> for _ in range(2):
+    ...     random.seed(3)
+    ...     tourn.reset()
+    ...     results = tourn.organize(20)
+    ...     wins.append([len([w for w in results[(a, b)] if w.name == 'kill']) for a, b in tourn._produceAllPairs()])
+    >>> wins[0] == wins[1]
+    True
+    >>> min(wins[0]) > 10
+    True
+    >>> pool.terminate()
+
+The seeds do not touch the random generators of other threads, so the games
+come out the same in a ThreadPool as in separate processes:
+
+    >>> from multiprocessing.pool import ThreadPool
+    >>> pool = ThreadPool(2)
+    >>> tourn.executor = pool
+    >>> random.seed(3)
+    >>> tourn.reset()
+    >>> results = tourn.organize(20)
+    >>> wins[0] == [len([w for w in results[(a, b)] if w.name == 'kill']) for a, b in tourn._produceAllPairs()]
+    True
+    >>> pool.terminate()
+
+"""
+
+__author__ = 'agent, agent@local'
+
+from pybrain.tests import runModuleTestSuite
+
+if __name__ == "__main__":
+    runModuleTestSuite(__import__('__main__'))
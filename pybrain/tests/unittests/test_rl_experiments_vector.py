@@ -0,0 +1,86 @@
+"""
+
+A VectorExperiment runs the episodes of several copies of a task in lockstep,
+activating the agent's module on a batch of observations at every step:
+
+    >>> from scipy import random, ravel, allclose
+    >>> from pybrain.tools.shortcuts import buildNetwork
+    >>> from pybrain.rl.environments.simple import SimpleEnvironment, MinimizeTask
+    >>> from pybrain.rl.agents import LearningAgent
+    >>> from pybrain.rl.learners import Reinforce
+    >>> from pybrain.rl.experiments import EpisodicExperiment, VectorExperiment
+    >>> random.seed(0)
+    >>> net = buildNetwork(2, 3, 2)
+    >>> tasks = [MinimizeTask(SimpleEnvironment(2)) for _ in range(4)]
+    >>> agent = LearningAgent(net)
+    >>> rewards = VectorExperiment(tasks, agent).doEpisodes(6)
+    >>> len(rewards), map(len, rewards)
+    (6, [15, 15, 15, 15, 15, 15])
+
+The episodes are stored in the agent's history one after the other, with the
+same results as a sequential experiment:
+
+    >>> agent.history.getNumSequences()
+    6
+    >>> other = LearningAgent(net)
+    >>> expected = EpisodicExperiment(tasks[0], other).doEpisodes(6)
+    >>> abs(ravel(rewards) - ravel(expected)).max() < 1e-10
+    True
+    >>> abs(agent.history['action'] - other.history['action']).max() < 1e-10
+    True
+
+Learners can explore in the parallel episodes. The log likelihoods of the
+policy gradient learners are stored in the order of the history:
+
+    >>> for task in tasks:
+    ...     task.env.setNoise(0.1)
+    >>> agent = LearningAgent(net, Reinforce())
+    >>> rewards = VectorExperiment(tasks, agent).doEpisodes(5)
+    >>> agent.learner.loglh.getLength() == agent.history.getLength() == 75
+    True
+    >>> agent.learn()
+
+They are the same as in a sequential experiment. (The explorer is made 
+deterministic, so that both experiments explore the same way.)
+
+    >>> from pybrain.rl.explorers import NormalExplorer
+    >>> class ScalingExplorer(NormalExplorer):
+    ...     def _forwardImplementation(self, inbuf, outbuf):
+    ...         outbuf[:] = 1.5 * inbuf
+    >>> def explorativeAgent(net):
+    ...     agent = LearningAgent(net, Reinforce())
+    ...     agent.learner.explorer = ScalingExplorer(2)
+    ...     return agent
+    >>> tasks = [MinimizeTask(SimpleEnvironment(2)) for _ in range(4)]
+    >>> agent = explorativeAgent(net.copy())
+    >>> rewards = VectorExperiment(tasks, agent).doEpisodes(6)
+    >>> other = explorativeAgent(net.copy())
+    >>> expected = EpisodicExperiment(tasks[0], other).doEpisodes(6)
+    >>> allclose(agent.learner.loglh['loglh'], other.learner.loglh['loglh'])
+    True
+
+Sequential modules would carry their state from one episode to the other:
+
+    >>> rnn = buildNetwork(2, 3, 2, recurrent=True)
+    >>> VectorExperiment(tasks, LearningAgent(rnn)).doEpisodes(4)
+    Traceback (most recent call last):
+        ...
+    ValueError: Parallel episodes need a non-sequential module.
+
+Action-value networks choose the actions for a whole batch of states at once:
+
+    >>> from pybrain.rl.learners.valuebased import ActionValueNetwork
+    >>> module = ActionValueNetwork(4, 3)
+    >>> states = random.randn(10, 4)
+    >>> list(module.activateBatch(states)[:, 0]) == [module.getMaxAction(s) for s in states]
+    True
+
+"""
+
+__author__ = 'agent, agent@local'
+
+from pybrain.tests import runModuleTestSuite
+
+
+if __name__ == "__main__":
+    runModuleTestSuite(__import__('__main__'))
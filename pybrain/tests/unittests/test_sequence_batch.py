@@ -0,0 +1,128 @@
+"""
+
+Recurrent networks can process a batch of sequences in parallel. Build an LSTM
+network with peepholes and a few sequences of different lengths:
+
+    >>> from scipy import random, zeros
+    >>> random.seed(42)
+    >>> n = buildPeepholeLSTMNetwork()
+    >>> lengths = [3, 5, 1, 4]
+    >>> sequences = [random.randn(l, 2) for l in lengths]
+    >>> outerrs = [random.randn(l, 2) for l in lengths]
+
+Process the sequences one by one, accumulating the derivatives:
+
+    >>> n.resetDerivatives()
+    >>> outs, inerrs = [], []
+    >>> for seq, errs in zip(sequences, outerrs):
+    ...     n.reset()
+    ...     outs.append(array([n.activate(x) for x in seq]))
+    ...     inerrs.append(array([n.backActivate(e) for e in errs[::-1]])[::-1])
+    >>> derivs = n.derivs.copy()
+
+Now the same as a (time, batch, dim) batch, padded at the end of the shorter
+sequences:
+
+    >>> inpts = zeros((5, 4, 2))
+    >>> batcherrs = zeros((5, 4, 2))
+    >>> mask = zeros((5, 4))
+    >>> for i, l in enumerate(lengths):
+    ...     inpts[:l, i] = sequences[i]
+    ...     batcherrs[:l, i] = outerrs[i]
+    ...     mask[:l, i] = 1
+    >>> n.resetDerivatives()
+    >>> batchouts = n.activateSequenceBatch(inpts)
+    >>> batchouts.shape
+    (5, 4, 2)
+    >>> batchinerrs = n.backActivateSequenceBatch(batcherrs, mask)
+    >>> batchinerrs.shape
+    (5, 4, 2)
+
+    >>> max(abs(batchouts[:l, i] - outs[i]).max() for i, l in enumerate(lengths)) < 1e-10
+    True
+    >>> max(abs(batchinerrs[:l, i] - inerrs[i]).max() for i, l in enumerate(lengths)) < 1e-10
+    True
+    >>> epsilonCheck(abs(n.derivs - derivs).max())
+    True
+
+The network still works sequence by sequence afterwards:
+
+    >>> n.reset()
+    >>> epsilonCheck(abs(array([n.activate(x) for x in sequences[1]]) - outs[1]).max())
+    True
+
+The BackpropTrainer uses this for minibatches of sequences:
+
+    >>> from pybrain.datasets import SequentialDataSet
+    >>> from pybrain.supervised import BackpropTrainer
+    >>> ds = SequentialDataSet(2, 2)
+    >>> for seq, errs in zip(sequences, outerrs):
+    ...     ds.newSequence()
+    ...     for x, y in zip(seq, errs):
+    ...         ds.addSample(x, y)
+    >>> t = BackpropTrainer(n, ds, minibatchsize=3)
+    >>> n.resetDerivatives()
+    >>> e, p = t._calcSequenceBatchDerivs(range(4))
+    >>> derivs = n.derivs.copy()
+    >>> n.resetDerivatives()
+    >>> results = [t._calcDerivs(seq) for seq in ds._provideSequences()]
+    >>> epsilonCheck(e - sum(r[0] for r in results))
+    True
+    >>> p == sum(r[1] for r in results)
+    True
+    >>> epsilonCheck(abs(n.derivs - derivs).max())
+    True
+    >>> 0 < t.train() < 10
+    True
+
+Datasets without sequences are processed sample by sample, as if the option
+was not given:
+
+    >>> from scipy import vstack
+    >>> from pybrain.datasets import SupervisedDataSet
+    >>> flat = SupervisedDataSet(2, 2)
+    >>> for x, y in zip(vstack(sequences), vstack(outerrs)):
+    ...     flat.addSample(x, y)
+    >>> 0 < BackpropTrainer(n, flat, minibatchsize=3).train() < 10
+    True
+
+Fast networks do not support it, and say so:
+
+    >>> from pybrain.tools.shortcuts import buildNetwork
+    >>> f = buildNetwork(2, 3, 2, recurrent=True).convertToFastNetwork()
+    >>> f.name = 'fast'
+    >>> f.activateSequenceBatch(inpts)
+    Traceback (most recent call last):
+        ...
+    ValueError: fast cannot process batches of sequences.
+
+"""
+
+__author__ = 'agent, agent@local'
+
+
+from scipy import array
+
+from pybrain.structure import (RecurrentNetwork, LinearLayer, LSTMLayer,
+    SigmoidLayer, BiasUnit, FullConnection)
+from pybrain.tests import runModuleTestSuite, epsilonCheck
+
+
+def buildPeepholeLSTMNetwork():
+    n = RecurrentNetwork()
+    n.addInputModule(LinearLayer(2, name='in'))
+    n.addModule(BiasUnit(name='bias'))
+    n.addModule(LSTMLayer(3, peepholes=True, name='lstm'))
+    n.addOutputModule(SigmoidLayer(2, name='out'))
+    n.addConnection(FullConnection(n['in'], n['lstm']))
+    n.addConnection(FullConnection(n['bias'], n['lstm']))
+    n.addConnection(FullConnection(n['bias'], n['out']))
+    n.addConnection(FullConnection(n['lstm'], n['out']))
+    n.addRecurrentConnection(FullConnection(n['lstm'], n['lstm']))
+    n.addRecurrentConnection(FullConnection(n['out'], n['lstm']))
+    n.sortModules()
+    return n
+
+
+if __name__ == "__main__":
+    runModuleTestSuite(__import__('__main__'))
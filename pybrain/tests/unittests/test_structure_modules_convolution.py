@@ -0,0 +1,85 @@
+"""
+
+Convolution, pooling and padding layers handle whole 2D maps, stored position
+by position, with a number of channels per position.
+
+    >>> from scipy import random, zeros, dot, array
+    >>> from pybrain import LinearLayer, SigmoidLayer, FeedForwardNetwork, IdentityConnection
+    >>> from pybrain.structure.modules import ConvolutionLayer, PoolingLayer, PaddingLayer
+    >>> random.seed(5)
+
+A convolution computes the same as a weighted sum over every square patch of
+the input, with the weights grouped by kernel row:
+
+    >>> conv = ConvolutionLayer(4, 2, 3, 5)
+    >>> conv.paramdim, conv.indim, conv.outdim
+    (90, 32, 20)
+    >>> x = random.randn(conv.indim)
+    >>> w = conv.params.reshape(3, 5, 3 * 2)
+    >>> maps = x.reshape(4, 4 * 2)
+    >>> expected = zeros((2, 2, 5))
+    >>> for i in range(2):
+    ...     for j in range(2):
+    ...         for k in range(3):
+    ...             expected[i, j] += dot(w[k], maps[i + k, j * 2:(j + 3) * 2])
+    >>> abs(conv.activate(x) - expected.ravel()).max() < 1e-12
+    True
+
+Pooling takes the maxima of the blocks, for every channel:
+
+    >>> pool = PoolingLayer(4, 2, 2)
+    >>> maps = random.randn(4, 4, 2)
+    >>> out = pool.activate(maps.ravel()).reshape(2, 2, 2)
+    >>> (out[1, 0] == maps[2:, :2].reshape(-1, 2).max(axis=0)).all()
+    True
+
+Padding surrounds a map with a border of trainable values, one per channel:
+
+    >>> pad = PaddingLayer(2, 2, 1)
+    >>> pad.outsize
+    (4, 4)
+    >>> out = pad.activate(array([1, 2, 3, 4, 5, 6, 7, 8.])).reshape(4, 4, 2)
+    >>> out[1:3, 1:3].ravel()
+    array([ 1.,  2.,  3.,  4.,  5.,  6.,  7.,  8.])
+    >>> (out[0] == pad.params).all(), (out[:, 3] == pad.params).all()
+    (True, True)
+
+They plug into networks like any other module, with correct gradients:
+
+    >>> n = FeedForwardNetwork()
+    >>> n.addInputModule(LinearLayer(4 * 4 * 2, name='in'))
+    >>> n.addModule(PaddingLayer(4, 2, 1, name='pad'))
+    >>> n.addModule(ConvolutionLayer(6, 2, 3, 3, name='conv'))
+    >>> n.addModule(SigmoidLayer(4 * 4 * 3, name='h'))
+    >>> n.addOutputModule(PoolingLayer(4, 3, 2, name='out'))
+    >>> for a, b in [('in', 'pad'), ('pad', 'conv'), ('conv', 'h'), ('h', 'out')]:
+    ...     n.addConnection(IdentityConnection(n[a], n[b]))
+    >>> n.sortModules()
+    >>> n.paramdim
+    56
+
+    >>> from pybrain.tests import gradientCheck
+    >>> gradientCheck(n)
+    Perfect gradient
+    True
+
+Batches of samples are handled at once, with the same results:
+
+    >>> xs = random.randn(7, n.indim)
+    >>> abs(n.activateBatch(xs) - array([n.activate(x) for x in xs])).max() < 1e-12
+    True
+
+    >>> from pybrain.tests import xmlInvariance
+    >>> xmlInvariance(n)
+    Same representation
+    Same function
+    Same class
+
+"""
+
+__author__ = 'agent, agent@local'
+
+from pybrain.tests import runModuleTestSuite
+
+if __name__ == '__main__':
+    runModuleTestSuite(__import__('__main__'))
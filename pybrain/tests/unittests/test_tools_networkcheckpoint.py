@@ -0,0 +1,77 @@
+"""
+
+Networks can be stored in a compact binary checkpoint: the structure is kept in
+a small XML header, the parameters in their raw binary form.
+
+    >>> import os
+    >>> from scipy import random
+    >>> from pybrain import LSTMLayer
+    >>> from pybrain.tools.shortcuts import buildNetwork
+    >>> from pybrain.tools.xml import NetworkCheckpoint, NetworkWriter
+    >>> random.seed(3)
+    >>> n = buildNetwork(4, 6, 2, hiddenclass=LSTMLayer, recurrent=True)
+
+Reading it again gives exactly the same parameters, and the same function:
+
+    >>> NetworkCheckpoint.writeToFile(n, filename)
+    >>> m = NetworkCheckpoint.readFrom(filename)
+    >>> m.__class__.__name__, m.paramdim == n.paramdim
+    ('RecurrentNetwork', True)
+    >>> (m.params == n.params).all()
+    True
+    >>> print sameActivations(m, n)
+    True
+
+The file is smaller than the XML, which stores the values as text:
+
+    >>> NetworkWriter.writeToFile(n, filename + '.xml')
+    >>> os.path.getsize(filename) < os.path.getsize(filename + '.xml')
+    True
+
+The parameters can be memory-mapped instead of read. Changing them then does
+not change the file:
+
+    >>> m = NetworkCheckpoint.readFrom(filename, mmap=True)
+    >>> (m.params == n.params).all()
+    True
+    >>> m.params[:] = 0
+    >>> (NetworkCheckpoint.readFrom(filename).params == n.params).all()
+    True
+
+The type of the parameters is kept:
+
+    >>> n = buildNetwork(2, 3, 1)
+    >>> n.setDtype('float32')
+    >>> NetworkCheckpoint.writeToFile(n, filename)
+    >>> m = NetworkCheckpoint.readFrom(filename)
+    >>> m.params.dtype, (m.params == n.params).all()
+    (dtype('float32'), True)
+
+    >>> os.unlink(filename)
+    >>> os.unlink(filename + '.xml')
+
+"""
+
+__author__ = 'agent, agent@local'
+
+import tempfile
+
+from scipy import random
+
+from pybrain.tests import runModuleTestSuite
+
+filename = tempfile.mktemp('.pbn')
+
+
+def sameActivations(m, n, steps=5):
+    m.reset()
+    n.reset()
+    for _ in range(steps):
+        x = random.randn(n.indim)
+        if not (m.activate(x) == n.activate(x)).all():
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    runModuleTestSuite(__import__('__main__'))
@@ -0,0 +1,76 @@
+"""
+
+The non-dominated ranks of a set of fitness vectors (to be minimized) are
+computed on arrays. For two objectives, a sweep over the sorted points is
+used:
+
+    >>> from scipy import array, random
+    >>> from pybrain.tools.nondominated import non_dominated_ranks, \\
+    ...     non_dominated_front, non_dominated_sort, crowding_distance_arr
+    >>> fits = array([[1, 4], [2, 2], [4, 1], [3, 3], [5, 5], [4, 4]])
+    >>> non_dominated_ranks(fits)
+    array([0, 0, 0, 1, 3, 2])
+
+With more objectives, the dominated points are peeled off front by front:
+
+    >>> non_dominated_ranks(array([[1, 2, 3], [3, 2, 1], [2, 3, 4], [5, 5, 5]]))
+    array([0, 0, 1, 2])
+
+Both give the same fronts as the sets based interface:
+
+    >>> random.seed(3)
+    >>> points = [tuple(p) for p in random.randint(0, 5, (50, 2))]
+    >>> fronts = non_dominated_sort(points)
+    >>> ranks = non_dominated_ranks(array(points))
+    >>> all(ranks[i] == [j for j, f in enumerate(fronts) if p in f][0]
+    ...     for i, p in enumerate(points))
+    True
+    >>> non_dominated_front([(1, 3), (2, 2), (3, 3)]) == set([(1, 3), (2, 2)])
+    True
+
+If equal fitness vectors are not allowed in a front, weak domination is
+enough, and the first of several equal ones dominates the others:
+
+    >>> fits = array([[1, 1], [1, 1], [0, 2], [1, 2]])
+    >>> non_dominated_ranks(fits)
+    array([0, 0, 0, 0])
+    >>> non_dominated_ranks(fits, allowequality=False)
+    array([0, 1, 0, 2])
+
+The crowding distance is infinite (1e100) at the boundaries of every
+objective:
+
+    >>> crowding_distance_arr(array([[0., 3.], [1., 2.], [3., 0.]]))
+    array([  1.00000000e+100,   2.00000000e+000,   1.00000000e+100])
+
+NSGA-II selects a given number of survivors:
+
+    >>> import random as pyrandom
+    >>> from pybrain.optimization.populationbased.multiobjective.nsga2 import nsga2select
+    >>> population = [tuple(p) for p in random.randn(20, 2)]
+    >>> fitnesses = dict((p, p) for p in population)
+    >>> len(nsga2select(population, fitnesses, 8))
+    8
+
+The multi-objective GA finds a front of solutions:
+
+    >>> from pybrain.optimization import MultiObjectiveGA
+    >>> from pybrain.rl.environments.functions.multiobjective import KurBenchmark
+    >>> pyrandom.seed(1)
+    >>> random.seed(1)
+    >>> f = KurBenchmark()
+    >>> l = MultiObjectiveGA(f, random.randn(f.xdim), populationSize=50,
+    ...                      maxLearningSteps=10)
+    >>> front = l.learn()[0]
+    >>> len(front) > 1
+    True
+
+"""
+
+__author__ = 'agent, agent@local'
+
+from pybrain.tests import runModuleTestSuite
+
+
+if __name__ == "__main__":
+    runModuleTestSuite(__import__('__main__'))
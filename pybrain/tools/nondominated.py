@@ -2,7 +2,8 @@ __author__ = 'Justin Bayer, Tom Schaul, {justin,tom}@idsia.ch'
 
 
 import collections
-from scipy import array, tile, sum
+from bisect import bisect_left, bisect_right
+from scipy import array, tile, sum, zeros, ones, arange, flatnonzero, lexsort, asarray
 
 
 def crowding_distance(individuals, fitnesses):
@@ -22,6 +23,95 @@ def crowding_distance(individuals, fitnesses):
         for pre, ind, post in tripled:
             distances[ind] += (fitnesses[pre][i] - fitnesses[post][i]) / normalization
     return distances
+
+
+def crowding_distance_arr(fits):
+    """ Crowding distances of the rows of the array fits, computed like 
+    crowding_distance(). """
+    fits = asarray(fits, dtype=float)
+    distances = zeros(len(fits))
+    for i in xrange(fits.shape[1]):
+        order = fits[:, i].argsort(kind='mergesort')
+        normalization = fits[order[0], i] - fits[order[-1], i]
+        if normalization != 0:
+            distances[order[1:-1]] += (fits[order[:-2], i] - fits[order[2:], i]) / normalization
+        # Make sure the boundary points are always selected.
+        distances[order[[0, -1]]] = 1e100
+    return distances
+
+
+def _dominations(fits, allowequality=True, blocksize=256):
+    """ Boolean matrix telling which rows of fits dominate which other ones, 
+    in the sense of non_dominated_front(). Ties between identical rows are 
+    broken by their order. """
+    n, dim = fits.shape
+    res = ones((n, n), dtype=bool)
+    for start in xrange(0, n, blocksize):
+        block = res[start:start + blocksize]
+        if allowequality:
+            for k in xrange(dim):
+                block &= fits[start:start + blocksize, k, None] < fits[:, k]
+        else:
+            equal = ones(block.shape, dtype=bool)
+            for k in xrange(dim):
+                block &= fits[start:start + blocksize, k, None] <= fits[:, k]
+                equal &= fits[start:start + blocksize, k, None] == fits[:, k]
+            equal &= arange(start, start + len(block))[:, None] >= arange(n)
+            block &= ~equal
+    return res
+
+
+def _non_dominated_ranks_2d(fits, allowequality=True):
+    """ The ranks for two objectives, in O(n log n): the points are visited 
+    in an order in which no point can be dominated by a later one, and each 
+    goes into the first front none of whose points dominate it. """
+    n = len(fits)
+    if allowequality:
+        # Points with the same first objective cannot dominate each other.
+        order = lexsort((-fits[:, 1], fits[:, 0]))
+        find = bisect_left
+    else:
+        order = lexsort((arange(n), fits[:, 1], fits[:, 0]))
+        find = bisect_right
+    ranks = zeros(n, dtype=int)
+    # The smallest second objective in each front, which is sorted.
+    minima = []
+    for i in order:
+        y = fits[i, 1]
+        rank = find(minima, y)
+        if rank == len(minima):
+            minima.append(y)
+        else:
+            minima[rank] = y
+        ranks[i] = rank
+    return ranks
+
+
+def non_dominated_ranks(fits, allowequality=True):
+    """ Return an array with the index of the non-dominated front each row of 
+    the array fits belongs to: 0 for the rows that are not dominated, 1 for 
+    those only dominated by rows of front 0, etc. """
+    fits = asarray(fits, dtype=float)
+    n = len(fits)
+    if n == 0:
+        return zeros(0, dtype=int)
+    if fits.shape[1] == 2:
+        return _non_dominated_ranks_2d(fits, allowequality)
+    dominations = _dominations(fits, allowequality)
+    # Fast non-dominated sorting (Deb et al., 2002): count the dominators of
+    # every point, and remove the fronts one by one.
+    counts = dominations.sum(axis=0)
+    ranks = -ones(n, dtype=int)
+    front = flatnonzero(counts == 0)
+    rank = 0
+    while len(front) > 0:
+        ranks[front] = rank
+        # (take is much faster than fancy indexing here)
+        counts -= dominations.take(front, axis=0).sum(axis=0)
+        counts[front] = -1
+        front = flatnonzero(counts == 0)
+        rank += 1
+    return ranks
  
  
 def _non_dominated_front_old(iterable, key=lambda x: x, allowequality=True):
@@ -160,17 +250,25 @@ def _non_dominated_front_merge_arr(iterable, key=lambda x: x, allowequality=True
         return _non_dominated_front_arr(items, key, allowequality)
 
 
-non_dominated_front = _non_dominated_front_merge_arr
+def non_dominated_front(iterable, key=lambda x: x, allowequality=True):
+    """Return a subset of items from iterable which are not dominated by any
+    other item in iterable."""
+    items = list(iterable)
+    if not items:
+        return set()
+    ranks = non_dominated_ranks(map(key, items), allowequality)
+    return set(items[i] for i in flatnonzero(ranks == 0))
 
 
 def non_dominated_sort(iterable, key=lambda x: x, allowequality=True):
     """Return a list that is sorted in a non-dominating fashion.
     Keys have to be n-tuple."""
-    items = set(iterable)
-    fronts = []
-    while items:
-        front = non_dominated_front(items, key, allowequality)
-        items -= front
-        fronts.append(front)
+    items = list(set(iterable))
+    if not items:
+        return []
+    ranks = non_dominated_ranks(map(key, items), allowequality)
+    fronts = [set() for _ in xrange(max(ranks) + 1)]
+    for item, rank in zip(items, ranks):
+        fronts[rank].add(item)
     return fronts
 
@@ -4,7 +4,7 @@ __author__ = 'Daan Wierstra and Tom Schaul'
 
 from pybrain.utilities import Named
 from random import randint
-from scipy import zeros, argmax, array, power, exp, sqrt, var, zeros_like, arange, mean
+from scipy import zeros, argmax, array, power, exp, sqrt, var, zeros_like, arange, mean, log, maximum
 
 
 def rankedFitness(R):
@@ -136,6 +136,15 @@ class TopLinearRanking(TopSelection):
         self.topFraction = p
         
 
+class HansenRanking(RankingFunction):
+    """ Logarithmic ranking, as used by CMA-ES and NES: the better half of the 
+    samples get positive values, decreasing with the logarithm of their rank. """
+    
+    def __call__(self, R):
+        ranks = rankedFitness(R)
+        return maximum(0., log(len(R) / 2. + 1) - log(len(R) - ranks))
+        
+
 class BilinearRanking(RankingFunction):
     """ Bi-linear transformation, rescaled. """
         
@@ -33,7 +33,10 @@ def buildNetwork(*layers, **options):
     otherwise a :class:`FeedForwardNetwork`.
     
     If the `fast` flag is set, faster arac networks will be used instead of the 
-    pybrain implementations."""
+    pybrain implementations.
+    
+    `dtype` can be set to use another type than float64 for the parameters and
+    buffers, e.g. 'float32'."""
     # options
     opt = {'bias': True,
            'hiddenclass': SigmoidLayer,
@@ -42,6 +45,7 @@ def buildNetwork(*layers, **options):
            'peepholes': False,
            'recurrent': False,
            'fast': False,
+           'dtype': None,
     }
     for key in options:
         if key not in opt.keys():
@@ -103,6 +107,8 @@ def buildNetwork(*layers, **options):
         n.addRecurrentConnection(FullConnection(n['hidden0'], n['hidden0']))
 
     n.sortModules()
+    if opt['dtype'] is not None:
+        n.setDtype(opt['dtype'])
     return n
     
 
@@ -7,6 +7,7 @@ import copy
 from pybrain.datasets.importance import ImportanceDataSet
 from pybrain.datasets.sequential import SequentialDataSet
 from pybrain.datasets.supervised import SupervisedDataSet
+from pybrain.structure.networks.feedforward import FeedForwardNetwork
 
 
 
@@ -229,6 +230,10 @@ class ModuleValidator(object):
             
             :arg dataset: Any Dataset object containing an 'input' field.
         """
+        if isinstance(module, FeedForwardNetwork):
+            # Samples are independent, so the output is calculated by 
+            # vectorized passes over large chunks of the dataset.
+            return module.activateOnDataset(dataset)
         if isinstance(dataset, SequentialDataSet) or isinstance(dataset, ImportanceDataSet):
             return cls._calculateModuleOutputSequential(module, dataset)
         else:
@@ -1,3 +1,3 @@
 from networkreader import NetworkReader
 from networkwriter import NetworkWriter
-        
\ No newline at end of file
+from networkcheckpoint import NetworkCheckpoint
@@ -0,0 +1,90 @@
+__author__ = 'agent, agent@local'
+
+import json
+import struct
+from StringIO import StringIO
+
+from numpy import memmap, fromfile, ndarray, dtype as npdtype
+
+from networkreader import NetworkReader
+from networkwriter import NetworkWriter
+
+
+class NetworkCheckpoint(object):
+    """ Stores a network in a compact binary file: the structure, as XML
+    without any parameters, in a small header, followed by the raw array of
+    all parameters of the network. The parameters are restored exactly, and
+    can be memory-mapped instead of read.
+
+    The file starts with the magic string, the length of the header (4 bytes,
+    little-endian) and the header itself, which is a JSON dictionary with the
+    version, the dtype and size of the parameters, and the structure. The
+    parameters start at the next multiple of 64 bytes. """
+
+    magic = 'PYBRAINNET'
+    version = 1
+    alignment = 64
+
+    @staticmethod
+    def writeToFile(net, filename):
+        """ write the network as a new checkpoint file """
+        net.sortModules()
+        w = NetworkWriter(filename, newfile = True)
+        w.writeParameters = False
+        w.writeNetwork(net, w.newRootNode('Network'))
+        params = net.params if net.paramdim > 0 else None
+        header = json.dumps({
+            'version': NetworkCheckpoint.version,
+            'dtype': npdtype(net.dtype).str if params is None else params.dtype.str,
+            'size': net.paramdim,
+            'structure': w.dom.toxml(),
+            })
+        offset = NetworkCheckpoint._paramsOffset(len(header))
+        with file(filename, 'wb') as f:
+            f.write(NetworkCheckpoint.magic)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            f.write('\0' * (offset - f.tell()))
+            if params is not None:
+                f.write(params.tostring())
+
+    @staticmethod
+    def readFrom(filename, mmap = False):
+        """ read the network stored in a checkpoint file
+
+        :key mmap: map the parameters into memory, instead of reading them.
+                   They are mapped copy-on-write: changing them (e.g. by
+                   training) does not change the file. """
+        with file(filename, 'rb') as f:
+            if f.read(len(NetworkCheckpoint.magic)) != NetworkCheckpoint.magic:
+                raise Exception('Not a PyBrain network checkpoint')
+            length, = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(length))
+            if header['version'] > NetworkCheckpoint.version:
+                raise Exception('Unknown checkpoint version %s' % header['version'])
+            offset = NetworkCheckpoint._paramsOffset(length)
+            dtype = npdtype(str(header['dtype']))
+            size = header['size']
+            if size > 0 and not mmap:
+                f.seek(offset)
+                params = fromfile(f, dtype, size)
+
+        r = NetworkReader(StringIO(header['structure'].encode('utf-8')), newfile = False)
+        net = r.readNetwork(r.findNode('Network'))
+        if net.paramdim != size:
+            raise Exception('The structure has %d parameters, but %d are stored'
+                            % (net.paramdim, size))
+        if size > 0:
+            if mmap:
+                # a plain array, which keeps the mapping open
+                params = memmap(filename, dtype, 'c', offset, (size,)).view(ndarray)
+            if net.params.dtype != dtype:
+                net.setDtype(dtype)
+            net._setParameters(params)
+        return net
+
+    @staticmethod
+    def _paramsOffset(headerlength):
+        """ the position of the parameters, after a header of the given length """
+        end = len(NetworkCheckpoint.magic) + 4 + headerlength
+        return -(-end // NetworkCheckpoint.alignment) * NetworkCheckpoint.alignment
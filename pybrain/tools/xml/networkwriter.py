@@ -14,6 +14,9 @@ from pybrain.utilities import canonicClassString
 class NetworkWriter(XMLHandling):
     """ A class that can take a network and write it to an XML file """
     
+    # if this flag is unset, only the structure is written (see NetworkCheckpoint)
+    writeParameters = True
+    
     @staticmethod
     def appendToFile(net, filename):
         """ append the network to an existing xml file """
@@ -90,7 +93,7 @@ class NetworkWriter(XMLHandling):
         mnode.setAttribute('class', canonicClassString(m))
         if m.argdict:
             self.writeArgs(mnode, m.argdict)     
-        if m.paramdim > 0 and not isinstance(m, SharedConnection):
+        if self.writeParameters and m.paramdim > 0 and not isinstance(m, SharedConnection):
             self.writeParams(mnode, m.params)
         return mnode
         
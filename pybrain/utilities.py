@@ -11,10 +11,11 @@ import operator
 
 from itertools import count
 from math import sqrt
-from random import random, choice
+from random import random, choice, getstate, setstate, seed
 from string import split
 
 from scipy import where, array, exp, zeros, size, mat
+from scipy import random as scipyrandom
 
 # file extension for load/save protocol mapping
 known_extensions = {
@@ -285,6 +286,27 @@ def threaded(callback=lambda * args, **kwargs: None, daemonic=False):
     return innerDecorator
     
     
+_randomLock = threading.RLock()
+
+
+def callSeeded(s, func, *args, **kwargs):
+    """ Call func with the random generators of scipy and of the random 
+    module both seeded with s, and restore their previous states afterwards.
+    
+    The generators are shared by the whole process, so calls from different 
+    threads run one at a time; they neither interfere with each other nor 
+    with the random numbers drawn by the rest of the program. """
+    with _randomLock:
+        states = scipyrandom.get_state(), getstate()
+        scipyrandom.seed(s)
+        seed(s)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            scipyrandom.set_state(states[0])
+            setstate(states[1])
+
+
 def garbagecollect(func):
     """Decorate a function to invoke the garbage collector after each execution.
     """